@@ -0,0 +1,133 @@
+import argparse
+import random
+import time
+from typing import Any, Callable, List
+
+from utils.enum.term_enum import MergeStrategy
+from utils.helper.map_terms_helper import (
+    BACDIVE_SECTIONS,
+    TERM_MAPPING,
+    TERM_SECTION_MERGE,
+    mapping,
+    merge_values,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.term_mapping",
+        description="Compare the throughput of the compiled term mapping with a "
+        "mapping that interprets TERM_MAPPING on every document, on large "
+        "synthetic BacDive documents.",
+    )
+    parser.add_argument("--documents", type=int, default=2000)
+    parser.add_argument(
+        "--entries", type=int, default=200, help="Entries per BacDive section"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args()
+
+
+# A large BacDive document: every term section plus unmapped ones
+def bacdive_document(index: int, entries: int, rng: random.Random) -> dict:
+    def section() -> List[dict]:
+        return [
+            {
+                "@ref": rng.randint(1, 10**6),
+                "value": f"v{index}-{n}",
+                "score": rng.random(),
+            }
+            for n in range(entries)
+        ]
+
+    document: dict = {
+        "General": {"@ref": index, "BacDive-ID": index, "keywords": ["a", "b"]},
+        "Name and taxonomic classification": {"species": f"Species {index}"},
+        "External links": section(),
+        "Reference": section(),
+    }
+    for name in BACDIVE_SECTIONS:
+        document[name] = {"entries": section()}
+    return document
+
+
+# Reference mapping that walks TERM_MAPPING and splits its paths for every document
+def interpreted_mapping(params: list) -> dict:
+    def resolve(data: Any, path: str) -> Any:
+        for key in path.split(".") if path else []:
+            if not isinstance(data, dict):
+                return None
+            data = data.get(key)
+        return data
+
+    combined_data: dict = {}
+    for item in params:
+        for rule in TERM_MAPPING:
+            if rule["web"] != item["web"]:
+                continue
+
+            if "fields" in rule:
+                value: Any = {}
+                for name, path in rule["fields"].items():
+                    field = resolve(item.get("data"), path)
+                    if field:
+                        value[name] = field
+                    elif rule.get("require") == "all":
+                        value = None
+                        break
+            else:
+                value = resolve(item.get("data"), rule["path"])
+
+            if not value:
+                continue
+
+            section: str = rule["section"]
+            if section in combined_data:
+                combined_data[section] = merge_values(
+                    TERM_SECTION_MERGE.get(section, MergeStrategy.REPLACE),
+                    combined_data[section],
+                    value,
+                )
+            else:
+                combined_data[section] = value
+
+    return combined_data
+
+
+def throughput(
+    function: Callable[[list], dict], raws: List[list], repeat: int
+) -> float:
+    best: float = float("inf")
+    for _ in range(repeat):
+        started: float = time.perf_counter()
+        for params in raws:
+            function(params)
+        best = min(best, time.perf_counter() - started)
+    return len(raws) / best
+
+
+def main() -> None:
+    args = parse_args()
+    rng = random.Random(args.seed)
+
+    raws: List[list] = [
+        [{"web": "bacdive", "data": bacdive_document(index, args.entries, rng)}]
+        for index in range(args.documents)
+    ]
+
+    # Both mappings must agree before their speed is compared
+    for params in raws[:50]:
+        assert mapping(params) == interpreted_mapping(params)
+
+    compiled: float = throughput(mapping, raws, args.repeat)
+    interpreted: float = throughput(interpreted_mapping, raws, args.repeat)
+
+    print(f"documents:   {args.documents} BacDive, {args.entries} entries per section")
+    print(f"compiled:    {compiled:,.0f} documents/s")
+    print(f"interpreted: {interpreted:,.0f} documents/s")
+    print(f"speedup:     {compiled / interpreted:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -39,3 +39,113 @@ if not DEBUG:
 API_PREFIX = os.getenv("API_PREFIX")
 if not API_PREFIX:
     raise ValueError("API_PREFIX must be defined.")
+
+
+# Parse "source:value,source:value" settings into a per-source dict
+def parse_source_map(value: str, cast=float) -> dict:
+    result: dict = {}
+    for item in value.split(","):
+        if not item.strip():
+            continue
+        source, _, source_value = item.partition(":")
+        result[source.strip()] = cast(source_value.strip())
+    return result
+
+
+# Outbound HTTP client settings (optional)
+HTTP_CLIENT_HTTP2 = os.getenv("HTTP_CLIENT_HTTP2", "False") == "True"
+HTTP_CLIENT_TIMEOUT = float(os.getenv("HTTP_CLIENT_TIMEOUT", "30"))
+HTTP_CLIENT_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_CLIENT_KEEPALIVE_EXPIRY", "30"))
+HTTP_CLIENT_DNS_CACHE_TTL = float(os.getenv("HTTP_CLIENT_DNS_CACHE_TTL", "300"))
+HTTP_CLIENT_MAX_CONNECTIONS = parse_source_map(
+    os.getenv("HTTP_CLIENT_MAX_CONNECTIONS", "ncbi:10,gbif:20,wikidata:10,bacdive:10"),
+    int,
+)
+
+# Upstream rate limits (optional), requests per second and burst size per source
+RATE_LIMIT_PER_SECOND = parse_source_map(
+    os.getenv("RATE_LIMIT_PER_SECOND", "ncbi:3,gbif:10,wikidata:5,bacdive:5")
+)
+RATE_LIMIT_BURST = parse_source_map(
+    os.getenv("RATE_LIMIT_BURST", "ncbi:3,gbif:10,wikidata:5,bacdive:5")
+)
+
+# Adaptive (AIMD) concurrency bounds per upstream source (optional)
+ADAPTIVE_CONCURRENCY_MAX = parse_source_map(
+    os.getenv("ADAPTIVE_CONCURRENCY_MAX", "ncbi:10,gbif:20,wikidata:10,bacdive:10"),
+    int,
+)
+ADAPTIVE_CONCURRENCY_MIN = int(os.getenv("ADAPTIVE_CONCURRENCY_MIN", "1"))
+
+# Upstream retry policy and circuit breaker (optional), the breaker opens after
+# this many consecutive requests failed with their retries exhausted
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "5"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "1"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "30"))
+RETRY_AFTER_MAX = float(os.getenv("RETRY_AFTER_MAX", "120"))
+CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(
+    os.getenv("CIRCUIT_BREAKER_FAILURE_THRESHOLD", "5")
+)
+CIRCUIT_BREAKER_RESET_TIMEOUT = float(os.getenv("CIRCUIT_BREAKER_RESET_TIMEOUT", "60"))
+
+# Persistent upstream response cache (optional), TTL in seconds per source
+UPSTREAM_CACHE_ENABLED = os.getenv("UPSTREAM_CACHE_ENABLED", "True") == "True"
+UPSTREAM_CACHE_TTL = parse_source_map(
+    os.getenv(
+        "UPSTREAM_CACHE_TTL", "ncbi:604800,gbif:86400,wikidata:86400,bacdive:604800"
+    )
+)
+UPSTREAM_CACHE_MAX_BYTES = int(os.getenv("UPSTREAM_CACHE_MAX_BYTES", "1073741824"))
+
+# Negative cache for upstream not-found results (optional), TTL in seconds per source,
+# kept short so newly published records show up within hours
+NEGATIVE_CACHE_ENABLED = os.getenv("NEGATIVE_CACHE_ENABLED", "True") == "True"
+NEGATIVE_CACHE_TTL = parse_source_map(
+    os.getenv("NEGATIVE_CACHE_TTL", "ncbi:14400,gbif:3600,wikidata:3600,bacdive:14400")
+)
+
+# Route every upstream request to this base URL instead (optional), e.g. the fake upstream server
+UPSTREAM_BASE_URL = os.getenv("UPSTREAM_BASE_URL", "")
+
+# Reload operation plugins when their file changes (optional, for development)
+PLUGIN_HOT_RELOAD = os.getenv("PLUGIN_HOT_RELOAD", "False") == "True"
+
+# Concurrent store jobs (optional), in total and per source
+STORE_CONCURRENCY = int(os.getenv("STORE_CONCURRENCY", 16))
+STORE_SOURCE_CONCURRENCY = parse_source_map(
+    os.getenv("STORE_SOURCE_CONCURRENCY", "ncbi:4,gbif:8,wikidata:4,bacdive:4"), int
+)
+
+# Background jobs (optional): in-process workers, taxa per chunk, lease and polling in seconds
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 1))
+JOB_CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", 50))
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", 60))
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", 15))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 1))
+
+# Checkpointed ingest runs (optional): results written per batch of (taxon, web) pairs, slowest sources reported
+INGEST_CHECKPOINT_BATCH_SIZE = int(os.getenv("INGEST_CHECKPOINT_BATCH_SIZE", 100))
+INGEST_SLOWEST_SOURCES = int(os.getenv("INGEST_SLOWEST_SOURCES", 3))
+
+# Raws older than this are refreshed (optional), max age in seconds per source; sources not listed are always refreshed
+RAW_MAX_AGE = parse_source_map(
+    os.getenv("RAW_MAX_AGE", "ncbi:604800,gbif:604800,wikidata:604800,bacdive:604800")
+)
+
+# Compressed raw storage (optional): "none", "zlib" or "zstd" (falls back to zlib without the zstandard package)
+RAW_COMPRESSION = os.getenv("RAW_COMPRESSION", "none")
+RAW_COMPRESSION_LEVEL = int(os.getenv("RAW_COMPRESSION_LEVEL", 6))
+RAW_COMPRESSION_MIN_BYTES = int(os.getenv("RAW_COMPRESSION_MIN_BYTES", 4096))
+
+# Raws read per batch when streaming raws (optional)
+RAW_STREAM_BATCH_SIZE = int(os.getenv("RAW_STREAM_BATCH_SIZE", 100))
+
+# Portals per delete_many when deleting raws (optional)
+RAW_DELETE_BATCH_SIZE = int(os.getenv("RAW_DELETE_BATCH_SIZE", 1000))
+
+# Background term rebuild of portals whose raws changed (optional): debounce, max delay and polling in seconds
+TERM_REBUILD_ENABLED = os.getenv("TERM_REBUILD_ENABLED", "True") == "True"
+TERM_REBUILD_DEBOUNCE = float(os.getenv("TERM_REBUILD_DEBOUNCE", 5))
+TERM_REBUILD_MAX_DELAY = float(os.getenv("TERM_REBUILD_MAX_DELAY", 60))
+TERM_REBUILD_BATCH_SIZE = int(os.getenv("TERM_REBUILD_BATCH_SIZE", 200))
+TERM_REBUILD_POLL_INTERVAL = float(os.getenv("TERM_REBUILD_POLL_INTERVAL", 2))
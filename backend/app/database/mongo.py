@@ -8,6 +8,14 @@ try:
     raw_collection = database.get_collection("raws")
     term_collection = database.get_collection("terms")
     taxon_collection = database.get_collection("taxa")
+    upstream_cache_collection = database.get_collection("upstream_cache")
+    negative_cache_collection = database.get_collection("negative_cache")
+    crosswalk_collection = database.get_collection("crosswalk")
+    job_collection = database.get_collection("jobs")
+    job_item_collection = database.get_collection("job_items")
+    ingest_run_collection = database.get_collection("ingest_runs")
+    ingest_checkpoint_collection = database.get_collection("ingest_checkpoints")
+    term_dirty_collection = database.get_collection("term_dirty")
 
 except Exception as e:
     raise ConnectionError(f"Could not connect to MongoDB: {str(e)}")
@@ -1,13 +1,51 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from utils.middleware.request_log_middleware import RequestLoggingMiddleware
-from routers import taxon_router, portal_router, raw_router, term_router
+from routers import (
+    taxon_router,
+    portal_router,
+    raw_router,
+    term_router,
+    crosswalk_router,
+    job_router,
+)
 import uvicorn
 from config import HOST, PORT, API_PREFIX
 from prometheus_fastapi_instrumentator import Instrumentator
+from utils.helper.func_helper import portal_webs
+from utils.helper.http_client_helper import http_clients
+from utils.helper.plugin_helper import plugin_registry
+from services.ingest_service import ingest_runner
+from services.job_service import job_workers
+from services.term_rebuild_service import term_rebuild_worker
+
+
+# App lifespan owns the shared upstream resources
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load and validate every operation plugin once, before the first request
+    plugin_registry.load_all(portal_webs)
+
+    # Background job workers run in this process
+    job_workers.start()
+
+    # Terms of portals whose raws changed are rebuilt in the background
+    term_rebuild_worker.start()
+
+    yield
+
+    # Ingest runs still going are left incomplete, ready to be resumed
+    await ingest_runner.stop()
+    await term_rebuild_worker.stop()
+    await job_workers.stop()
+
+    # Close pooled upstream HTTP clients on shutdown
+    await http_clients.aclose()
+
 
 # Create FastAPI instance
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Middleware registration
 app.add_middleware(
@@ -27,6 +65,10 @@ app.include_router(
 app.include_router(raw_router.router, prefix=f"{API_PREFIX}/raws", tags=["raws"])
 app.include_router(term_router.router, prefix=f"{API_PREFIX}/terms", tags=["terms"])
 app.include_router(taxon_router.router, prefix=f"{API_PREFIX}/taxa", tags=["taxa"])
+app.include_router(
+    crosswalk_router.router, prefix=f"{API_PREFIX}/crosswalk", tags=["crosswalk"]
+)
+app.include_router(job_router.router, prefix=f"{API_PREFIX}/jobs", tags=["jobs"])
 
 # Instrumentator registration
 Instrumentator().instrument(app).expose(app)
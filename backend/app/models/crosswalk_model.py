@@ -0,0 +1,30 @@
+from typing import Annotated, Dict, List, Optional
+from pydantic import BaseModel, Field
+
+from models.base_custom_model import ResponseBaseModel
+
+
+# Request models
+class CrosswalkPrimeModel(BaseModel):
+    ncbi_taxon_id: List[
+        Annotated[str, Field(strict=True, min_length=1, max_length=100)]
+    ]
+    web: List[Annotated[str, Field(strict=True, min_length=1, max_length=100)]]
+    refresh: bool = False
+
+    class Config:
+        extra = "forbid"  # Forbid extra fields
+
+
+# Response models
+class CrosswalkPrimeResponseModelObject(BaseModel):
+    taxon_id: Optional[int] = None
+    ncbi_taxon_id: Optional[str] = None
+    species: Optional[str] = None
+    ids: Dict[str, Optional[str]] = {}
+    status: Optional[str] = None
+    info: Optional[str] = None
+
+
+class CrosswalkPrimeResponseModel(ResponseBaseModel):
+    data: List[CrosswalkPrimeResponseModelObject]
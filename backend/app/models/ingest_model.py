@@ -0,0 +1,48 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+from models.base_custom_model import ResponseBaseModel
+
+
+# Request models
+class IngestRunModel(BaseModel):
+    run_id: str = Field(..., min_length=1, max_length=100)
+
+    class Config:
+        extra = "forbid"  # Forbid extra fields
+
+
+# Response models
+class IngestCountsObjectModel(BaseModel):
+    total: int = 0
+    found: int = 0
+    not_found: int = 0
+    failed: int = 0
+    pending: int = 0
+
+
+class IngestSourceStatsObjectModel(BaseModel):
+    web: Optional[str] = None
+    items: int = 0
+    avg_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+
+class IngestRunResponseModelObject(BaseModel):
+    run_id: Optional[str] = None
+    run_status: Optional[str] = None
+    params: Optional[dict] = None
+    counts: Optional[IngestCountsObjectModel] = None
+    processed: int = 0
+    elapsed_seconds: float = 0.0
+    throughput: float = 0.0
+    slowest_sources: List[IngestSourceStatsObjectModel] = []
+    created_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+    status: Optional[str] = None
+    info: Optional[str] = None
+
+
+class IngestRunResponseModel(ResponseBaseModel):
+    data: IngestRunResponseModelObject
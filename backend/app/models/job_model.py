@@ -0,0 +1,67 @@
+from typing import List, Optional
+from pydantic import BaseModel, Field
+
+from models.base_custom_model import ResponseBaseModel
+
+
+# Request models
+class JobDetailModel(BaseModel):
+    job_id: str = Field(..., min_length=1, max_length=100)
+
+    class Config:
+        extra = "forbid"  # Forbid extra fields
+
+
+class JobItemsModel(BaseModel):
+    job_id: str = Field(..., min_length=1, max_length=100)
+    skip: int = Field(0, ge=0)
+    limit: int = Field(100, ge=1, le=1000)
+
+    class Config:
+        extra = "forbid"  # Forbid extra fields
+
+
+class JobCancelModel(BaseModel):
+    job_id: str = Field(..., min_length=1, max_length=100)
+
+    class Config:
+        extra = "forbid"  # Forbid extra fields
+
+
+# Response models
+class JobProgressObjectModel(BaseModel):
+    total: int = 0
+    done: int = 0
+    failed: int = 0
+
+
+class JobResponseModelObject(BaseModel):
+    job_id: Optional[str] = None
+    type: Optional[str] = None
+    job_status: Optional[str] = None
+    params: Optional[dict] = None
+    progress: Optional[JobProgressObjectModel] = None
+    error: Optional[str] = None
+    created_at: Optional[str] = None
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    status: Optional[str] = None
+    info: Optional[str] = None
+
+
+class JobResponseModel(ResponseBaseModel):
+    data: JobResponseModelObject
+
+
+class JobItemResponseModelObject(BaseModel):
+    job_id: Optional[str] = None
+    seq: Optional[int] = None
+    key: Optional[str] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    finished_at: Optional[str] = None
+    status: Optional[str] = None
+
+
+class JobItemResponseModel(ResponseBaseModel):
+    data: List[JobItemResponseModelObject]
@@ -24,6 +24,11 @@ class RawGetModel(BaseModel):
         extra = "forbid"  # Forbid extra fields
 
 
+class RawGetPageModel(RawGetModel):
+    page_size: int = Field(100, ge=1, le=1000)
+    cursor: Optional[str] = Field(None, min_length=1, max_length=1000)
+
+
 class RawStoreModel(BaseModel):
     ncbi_taxon_id: List[
         Annotated[str, Field(strict=True, min_length=1, max_length=100)]
@@ -34,6 +39,17 @@ class RawStoreModel(BaseModel):
         extra = "forbid"  # Forbid extra fields
 
 
+class RawRefreshModel(BaseModel):
+    ncbi_taxon_id: List[
+        Annotated[str, Field(strict=True, min_length=1, max_length=100)]
+    ]
+    web: List[Annotated[str, Field(strict=True, min_length=1, max_length=100)]]
+    rebuild_terms: bool = False
+
+    class Config:
+        extra = "forbid"  # Forbid extra fields
+
+
 class RawDeleteModel(BaseModel):
     ncbi_taxon_id: List[
         Annotated[str, Field(strict=True, min_length=1, max_length=100)]
@@ -76,6 +92,9 @@ class RawGetResponseModelObject(BaseModel):
     species: Optional[str] = None
     web: Optional[str] = None
     data: Optional[dict] = None
+    fetched_at: Optional[str] = None
+    content_hash: Optional[str] = None
+    source_version: Optional[str] = None
     status: Optional[str] = None
     info: Optional[str] = None
 
@@ -84,11 +103,38 @@ class RawGetResponseModel(ResponseBaseModel):
     data: list[RawGetResponseModelObject]
 
 
+class RawGetPageResponseModelObject(BaseModel):
+    items: List[RawGetResponseModelObject]
+    page_size: int
+    next_cursor: Optional[str] = None
+
+
+class RawGetPageResponseModel(ResponseBaseModel):
+    data: RawGetPageResponseModelObject
+
+
+class RawRefreshResponseModelObject(BaseModel):
+    taxon_id: Optional[int] = None
+    ncbi_taxon_id: Optional[str] = None
+    species: Optional[str] = None
+    web: Optional[str] = None
+    source_version: Optional[str] = None
+    refresh_status: Optional[str] = None
+    terms_rebuilt: bool = False
+    status: Optional[str] = None
+    info: Optional[str] = None
+
+
+class RawRefreshResponseModel(ResponseBaseModel):
+    data: List[RawRefreshResponseModelObject]
+
+
 class RawDeleteResponseModelObject(BaseModel):
     taxon_id: Optional[int] = None
     ncbi_taxon_id: Optional[str] = None
     species: Optional[str] = None
     web: Optional[str] = None
+    data: Optional[dict] = None
     status: Optional[str] = None
     info: Optional[str] = None
 
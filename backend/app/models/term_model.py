@@ -14,6 +14,7 @@ class TermGetModel(BaseModel):
 
 class TermStoreModel(BaseModel):
     ncbi_taxon_id: List[Annotated[str, Field(..., min_length=1, max_length=100)]]
+    bulk: bool = False
 
     class Config:
         extra = "forbid"  # Forbid extra fields
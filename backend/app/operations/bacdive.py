@@ -1,82 +1,114 @@
-import asyncio
+from typing import Dict, List, Optional
 from bs4 import BeautifulSoup
 import httpx
-from config import BACDIVE_EMAIL, BACDIVE_PASSWORD
-import bacdive
+from utils.helper.bacdive_helper import FETCH_BATCH_SIZE, bacdive_session
+from utils.helper.crosswalk_helper import (
+    get_source_ids,
+    resolve_source_id,
+    set_source_ids,
+)
 from utils.helper.func_helper import convert_to_string
+from utils.helper.retry_helper import send_request
 
+# Number of taxa handed to one retrieve_many call, one multi-ID fetch each
+BATCH_SIZE: int = FETCH_BATCH_SIZE
 
-# Get bacdive data
-async def retrieve(taxon: dict) -> dict:    
+
+# Resolve the BacDive ID of a taxon
+async def resolve_id(taxon: dict) -> Optional[str]:
     # Get the taxon ID from the taxon data
     ncbi_taxon_id: str = taxon["ncbi_taxon_id"]
 
-    bacdive_taxon_id: dict = {}
-
-    # Send a request to BacDive search page using the taxon ID
-    async with httpx.AsyncClient() as client:
-        retry_count: int = 0
-        while retry_count < 5:  # Retry the request up to 5 times if it fails
-            try:
-                # Send a GET request to BacDive search URL with NCBI taxon ID
-                response = await client.get(
-                    f"https://bacdive.dsmz.de/advsearch?fg%5B0%5D%5Bgc%5D=OR&fg%5B0%5D%5Bfl%5D%5B1%5D%5Bfd%5D=16S+associated+NCBI+tax+ID&fg%5B0%5D%5Bfl%5D%5B1%5D%5Bfo%5D=equal&fg%5B0%5D%5Bfl%5D%5B1%5D%5Bfv%5D={ncbi_taxon_id}&fg%5B0%5D%5Bfl%5D%5B1%5D%5Bfvd%5D=sequence_16S-tax_id-7"
-                )
-                # Raise an exception if the request was unsuccessful
-                response.raise_for_status()
+    bacdive_taxon_id: Optional[str] = None
 
-                # Parse the HTML response using BeautifulSoup
-                soup = BeautifulSoup(response.text, "html.parser")
+    try:
+        # Send a GET request to BacDive search URL with NCBI taxon ID
+        response = await send_request(
+            "bacdive",
+            "GET",
+            f"https://bacdive.dsmz.de/advsearch?fg%5B0%5D%5Bgc%5D=OR&fg%5B0%5D%5Bfl%5D%5B1%5D%5Bfd%5D=16S+associated+NCBI+tax+ID&fg%5B0%5D%5Bfl%5D%5B1%5D%5Bfo%5D=equal&fg%5B0%5D%5Bfl%5D%5B1%5D%5Bfv%5D={ncbi_taxon_id}&fg%5B0%5D%5Bfl%5D%5B1%5D%5Bfvd%5D=sequence_16S-tax_id-7",
+        )
 
-                # Find all 'a' tags and extract the URLs from the href attributes
-                links = soup.find_all("a")
-                hrefs = [link.get("href") for link in links]
+        # Parse the HTML response using BeautifulSoup
+        soup = BeautifulSoup(response.text, "html.parser")
 
-                # Extract the first strain URL and retrieve BacDive taxon ID
-                first_strain_url = next(
-                    (url for url in hrefs if url.startswith("/strain/")), None
-                )
+        # Find all 'a' tags and extract the URLs from the href attributes
+        links = soup.find_all("a")
+        hrefs = [link.get("href") or "" for link in links]
 
-                if not first_strain_url:
-                    return {}
+        # Extract the first strain URL and retrieve BacDive taxon ID
+        first_strain_url = next(
+            (url for url in hrefs if url.startswith("/strain/")), None
+        )
 
-                bacdive_taxon_id = first_strain_url.split("/")[-1]
+        if not first_strain_url:
+            return None
 
-                break  # Break out of the loop if successful
+        bacdive_taxon_id = first_strain_url.split("/")[-1]
 
-            except httpx.HTTPError:
-                # Retry after waiting for 20 seconds if an error occurs
-                print(f"Retrying after 20 seconds for {taxon['species']}")
-                await asyncio.sleep(20)
-                retry_count += 1
-                continue  # Retry if unsuccessful
+    except httpx.HTTPError:
+        # The search page failed, fall back to the species name below
+        bacdive_taxon_id = None
 
     if not bacdive_taxon_id:
-        # Get the species name from the taxon data
-        taxon_species: str = taxon["species"]
+        # Search the BacDive API by species name and use the first result
+        bacdive_ids: List[str] = await bacdive_session.search_taxonomy(taxon["species"])
+        bacdive_taxon_id = bacdive_ids[0] if bacdive_ids else None
 
-        bacdive_client = bacdive.BacdiveClient(BACDIVE_EMAIL, BACDIVE_PASSWORD)
-        bacdive_client.search(taxonomy=taxon_species)
+    return bacdive_taxon_id
 
-        # Return the retrieved data or an empty dict if no data is found
-        if not bacdive_client.retrieve():
-            return {}
 
-        # Return the first result of the retrieved data
-        return next(bacdive_client.retrieve())
+# Get bacdive data
+async def retrieve(taxon: dict) -> dict:
+    # Read the BacDive ID from the crosswalk, searching BacDive on first use
+    bacdive_taxon_id: Optional[str] = await resolve_source_id(
+        "bacdive", taxon, resolve_id
+    )
+    if not bacdive_taxon_id:
+        return {}
 
-    # Use BacDive client to search for data by BacDive taxon ID
-    bacdive_client = bacdive.BacdiveClient(BACDIVE_EMAIL, BACDIVE_PASSWORD)
-    query = {"id": bacdive_taxon_id}
-    bacdive_client.search(**query)
+    # Fetch the entry through the shared, authenticated BacDive session
+    entries: Dict[str, dict] = await bacdive_session.fetch([bacdive_taxon_id])
 
     # Return the retrieved data or an empty dict if no data is found
-    if not bacdive_client.retrieve():
-        return {}
-
-    # Return the first result of the retrieved data
-    return next(bacdive_client.retrieve())
+    return entries.get(bacdive_taxon_id) or {}
+
+
+# Get bacdive data for many taxa with multi-ID fetch calls
+async def retrieve_many(taxa: List[dict]) -> Dict[str, dict]:
+    # Known BacDive IDs come from the crosswalk, only the rest are searched
+    bacdive_taxon_ids: Dict[str, Optional[str]] = await get_source_ids(
+        "bacdive", [taxon["ncbi_taxon_id"] for taxon in taxa]
+    )
+    resolved_ids: Dict[str, str] = {}
+    for taxon in taxa:
+        if taxon["ncbi_taxon_id"] not in bacdive_taxon_ids:
+            bacdive_taxon_id: Optional[str] = await resolve_id(taxon)
+            bacdive_taxon_ids[taxon["ncbi_taxon_id"]] = bacdive_taxon_id
+            if bacdive_taxon_id:
+                resolved_ids[taxon["ncbi_taxon_id"]] = bacdive_taxon_id
+    await set_source_ids("bacdive", resolved_ids)
+
+    # Fetch all resolved entries with semicolon-separated IDs
+    entries: Dict[str, dict] = await bacdive_session.fetch(
+        [i for i in bacdive_taxon_ids.values() if i]
+    )
+
+    return {
+        ncbi_taxon_id: entries.get(bacdive_taxon_id) or {}
+        for ncbi_taxon_id, bacdive_taxon_id in bacdive_taxon_ids.items()
+    }
 
 
 async def data_processing(retrieve_data: dict) -> str:
     return convert_to_string({str(k): v for k, v in retrieve_data.items()})
+
+
+# Searchable fields of a processed strain
+async def raw_header(data: dict) -> dict:
+    taxonomy: dict = data.get("Name and taxonomic classification") or {}
+    lpsn: dict = taxonomy.get("LPSN") or {}
+    return {
+        "name": taxonomy.get("species") or lpsn.get("species"),
+        "bacdive_id": (data.get("General") or {}).get("BacDive-ID"),
+    }
@@ -1,64 +1,42 @@
-import asyncio
-import httpx
+from typing import Optional
+from utils.helper.crosswalk_helper import resolve_source_id
 from utils.helper.func_helper import convert_to_string
+from utils.helper.retry_helper import send_request
 
 
-async def retrieve(taxon: dict) -> dict:
+# Resolve the GBIF usageKey of a taxon
+async def resolve_id(taxon: dict) -> Optional[str]:
     # Construct the URL for GBIF species match API using the species name
     url: str = f'https://api.gbif.org/v1/species/match?name={taxon["species"]}'
 
-    data: dict = {}
-
-    async with httpx.AsyncClient() as client:
-        retry_count: int = 0
-        while retry_count < 5:  # Retry the request up to 5 times if it fails
-            try:
-                # Send a GET request to the GBIF species match API
-                response = await client.get(url)
-                # Raise an exception if the request was unsuccessful
-                response.raise_for_status()
-
-                # Parse the JSON response into a dictionary
-                data = response.json()
-
-                break  # Break out of the loop if successful
+    # Send a GET request to the GBIF species match API (retried by send_request)
+    response = await send_request("gbif", "GET", url)
 
-            except httpx.HTTPError:
-                # Retry after waiting for 20 seconds if an error occurs
-                await asyncio.sleep(20)
-                retry_count += 1
-                continue  # Retry if unsuccessful
+    # Parse the JSON response into a dictionary
+    data: dict = response.json()
 
     # Extract the usageKey from the data
     usage_key = data.get("usageKey")
+    return str(usage_key) if usage_key else None
+
+
+async def retrieve(taxon: dict) -> dict:
+    # Read the usageKey from the crosswalk, matching the species on first use
+    usage_key: Optional[str] = await resolve_source_id("gbif", taxon, resolve_id)
     if not usage_key:
         return {}
 
     # Construct the URL for GBIF occurrence API using the usageKey
     url: str = f"https://api.gbif.org/v1/occurrence/search?taxonKey={usage_key}"
 
-    async with httpx.AsyncClient() as client:
-        retry_count: int = 0
-        while retry_count < 5:  # Retry the request up to 5 times if it fails
-            try:
-                # Send a GET request to the GBIF occurrence API
-                response = await client.get(url)
-                # Raise an exception if the request was unsuccessful
-                response.raise_for_status()
+    # Send a GET request to the GBIF occurrence API
+    response = await send_request("gbif", "GET", url)
 
-                # Parse the JSON response into a dictionary
-                data = response.json()
-
-                break  # Break out of the loop if successful
-
-            except httpx.HTTPError:
-                # Retry after waiting for 20 seconds if an error occurs
-                await asyncio.sleep(20)
-                retry_count += 1
-                continue  # Retry if unsuccessful
+    # Parse the JSON response into a dictionary
+    data = response.json()
 
     # Return the first result if available, otherwise return an empty dictionary
-    if not data["results"][0]:
+    if not data.get("results") or not data["results"][0]:
         return {}
 
     return data["results"][0]
@@ -66,3 +44,13 @@ async def retrieve(taxon: dict) -> dict:
 
 async def data_processing(retrieve_data) -> str:
     return convert_to_string(retrieve_data)
+
+
+# Version of a processed occurrence: when GBIF last interpreted or modified it
+async def source_version(data: dict) -> Optional[str]:
+    return data.get("lastInterpreted") or data.get("modified")
+
+
+# Searchable fields of a processed occurrence
+async def raw_header(data: dict) -> dict:
+    return {"name": data.get("scientificName"), "country": data.get("countryCode")}
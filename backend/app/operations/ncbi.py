@@ -1,7 +1,31 @@
-import asyncio
+from typing import Dict, List, Optional
 import httpx
 import xmltodict
+from utils.helper.crosswalk_helper import get_source_id, set_source_id
 from utils.helper.func_helper import convert_to_string
+from utils.helper.retry_helper import send_request
+
+# NCBI E-utilities endpoints
+EFETCH_URL: str = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
+ESEARCH_URL: str = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
+
+# Number of taxon IDs sent in one efetch call
+BATCH_SIZE: int = 200
+
+
+# Resolve the NCBI taxon ID of a taxon by its species name
+async def resolve_id(taxon: dict) -> Optional[str]:
+    # Search the taxon ID by the species name
+    response = await send_request(
+        "ncbi", "GET", ESEARCH_URL, params={"db": "taxonomy", "term": taxon["species"]}
+    )
+    data: dict = xmltodict.parse(response.text)
+
+    # xmltodict returns a string for a single Id and a list for many
+    ids = ((data.get("eSearchResult") or {}).get("IdList") or {}).get("Id")
+    if isinstance(ids, list):
+        ids = ids[0] if ids else None
+    return ids or None
 
 
 # Get NCBI data
@@ -9,93 +33,48 @@ async def retrieve(taxon: dict) -> dict:
     # Get the NCBI taxon ID from the taxon data
     ncbi_taxon_id: str = taxon["ncbi_taxon_id"]
 
-    # Construct a new URL to fetch data by the extracted ID
-    url: str = (
-        f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi?db=taxonomy&id={ncbi_taxon_id}"
-    )
+    # An ID that was resolved by species name earlier is fetched directly
+    resolved_taxon_id: Optional[str] = await get_source_id("ncbi", ncbi_taxon_id)
 
     # Initialize an empty dictionary for the data
     data: dict = {}
 
-    # Create another asynchronous HTTP client session
-    async with httpx.AsyncClient() as client:
-        retry_count: int = 0
-        while retry_count < 5:  # Retry the request up to 5 times if it fails
-            try:
-                # Send a GET request to the new URL
-                response = await client.get(url)
-                # Raise an exception if the request was unsuccessful
-                response.raise_for_status()
-
-                # Parse the XML response into a dictionary
-                data = xmltodict.parse(response.text)
-                break  # Break out of the loop if successful
-            except httpx.HTTPError:
-                # Retry after waiting for 20 seconds if unsuccessful
-                await asyncio.sleep(20)
-                retry_count += 1
-                continue  # Retry if an error occurred
+    try:
+        # Fetch the taxon by its ID (retried by send_request)
+        response = await send_request(
+            "ncbi",
+            "GET",
+            EFETCH_URL,
+            params={"db": "taxonomy", "id": resolved_taxon_id or ncbi_taxon_id},
+        )
+
+        # Parse the XML response into a dictionary
+        data = xmltodict.parse(response.text)
+    except httpx.HTTPStatusError:
+        # The ID was rejected, fall back to the species name below
+        data = {}
 
     # If using the taxon ID did not return any data, try using the species name
-    if not data:
-        # Get the species name from the taxon data
-        taxon_species: str = taxon["species"]
+    if not data and not resolved_taxon_id:
+        id: Optional[str] = await resolve_id(taxon)
+        if not id:
+            return {}
 
-        # Construct a new URL to fetch data by the extracted name
-        url: str = (
-            f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi?db=taxonomy&term={taxon_species}"
-        )
+        # Remember the species resolution for later fetches
+        await set_source_id("ncbi", ncbi_taxon_id, id)
 
-        # Create another asynchronous HTTP client session
-        async with httpx.AsyncClient() as client:
-            retry_count: int = 0
-            while retry_count < 5:  # Retry the request up to 5 times if it fails
-                try:
-                    # Send a GET request to the new URL
-                    response = await client.get(url)
-                    # Raise an exception if the request was unsuccessful
-                    response.raise_for_status()
-
-                    # Parse the XML response into a dictionary
-                    data = xmltodict.parse(response.text)
-                    break  # Break out of the loop if successful
-                except httpx.HTTPError:
-                    # Retry after waiting for 20 seconds if unsuccessful
-                    await asyncio.sleep(20)
-                    retry_count += 1
-                    continue  # Retry if an error occurred
-
-        id: str = data["eSearchResult"]["IdList"]["Id"]
-
-        # Construct a new URL to fetch data by the extracted ID
-        url: str = (
-            f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi?db=taxonomy&id={id}"
+        # Fetch the taxon by the extracted ID
+        response = await send_request(
+            "ncbi", "GET", EFETCH_URL, params={"db": "taxonomy", "id": id}
         )
-
-        async with httpx.AsyncClient() as client:
-            retry_count: int = 0
-            while retry_count < 5:  # Retry the request up to 5 times if it fails
-                try:
-                    # Send a GET request to the new URL
-                    response = await client.get(url)
-                    # Raise an exception if the request was unsuccessful
-                    response.raise_for_status()
-
-                    # Parse the XML response into a dictionary
-                    data = xmltodict.parse(response.text)
-                    break  # Break out of the loop if successful
-                except httpx.HTTPError:
-                    # Retry after waiting for 20 seconds if unsuccessful
-                    await asyncio.sleep(20)
-                    retry_count += 1
-                    continue  # Retry if an error occurred
+        data = xmltodict.parse(response.text)
 
     # Check if the data is empty
     if not data:
         return {}
 
     # Ensure the response contains the expected 'Taxon' data
-    if not data["TaxaSet"]["Taxon"]:
+    if not (data.get("TaxaSet") or {}).get("Taxon"):
         return {}
 
     # Extract the 'Taxon' data
@@ -105,5 +84,64 @@ async def retrieve(taxon: dict) -> dict:
     return data
 
 
+# Get NCBI data for many taxa, one efetch call per chunk of IDs
+async def retrieve_many(taxa: List[dict]) -> Dict[str, dict]:
+    result: Dict[str, dict] = {}
+
+    # Drop duplicate IDs while keeping the request order
+    ncbi_taxon_ids: List[str] = list(
+        dict.fromkeys(taxon["ncbi_taxon_id"] for taxon in taxa)
+    )
+
+    for start in range(0, len(ncbi_taxon_ids), BATCH_SIZE):
+        chunk: List[str] = ncbi_taxon_ids[start : start + BATCH_SIZE]
+
+        # Send one efetch request with comma-separated IDs
+        response = await send_request(
+            "ncbi", "GET", EFETCH_URL, params={"db": "taxonomy", "id": ",".join(chunk)}
+        )
+
+        # Parse the XML response into a dictionary
+        data: dict = xmltodict.parse(response.text)
+
+        # Split the TaxaSet back per taxon, including merged (Aka) IDs
+        for taxon_data in split_taxa_set(data):
+            result.setdefault(taxon_data.get("TaxId"), taxon_data)
+            for aka_taxon_id in aka_taxon_ids(taxon_data):
+                result.setdefault(aka_taxon_id, taxon_data)
+
+    # Fall back to the single-taxon path (species name search) for misses
+    for taxon in taxa:
+        if taxon["ncbi_taxon_id"] not in result:
+            result[taxon["ncbi_taxon_id"]] = await retrieve(taxon)
+
+    return {ncbi_taxon_id: result[ncbi_taxon_id] for ncbi_taxon_id in ncbi_taxon_ids}
+
+
+# Return the list of Taxon entries in an efetch response
+def split_taxa_set(data: dict) -> List[dict]:
+    taxa_set = (data or {}).get("TaxaSet") or {}
+    taxa = taxa_set.get("Taxon") or []
+
+    # xmltodict returns a dict for a single Taxon and a list for many
+    return [taxa] if isinstance(taxa, dict) else taxa
+
+
+# Return the IDs that were merged into this taxon
+def aka_taxon_ids(taxon_data: dict) -> List[str]:
+    aka = (taxon_data.get("AkaTaxIds") or {}).get("TaxId") or []
+    return [aka] if isinstance(aka, str) else aka
+
+
 async def data_processing(retrieve_data) -> str:
     return convert_to_string(retrieve_data)
+
+
+# Version of a processed taxon: the date NCBI last updated the record
+async def source_version(data: dict) -> Optional[str]:
+    return data.get("UpdateDate")
+
+
+# Searchable fields of a processed taxon
+async def raw_header(data: dict) -> dict:
+    return {"name": data.get("ScientificName"), "rank": data.get("Rank")}
@@ -1,9 +1,29 @@
-import asyncio
+from typing import Dict, List, Optional
 import httpx
+from utils.helper.crosswalk_helper import (
+    get_source_ids,
+    resolve_source_id,
+    set_source_ids,
+)
 from utils.helper.func_helper import convert_to_string
+from utils.helper.retry_helper import send_request
 
+# Wikidata endpoints
+WIKIDATA_SPARQL_URL: str = "https://query.wikidata.org/sparql"
+WIKIDATA_API_URL: str = "https://www.wikidata.org/w/api.php"
 
-async def retrieve(taxon: dict) -> dict:
+# Number of taxa handed to one retrieve_many call
+BATCH_SIZE: int = 200
+
+# Number of values resolved in one SPARQL query
+SPARQL_BATCH_SIZE: int = 200
+
+# wbgetentities accepts at most 50 IDs per request
+ENTITIES_BATCH_SIZE: int = 50
+
+
+# Resolve the Wikidata entity ID (QID) of a taxon
+async def resolve_id(taxon: dict) -> Optional[str]:
     # Define the NCBI taxon ID property from Wikidata
     NCBI_TAXON_ID_CODE: str = "P685"
 
@@ -13,7 +33,7 @@ async def retrieve(taxon: dict) -> dict:
     # Construct the SPARQL query to fetch the item using the taxon ID
     query = f"""
         SELECT ?item WHERE {{
-        ?item wdt:{NCBI_TAXON_ID_CODE} "{ncbi_taxon_id}".
+        ?item wdt:{NCBI_TAXON_ID_CODE} {sparql_literal(ncbi_taxon_id)}.
         }}
     """
 
@@ -23,110 +43,214 @@ async def retrieve(taxon: dict) -> dict:
     # Initialize an empty dictionary for the data
     data: dict = {}
 
-    # Define the Wikidata SPARQL endpoint URL
-    WIKIDATA_SPARQL_URL: str = "https://query.wikidata.org/sparql"
-
-    # Send the SPARQL query using an asynchronous HTTP client
-    async with httpx.AsyncClient() as client:
-        retry_count: int = 0
-        while retry_count < 5:  # Retry the request up to 5 times
-            try:
-                # Send GET request to Wikidata SPARQL endpoint
-                response = await client.get(
-                    WIKIDATA_SPARQL_URL, params={"query": query}, headers=headers
-                )
-                response.raise_for_status()  # Raise exception if the response status is an error
-
-                # Parse the response JSON if successful
-                data = response.json()
-                break  # Exit the loop if the request was successful
-            except httpx.HTTPError:
-                # If the request fails, wait for 20 seconds and retry
-                await asyncio.sleep(20)
-                retry_count += 1
-                continue  # Retry if an error occurred
-
-    # If using the taxon ID did not return any data, try using the species name
-    if not data:
+    try:
+        # Send GET request to Wikidata SPARQL endpoint (retried by send_request)
+        response = await send_request(
+            "wikidata",
+            "GET",
+            WIKIDATA_SPARQL_URL,
+            params={"query": query},
+            headers=headers,
+        )
+
+        # Parse the response JSON if successful
+        data = response.json()
+    except httpx.HTTPStatusError:
+        # The query was rejected, fall back to the species name below
+        data = {}
+
+    # If no item carries the taxon ID, try using the species name, like the
+    # misses of retrieve_many
+    if not bindings(data):
         # Get the species name from the taxon data
         taxon_species: str = taxon["species"]
 
         # Construct the SPARQL query to fetch the item using the species name
         query = f"""
             SELECT ?item WHERE {{
-                ?item rdfs:label "{taxon_species}"@en.
+                ?item rdfs:label {sparql_literal(taxon_species)}@en.
             }}
         """
 
-        # Send the SPARQL query using an asynchronous HTTP client
-        async with httpx.AsyncClient() as client:
-            retry_count: int = 0
-            while retry_count < 5:  # Retry the request up to 5 times
-                try:
-                    # Send GET request to Wikidata SPARQL endpoint
-                    response = await client.get(
-                        WIKIDATA_SPARQL_URL, params={"query": query}, headers=headers
-                    )
-                    response.raise_for_status()  # Raise exception if the response status is an error
-
-                    # Parse the response JSON if successful
-                    data = response.json()
-                    break  # Exit the loop if the request was successful
-                except httpx.HTTPError:
-                    # If the request fails, wait for 20 seconds and retry
-                    await asyncio.sleep(20)
-                    retry_count += 1
-                    continue  # Retry if an error occurred
+        # Send GET request to Wikidata SPARQL endpoint
+        response = await send_request(
+            "wikidata",
+            "GET",
+            WIKIDATA_SPARQL_URL,
+            params={"query": query},
+            headers=headers,
+        )
 
-    # If no data was returned, return an empty dictionary
-    if not data:
-        return {}
+        # Parse the response JSON if successful
+        data = response.json()
 
-    # Check if the response contains any results, return an empty dictionary if not
-    if not data["results"]["bindings"]:
-        return {}
+    # Check if the response contains any results
+    if not bindings(data):
+        return None
 
     # Extract the entity ID from the query results
-    id: str = data["results"]["bindings"][0]["item"]["value"].split("/")[-1]
+    return bindings(data)[0]["item"]["value"].split("/")[-1] or None
+
+
+async def retrieve(taxon: dict) -> dict:
+    # Read the entity ID from the crosswalk, querying SPARQL on first use
+    id: Optional[str] = await resolve_source_id("wikidata", taxon, resolve_id)
 
     # Return an empty dictionary if the ID is empty
     if not id:
         return {}
 
-    # Construct the URL to fetch detailed data for the entity using its ID
-    url: str = (
-        f"https://www.wikidata.org/w/api.php?action=wbgetentities&format=json&ids={id}&languages=en"
+    # Send a GET request to the Wikidata API to retrieve the entity data
+    response = await send_request(
+        "wikidata",
+        "GET",
+        WIKIDATA_API_URL,
+        params={
+            "action": "wbgetentities",
+            "format": "json",
+            "ids": id,
+            "languages": "en",
+        },
     )
 
-    # Send a GET request to the Wikidata API to retrieve the entity data
-    async with httpx.AsyncClient() as client:
-        retry_count: int = 0
-        while retry_count < 5:  # Retry up to 5 times if the request fails
-            try:
-                # Send GET request to Wikidata API to fetch the entity details
-                response = await client.get(url)
-                response.raise_for_status()  # Raise exception if the response status is an error
-
-                # Parse the response as JSON
-                data = response.json()
-                break  # Exit the loop if the request was successful
-
-            except httpx.HTTPError:
-                await asyncio.sleep(20)
-                retry_count += 1
-                continue  # Retry the request
+    # Parse the response as JSON
+    data = response.json()
 
     # If no data was returned, return an empty dictionary
     if not data:
         return {}
 
     # If the entity is not found in the response, return an empty dictionary
-    if not data["entities"][id]:
+    if not data.get("entities", {}).get(id):
         return {}
 
     # Return the data fetched from Wikidata
     return data["entities"][id]
 
 
+# Get Wikidata entities for many taxa with batched SPARQL and wbgetentities calls
+async def retrieve_many(taxa: List[dict]) -> Dict[str, dict]:
+    ncbi_taxon_ids: List[str] = list(
+        dict.fromkeys(taxon["ncbi_taxon_id"] for taxon in taxa)
+    )
+
+    # Known entity IDs come from the crosswalk, only the rest are resolved
+    entity_ids: Dict[str, str] = await get_source_ids("wikidata", ncbi_taxon_ids)
+    resolved_ids: Dict[str, str] = await resolve_ids(
+        [taxon for taxon in taxa if taxon["ncbi_taxon_id"] not in entity_ids]
+    )
+
+    # Remember the new resolutions for later fetches
+    await set_source_ids("wikidata", resolved_ids)
+    entity_ids.update(resolved_ids)
+
+    # Fetch the entities in batches of up to 50 IDs
+    entities: Dict[str, dict] = {}
+    unique_entity_ids: List[str] = list(dict.fromkeys(entity_ids.values()))
+    for start in range(0, len(unique_entity_ids), ENTITIES_BATCH_SIZE):
+        chunk: List[str] = unique_entity_ids[start : start + ENTITIES_BATCH_SIZE]
+        data: dict = await get_json(
+            WIKIDATA_API_URL,
+            params={
+                "action": "wbgetentities",
+                "format": "json",
+                "ids": "|".join(chunk),
+                "languages": "en",
+            },
+        )
+        entities.update((data or {}).get("entities") or {})
+
+    return {
+        ncbi_taxon_id: entities.get(entity_ids.get(ncbi_taxon_id)) or {}
+        for ncbi_taxon_id in ncbi_taxon_ids
+    }
+
+
+# Resolve the entity IDs of many taxa with batched SPARQL queries
+async def resolve_ids(taxa: List[dict]) -> Dict[str, str]:
+    # Resolve the NCBI taxon IDs (P685) to entity IDs with VALUES blocks
+    entity_ids: Dict[str, str] = await resolve_entity_ids(
+        list(dict.fromkeys(taxon["ncbi_taxon_id"] for taxon in taxa)),
+        sparql_literal,
+        "?item wdt:P685 ?value.",
+    )
+
+    # Fall back to the species label lookup only for the misses
+    missing_taxa: List[dict] = [
+        taxon for taxon in taxa if taxon["ncbi_taxon_id"] not in entity_ids
+    ]
+    species_entity_ids: Dict[str, str] = await resolve_entity_ids(
+        list(dict.fromkeys(taxon["species"] for taxon in missing_taxa)),
+        lambda value: f"{sparql_literal(value)}@en",
+        "?item rdfs:label ?value.",
+    )
+    for taxon in missing_taxa:
+        if taxon["species"] in species_entity_ids:
+            entity_ids[taxon["ncbi_taxon_id"]] = species_entity_ids[taxon["species"]]
+
+    return entity_ids
+
+
+# Resolve values to entity IDs, one SPARQL query per chunk of values
+async def resolve_entity_ids(
+    values: List[str], to_literal, pattern: str
+) -> Dict[str, str]:
+    entity_ids: Dict[str, str] = {}
+
+    for start in range(0, len(values), SPARQL_BATCH_SIZE):
+        chunk: List[str] = values[start : start + SPARQL_BATCH_SIZE]
+        query = f"""
+            SELECT ?item ?value WHERE {{
+                VALUES ?value {{ {" ".join(to_literal(value) for value in chunk)} }}
+                {pattern}
+            }}
+        """
+
+        data: dict = await get_json(
+            WIKIDATA_SPARQL_URL,
+            params={"query": query},
+            headers={"Accept": "application/sparql-results+json"},
+        )
+
+        # Keep the first item bound to each value, like the single-taxon path
+        for binding in bindings(data):
+            entity_ids.setdefault(
+                binding["value"]["value"], binding["item"]["value"].split("/")[-1]
+            )
+
+    return entity_ids
+
+
+# Result rows of a SPARQL response, empty when the body has none
+def bindings(data: Optional[dict]) -> List[dict]:
+    return ((data or {}).get("results") or {}).get("bindings") or []
+
+
+# Send a GET request to Wikidata and parse the JSON body
+async def get_json(
+    url: str, params: Optional[dict] = None, headers: Optional[dict] = None
+) -> dict:
+    response = await send_request(
+        "wikidata", "GET", url, params=params, headers=headers
+    )
+    return response.json()
+
+
+# Quote a value as a SPARQL string literal
+def sparql_literal(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
 async def data_processing(retrieve_data) -> str:
     return convert_to_string(retrieve_data)
+
+
+# Version of a processed entity: its last revision ID
+async def source_version(data: dict) -> Optional[str]:
+    return data.get("lastrevid")
+
+
+# Searchable fields of a processed entity
+async def raw_header(data: dict) -> dict:
+    label: dict = (data.get("labels") or {}).get("en") or {}
+    return {"name": label.get("value"), "entity_id": data.get("id")}
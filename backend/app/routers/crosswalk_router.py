@@ -0,0 +1,33 @@
+from typing import List
+from fastapi import APIRouter
+from utils.helper.func_helper import handleError
+from utils.enum.status_code_enum import StatusCode
+from services.crosswalk_service import prime_crosswalk
+from utils.helper.response_helper import success_response
+from utils.enum.message_enum import ResponseMessage
+from models.crosswalk_model import (
+    CrosswalkPrimeModel,
+    CrosswalkPrimeResponseModel,
+    CrosswalkPrimeResponseModelObject,
+)
+
+router = APIRouter()
+
+
+# Resolve and store source identifiers for many taxa
+@router.post(
+    "/prime",
+    response_model=CrosswalkPrimeResponseModel,
+    status_code=StatusCode.CREATED.value,
+)
+async def prime_crosswalk_route_func(params: CrosswalkPrimeModel):
+    try:
+        data: List[CrosswalkPrimeResponseModelObject] = await prime_crosswalk(params)
+        return success_response(
+            data,
+            message=ResponseMessage.OK_CREATEORUPDATE.value,
+            status_code=StatusCode.CREATED.value,
+        )
+
+    except Exception as e:
+        return handleError(e)
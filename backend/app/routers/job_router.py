@@ -0,0 +1,125 @@
+from typing import List
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from utils.helper.func_helper import handleError
+from utils.enum.status_code_enum import StatusCode
+from utils.enum.job_enum import JobType
+from services.job_service import (
+    cancel_job,
+    get_job,
+    get_job_items,
+    stream_job_events,
+    submit_job,
+)
+from utils.helper.response_helper import success_response
+from utils.enum.message_enum import ResponseMessage
+from models.raw_model import RawStoreModel
+from models.term_model import TermStoreModel
+from models.job_model import (
+    JobCancelModel,
+    JobDetailModel,
+    JobItemResponseModel,
+    JobItemResponseModelObject,
+    JobItemsModel,
+    JobResponseModel,
+    JobResponseModelObject,
+)
+
+router = APIRouter()
+
+
+# Submit a background raws/store job
+@router.post(
+    "/raws/store", response_model=JobResponseModel, status_code=StatusCode.CREATED.value
+)
+async def submit_raws_store_job_route_func(params: RawStoreModel):
+    try:
+        data: JobResponseModelObject = await submit_job(
+            JobType.RAWS_STORE, params.dict()
+        )
+        return success_response(
+            data,
+            message=ResponseMessage.OK_CREATE.value,
+            status_code=StatusCode.CREATED.value,
+        )
+
+    except Exception as e:
+        return handleError(e)
+
+
+# Submit a background terms/create job
+@router.post(
+    "/terms/create",
+    response_model=JobResponseModel,
+    status_code=StatusCode.CREATED.value,
+)
+async def submit_terms_create_job_route_func(params: TermStoreModel):
+    try:
+        data: JobResponseModelObject = await submit_job(
+            JobType.TERMS_CREATE, params.dict()
+        )
+        return success_response(
+            data,
+            message=ResponseMessage.OK_CREATE.value,
+            status_code=StatusCode.CREATED.value,
+        )
+
+    except Exception as e:
+        return handleError(e)
+
+
+# Get job status and progress
+@router.post(
+    "/detail", response_model=JobResponseModel, status_code=StatusCode.OK.value
+)
+async def get_job_route_func(params: JobDetailModel):
+    try:
+        data: JobResponseModelObject = await get_job(params)
+        return success_response(
+            data, message=ResponseMessage.OK.value, status_code=StatusCode.OK.value
+        )
+
+    except Exception as e:
+        return handleError(e)
+
+
+# Get per-taxon results of a job
+@router.post(
+    "/items", response_model=JobItemResponseModel, status_code=StatusCode.OK.value
+)
+async def get_job_items_route_func(params: JobItemsModel):
+    try:
+        data: List[JobItemResponseModelObject] = await get_job_items(params)
+        return success_response(
+            data, message=ResponseMessage.OK_LIST.value, status_code=StatusCode.OK.value
+        )
+
+    except Exception as e:
+        return handleError(e)
+
+
+# Stream job progress and item results as Server-Sent Events
+@router.get("/events/{job_id}")
+async def stream_job_events_route_func(job_id: str):
+    return StreamingResponse(
+        stream_job_events(job_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+# Cancel a queued or running job
+@router.post(
+    "/cancel", response_model=JobResponseModel, status_code=StatusCode.OK.value
+)
+async def cancel_job_route_func(params: JobCancelModel):
+    try:
+        data: JobResponseModelObject = await cancel_job(params)
+        return success_response(
+            data,
+            message=ResponseMessage.OK_UPDATE.value,
+            status_code=StatusCode.OK.value,
+        )
+
+    except Exception as e:
+        return handleError(e)
@@ -1,21 +1,42 @@
 from typing import List
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 from utils.helper.func_helper import handleError
 from utils.enum.status_code_enum import StatusCode
-from services.raw_service import store_raw_from_portals, delete_raw_from_db, get_raw
+from services.raw_service import (
+    store_raw_from_portals,
+    delete_raw_from_db,
+    get_raw,
+    get_raw_page,
+    raw_get_webs,
+    refresh_raws,
+    stream_raws,
+)
+from services.ingest_service import get_ingest, resume_ingest, start_ingest
 from utils.helper.response_helper import success_response
 from utils.enum.message_enum import ResponseMessage
 from models.raw_model import (
     RawDeleteResponseModel,
     RawDeleteResponseModelObject,
     RawGetModel,
+    RawGetPageModel,
+    RawGetPageResponseModel,
+    RawGetPageResponseModelObject,
     RawGetResponseModel,
     RawGetResponseModelObject,
+    RawRefreshModel,
+    RawRefreshResponseModel,
+    RawRefreshResponseModelObject,
     RawStoreModel,
     RawDeleteModel,
     RawStoreResponseModel,
     RawStoreResponseModelObject,
 )
+from models.ingest_model import (
+    IngestRunModel,
+    IngestRunResponseModel,
+    IngestRunResponseModelObject,
+)
 
 router = APIRouter()
 
@@ -37,6 +58,80 @@ async def store_raw_from_portal_route_func(params: RawStoreModel):
         return handleError(e)
 
 
+# Refresh stale raws, skipping unchanged content
+@router.post(
+    "/refresh",
+    response_model=RawRefreshResponseModel,
+    status_code=StatusCode.OK.value,
+)
+async def refresh_raws_route_func(params: RawRefreshModel):
+    try:
+        data: List[RawRefreshResponseModelObject] = await refresh_raws(params)
+        return success_response(
+            data,
+            message=ResponseMessage.OK_UPDATE.value,
+            status_code=StatusCode.OK.value,
+        )
+
+    except Exception as e:
+        return handleError(e)
+
+
+# Store raw as a checkpointed ingest run, processed in the background
+@router.post(
+    "/ingest",
+    response_model=IngestRunResponseModel,
+    status_code=StatusCode.CREATED.value,
+)
+async def start_ingest_route_func(params: RawStoreModel):
+    try:
+        data: IngestRunResponseModelObject = await start_ingest(params)
+        return success_response(
+            data,
+            message=ResponseMessage.OK_CREATEORUPDATE.value,
+            status_code=StatusCode.CREATED.value,
+        )
+
+    except Exception as e:
+        return handleError(e)
+
+
+# Resume an incomplete ingest run in the background, retrying failed and pending items only
+@router.post(
+    "/ingest/resume",
+    response_model=IngestRunResponseModel,
+    status_code=StatusCode.CREATED.value,
+)
+async def resume_ingest_route_func(params: IngestRunModel):
+    try:
+        data: IngestRunResponseModelObject = await resume_ingest(params)
+        return success_response(
+            data,
+            message=ResponseMessage.OK_CREATEORUPDATE.value,
+            status_code=StatusCode.CREATED.value,
+        )
+
+    except Exception as e:
+        return handleError(e)
+
+
+# Get the summary of an ingest run
+@router.post(
+    "/ingest/detail",
+    response_model=IngestRunResponseModel,
+    status_code=StatusCode.OK.value,
+)
+async def get_ingest_route_func(params: IngestRunModel):
+    try:
+        data: IngestRunResponseModelObject = await get_ingest(params)
+        return success_response(
+            data, message=ResponseMessage.OK.value, status_code=StatusCode.OK.value
+        )
+
+    except Exception as e:
+        return handleError(e)
+
+
 # Get raw
 @router.post(
     "/get", response_model=RawGetResponseModel, status_code=StatusCode.OK.value
@@ -52,6 +147,37 @@ async def get_raw_route_func(params: RawGetModel):
         return handleError(e)
 
 
+# Stream raw as NDJSON, one record per line
+@router.post("/get/stream", status_code=StatusCode.OK.value)
+async def stream_raw_route_func(params: RawGetModel):
+    try:
+        # Reject bad parameters before the stream starts
+        raw_get_webs(params)
+        return StreamingResponse(
+            stream_raws(params), media_type="application/x-ndjson"
+        )
+
+    except Exception as e:
+        return handleError(e)
+
+
+# Get one page of raw, continue with the returned next_cursor
+@router.post(
+    "/get/page",
+    response_model=RawGetPageResponseModel,
+    status_code=StatusCode.OK.value,
+)
+async def get_raw_page_route_func(params: RawGetPageModel):
+    try:
+        data: RawGetPageResponseModelObject = await get_raw_page(params)
+        return success_response(
+            data, message=ResponseMessage.OK.value, status_code=StatusCode.OK.value
+        )
+
+    except Exception as e:
+        return handleError(e)
+
+
 # Delete raw
 @router.delete(
     "/delete", response_model=RawDeleteResponseModel, status_code=StatusCode.OK.value
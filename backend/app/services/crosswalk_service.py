@@ -0,0 +1,179 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+import httpx
+
+from models.crosswalk_model import (
+    CrosswalkPrimeModel,
+    CrosswalkPrimeResponseModelObject,
+)
+from utils.decorator.app_log_decorator import log_function
+from utils.enum.status_code_enum import StatusCode
+from utils.enum.message_enum import StatusMessage, InfoMessage
+from utils.helper.crosswalk_helper import (
+    CROSSWALK_FIELDS,
+    get_source_ids,
+    set_source_ids,
+)
+from utils.helper.func_helper import (
+    call_function,
+    checkUnsupportedWeb,
+    run_function_from_module,
+    portal_webs,
+)
+from utils.helper.plugin_helper import plugin_registry
+from utils.helper.scheduler_helper import Job, store_scheduler
+from services.retrieval_service import chunked
+from database.mongo import taxon_collection
+
+
+# Resolve the source identifiers of a batch of taxa from one web, with
+# resolve_ids when the plugin has it. Run by the scheduler.
+async def resolve_web_ids(web: str, taxa: List[dict]) -> Tuple[str, Dict[str, str]]:
+    resolve_ids = plugin_registry.hook(web, "resolve_ids")
+    if resolve_ids:
+        try:
+            resolved_ids: Dict[str, str] = await call_function(resolve_ids, taxa)
+            return web, {
+                ncbi_taxon_id: str(source_id)
+                for ncbi_taxon_id, source_id in resolved_ids.items()
+                if source_id
+            }
+        except Exception:
+            # Resolve the batch taxon by taxon, so one bad taxon does not fail the rest
+            pass
+
+    resolved_ids = {}
+    for taxon in taxa:
+        try:
+            source_id: Optional[str] = await run_function_from_module(
+                web, "resolve_id", taxon
+            )
+        except httpx.HTTPError:
+            # Source failed after retries, leave it unresolved
+            source_id = None
+
+        if source_id:
+            resolved_ids[taxon["ncbi_taxon_id"]] = str(source_id)
+
+    return web, resolved_ids
+
+
+# Resolve source identifiers for many taxa and store them in the crosswalk
+@log_function("Prime crosswalk")
+async def prime_crosswalk(
+    params: CrosswalkPrimeModel,
+) -> List[CrosswalkPrimeResponseModelObject]:
+    # prepare query parameters
+    ncbi_taxon_id_for_query: List[str] = params.ncbi_taxon_id
+    web_for_query: List[str] = params.web or portal_webs
+
+    # Check for unsupported web sources
+    unsupported_webs: List[str] = checkUnsupportedWeb(web_for_query)
+    if unsupported_webs:
+        raise Exception(
+            {
+                "data": [],
+                "message": f"Web sources not supported: {', '.join(unsupported_webs)}.",
+                "status_code": StatusCode.BAD_REQUEST.value,
+            }
+        )
+
+    query: dict = (
+        {"ncbi_taxon_id": {"$in": ncbi_taxon_id_for_query}}
+        if ncbi_taxon_id_for_query
+        else {}
+    )
+
+    # Retrieve taxa
+    taxa: List[dict] = await taxon_collection.find(query, {"_id": 0}).to_list(
+        length=None
+    )
+
+    # Determine taxa not found
+    taxa_not_found: Set[str] = set(ncbi_taxon_id_for_query) - {
+        taxon["ncbi_taxon_id"] for taxon in taxa
+    }
+
+    # Resolve every web that has a crosswalk field
+    webs: List[str] = [web for web in web_for_query if web in CROSSWALK_FIELDS]
+    ids: Dict[str, Dict[str, Optional[str]]] = {
+        taxon["ncbi_taxon_id"]: {} for taxon in taxa
+    }
+
+    jobs: List[Job] = []
+    for web in webs:
+        # Known identifiers are kept unless a refresh is requested
+        known_ids: Dict[str, str] = (
+            {} if params.refresh else await get_source_ids(web, list(ids.keys()))
+        )
+
+        unknown_taxa: List[dict] = []
+        for taxon in taxa:
+            ncbi_taxon_id: str = taxon["ncbi_taxon_id"]
+            ids[ncbi_taxon_id][web] = known_ids.get(ncbi_taxon_id)
+            if ncbi_taxon_id not in known_ids:
+                unknown_taxa.append(taxon)
+
+        # One job per batch of taxa when the plugin has resolve_ids, else per taxon
+        jobs.extend(
+            (web, resolve_web_ids, (web, chunk))
+            for chunk in chunked(
+                unknown_taxa,
+                (
+                    plugin_registry.batch_size(web)
+                    if plugin_registry.hook(web, "resolve_ids")
+                    else 1
+                ),
+            )
+        )
+
+    # Resolve through the store scheduler, so priming runs the webs concurrently
+    # within the same per-source limits as store runs
+    async for web, resolved_ids in store_scheduler.as_completed(jobs):
+        for ncbi_taxon_id, source_id in resolved_ids.items():
+            ids[ncbi_taxon_id][web] = source_id
+        await set_source_ids(web, resolved_ids)
+
+    # Prepare the result response
+    result: List[CrosswalkPrimeResponseModelObject] = []
+    for taxon in taxa:
+        taxon_ids: Dict[str, Optional[str]] = ids[taxon["ncbi_taxon_id"]]
+        resolved_count: int = sum(1 for source_id in taxon_ids.values() if source_id)
+
+        if webs and resolved_count == len(webs):
+            status, info = (
+                StatusMessage.DATA_FOUND.value,
+                InfoMessage.DATA_RETRIEVED_AND_STORED_FROM_ALL_WEB.value,
+            )
+        elif resolved_count:
+            status, info = (
+                StatusMessage.DATA_PARTIALLY_FOUND.value,
+                InfoMessage.DATA_RETRIEVED_AND_STORED_FROM_SOME_WEB.value,
+            )
+        else:
+            status, info = (
+                StatusMessage.DATA_NOT_FOUND.value,
+                InfoMessage.DATA_NOT_RETRIEVED_AND_STORED_FROM_ALL_WEB.value,
+            )
+
+        result.append(
+            CrosswalkPrimeResponseModelObject(
+                taxon_id=taxon["taxon_id"],
+                ncbi_taxon_id=taxon["ncbi_taxon_id"],
+                species=taxon["species"],
+                ids=taxon_ids,
+                status=status,
+                info=info,
+            )
+        )
+
+    result.extend(
+        CrosswalkPrimeResponseModelObject(
+            ncbi_taxon_id=ncbi_taxon_id,
+            status=StatusMessage.DATA_FAILED.value,
+            info=f"{InfoMessage.DATA_NOT_RETRIEVED_AND_STORED.value}: {InfoMessage.TAXON_NOT_EXIST.value}",
+        )
+        for ncbi_taxon_id in taxa_not_found
+    )
+
+    return result
@@ -0,0 +1,420 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from pymongo import ReturnDocument, UpdateOne
+
+from models.ingest_model import (
+    IngestCountsObjectModel,
+    IngestRunModel,
+    IngestRunResponseModelObject,
+    IngestSourceStatsObjectModel,
+)
+from models.raw_model import RawStoreModel
+from utils.decorator.app_log_decorator import appLogger, log_function
+from utils.enum.ingest_enum import CheckpointStatus, IngestRunStatus
+from utils.enum.message_enum import InfoMessage, ResponseMessage, StatusMessage
+from utils.enum.status_code_enum import StatusCode
+from utils.helper.func_helper import checkUnsupportedWeb, portal_webs
+from utils.helper.raw_helper import raw_fields
+from database.mongo import (
+    ingest_checkpoint_collection,
+    ingest_run_collection,
+    raw_collection,
+    taxon_collection,
+)
+from config import (
+    INGEST_CHECKPOINT_BATCH_SIZE,
+    INGEST_SLOWEST_SOURCES,
+    JOB_HEARTBEAT_INTERVAL,
+    JOB_LEASE_SECONDS,
+)
+from .raw_service import build_retrieval_items, raw_upsert
+from .retrieval_service import (
+    RETRIEVAL_FAILED,
+    RETRIEVAL_FOUND,
+    RetrievalItem,
+    RetrievalResult,
+    retrieve_items,
+)
+from .term_rebuild_service import mark_terms_dirty
+
+# Checkpoint statuses that are not retried on resume
+COMPLETED_CHECKPOINTS: Tuple[str, ...] = (
+    CheckpointStatus.FOUND.value,
+    CheckpointStatus.NOT_FOUND.value,
+)
+
+
+# Info message of a run in each status
+RUN_STATUS_INFO: Dict[str, str] = {
+    IngestRunStatus.RUNNING.value: InfoMessage.INGEST_RUNNING.value,
+    IngestRunStatus.COMPLETED.value: InfoMessage.INGEST_COMPLETED.value,
+    IngestRunStatus.INCOMPLETE.value: InfoMessage.INGEST_INCOMPLETE.value,
+}
+
+
+def checkpoint_status(result: RetrievalResult) -> str:
+    if result.status == RETRIEVAL_FOUND:
+        return CheckpointStatus.FOUND.value
+    if result.status == RETRIEVAL_FAILED:
+        return CheckpointStatus.FAILED.value
+    return CheckpointStatus.NOT_FOUND.value
+
+
+# Counts and slowest sources of a run, from its checkpoints
+async def summarize_run(run: dict) -> Tuple[IngestCountsObjectModel, list]:
+    counts: dict = {status.value: 0 for status in CheckpointStatus}
+    async for row in ingest_checkpoint_collection.aggregate(
+        [
+            {"$match": {"run_id": run["run_id"]}},
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+        ]
+    ):
+        counts[row["_id"]] = row["count"]
+
+    total: int = run.get("total", 0)
+    checkpointed: int = sum(counts.values())
+
+    sources: List[dict] = await ingest_checkpoint_collection.aggregate(
+        [
+            {"$match": {"run_id": run["run_id"]}},
+            {
+                "$group": {
+                    "_id": "$web",
+                    "items": {"$sum": 1},
+                    "avg_seconds": {"$avg": "$elapsed"},
+                    "max_seconds": {"$max": "$elapsed"},
+                }
+            },
+            {"$sort": {"avg_seconds": -1}},
+            {"$limit": INGEST_SLOWEST_SOURCES},
+        ]
+    ).to_list(length=None)
+
+    return (
+        IngestCountsObjectModel(
+            total=total, **counts, pending=max(total - checkpointed, 0)
+        ),
+        [
+            IngestSourceStatsObjectModel(
+                web=source["_id"],
+                items=source["items"],
+                avg_seconds=round(source["avg_seconds"] or 0.0, 4),
+                max_seconds=round(source["max_seconds"] or 0.0, 4),
+            )
+            for source in sources
+        ],
+    )
+
+
+async def run_response(run: dict) -> IngestRunResponseModelObject:
+    counts, slowest_sources = await summarize_run(run)
+    last: dict = run.get("last", {})
+
+    return IngestRunResponseModelObject(
+        run_id=run["run_id"],
+        run_status=run["status"],
+        params=run["params"],
+        counts=counts,
+        processed=last.get("processed", 0),
+        elapsed_seconds=last.get("elapsed_seconds", 0.0),
+        throughput=last.get("throughput", 0.0),
+        error=run.get("error"),
+        slowest_sources=slowest_sources,
+        created_at=run["created_at"].isoformat(),
+        finished_at=run["finished_at"].isoformat() if run.get("finished_at") else None,
+        status=(
+            StatusMessage.DATA_FAILED.value
+            if run["status"] == IngestRunStatus.INCOMPLETE.value
+            else StatusMessage.DATA_SUCCESS.value
+        ),
+        info=RUN_STATUS_INFO[run["status"]],
+    )
+
+
+async def find_run(run_id: str) -> dict:
+    run: Optional[dict] = await ingest_run_collection.find_one(
+        {"run_id": run_id}, {"_id": 0}
+    )
+    if not run:
+        raise Exception(
+            {
+                "data": {"run_id": run_id},
+                "message": f"{ResponseMessage.ERR_NOT_FOUND.value}: {InfoMessage.INGEST_RUN_NOT_EXIST.value}",
+                "status_code": StatusCode.NOT_FOUND.value,
+            }
+        )
+    return run
+
+
+# Lease fields of a run executed by owner, renewed while it runs
+def ingest_lease(owner: str) -> dict:
+    return {
+        "lease_owner": owner,
+        "lease_expires_at": datetime.utcnow() + timedelta(seconds=JOB_LEASE_SECONDS),
+    }
+
+
+# Renew the lease of a run, and stop it when another process took it over
+async def renew_ingest_lease(run: dict, task: asyncio.Task) -> None:
+    while True:
+        await asyncio.sleep(JOB_HEARTBEAT_INTERVAL)
+        try:
+            renewed: Optional[dict] = await ingest_run_collection.find_one_and_update(
+                {"run_id": run["run_id"], "lease_owner": run["lease_owner"]},
+                {"$set": ingest_lease(run["lease_owner"])},
+                projection={"_id": 1},
+            )
+        except Exception as e:
+            appLogger.error(f"Ingest run {run['run_id']} failed to renew lease: {e}")
+            continue
+
+        if not renewed:
+            task.cancel()
+            return
+
+
+# Retrieve the run's pending and failed pairs, checkpointing each batch of results.
+# The run must be RUNNING and leased to run["lease_owner"].
+async def run_ingest(run: dict) -> None:
+    started: float = time.perf_counter()
+    processed: int = 0
+
+    raw_operations: List[UpdateOne] = []
+    raw_portal_ids: List[int] = []
+    checkpoint_operations: List[UpdateOne] = []
+
+    # Raws are written before their checkpoints, so a checkpoint implies the raw exists
+    async def flush() -> None:
+        if raw_operations:
+            await raw_collection.bulk_write(raw_operations, ordered=False)
+            await mark_terms_dirty(raw_portal_ids)
+        if checkpoint_operations:
+            await ingest_checkpoint_collection.bulk_write(
+                checkpoint_operations, ordered=False
+            )
+        raw_operations.clear()
+        raw_portal_ids.clear()
+        checkpoint_operations.clear()
+
+    # Record how far the run got, and the error that stopped it if any.
+    # Only the lease owner may finish the run.
+    async def finish(status: str, error: Optional[str] = None) -> None:
+        elapsed: float = time.perf_counter() - started
+        await ingest_run_collection.update_one(
+            {"run_id": run["run_id"], "lease_owner": run["lease_owner"]},
+            {
+                "$set": {
+                    "status": status,
+                    "error": error,
+                    "finished_at": datetime.utcnow(),
+                    "last": {
+                        "processed": processed,
+                        "elapsed_seconds": round(elapsed, 4),
+                        "throughput": round(processed / elapsed, 4) if elapsed else 0.0,
+                    },
+                },
+                "$unset": {"lease_owner": "", "lease_expires_at": ""},
+            },
+        )
+
+    heartbeat = asyncio.create_task(renew_ingest_lease(run, asyncio.current_task()))
+    try:
+        taxa: List[dict] = await taxon_collection.find(
+            {"ncbi_taxon_id": {"$in": run["ncbi_taxon_ids"]}}, {"_id": 0}
+        ).to_list(length=None)
+        items: List[RetrievalItem] = await build_retrieval_items(
+            taxa, run["params"]["web"] or portal_webs
+        )
+
+        # Pairs completed by an earlier attempt are skipped
+        completed: Set[Tuple[str, str]] = {
+            (checkpoint["ncbi_taxon_id"], checkpoint["web"])
+            async for checkpoint in ingest_checkpoint_collection.find(
+                {
+                    "run_id": run["run_id"],
+                    "status": {"$in": list(COMPLETED_CHECKPOINTS)},
+                },
+                {"_id": 0, "ncbi_taxon_id": 1, "web": 1},
+            )
+        }
+        pending: List[RetrievalItem] = [
+            item
+            for item in items
+            if (item.taxon["ncbi_taxon_id"], item.web) not in completed
+        ]
+
+        await ingest_run_collection.update_one(
+            {"run_id": run["run_id"], "lease_owner": run["lease_owner"]},
+            {"$set": {"total": len(items), "started_at": datetime.utcnow()}},
+        )
+
+        async for result in retrieve_items(pending, process=True):
+            if result.status == RETRIEVAL_FOUND:
+                raw_operations.append(
+                    raw_upsert(
+                        result.item.portal["portal_id"],
+                        result.item.web,
+                        await raw_fields(result.item.web, result.processed),
+                    )
+                )
+                raw_portal_ids.append(result.item.portal["portal_id"])
+            checkpoint_operations.append(
+                UpdateOne(
+                    {
+                        "run_id": run["run_id"],
+                        "ncbi_taxon_id": result.item.taxon["ncbi_taxon_id"],
+                        "web": result.item.web,
+                    },
+                    {
+                        "$set": {
+                            "status": checkpoint_status(result),
+                            "elapsed": result.elapsed,
+                            "finished_at": datetime.utcnow(),
+                        },
+                        "$inc": {"attempts": 1},
+                    },
+                    upsert=True,
+                )
+            )
+            processed += 1
+
+            if len(checkpoint_operations) >= INGEST_CHECKPOINT_BATCH_SIZE:
+                await flush()
+
+        await flush()
+
+        counts, _ = await summarize_run({**run, "total": len(items)})
+        await finish(
+            IngestRunStatus.COMPLETED.value
+            if not counts.failed and not counts.pending
+            else IngestRunStatus.INCOMPLETE.value
+        )
+    except BaseException as e:
+        # Keep the results gathered so far, and leave the run resumable
+        try:
+            await flush()
+        except Exception as flush_error:
+            appLogger.error(
+                f"Ingest run {run['run_id']} failed to flush: {flush_error}"
+            )
+        try:
+            await finish(IngestRunStatus.INCOMPLETE.value, str(e) or type(e).__name__)
+        except Exception as finish_error:
+            appLogger.error(
+                f"Ingest run {run['run_id']} failed to finish: {finish_error}"
+            )
+        raise
+    finally:
+        heartbeat.cancel()
+
+
+# Runs ingests in the background of this process, so they outlive the request
+# that started them. Stopping cancels them, which leaves them incomplete.
+class IngestRunner:
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def start(self, run: dict) -> None:
+        task = asyncio.create_task(self._run(run))
+        self._tasks[run["run_id"]] = task
+        task.add_done_callback(lambda _: self._tasks.pop(run["run_id"], None))
+
+    async def stop(self) -> None:
+        tasks: List[asyncio.Task] = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, run: dict) -> None:
+        try:
+            await run_ingest(run)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            appLogger.error(f"Ingest run {run['run_id']} failed: {e}")
+
+
+ingest_runner = IngestRunner()
+
+
+# Start a checkpointed ingest run of raws from portals, in the background
+@log_function("Start ingest run")
+async def start_ingest(params: RawStoreModel) -> IngestRunResponseModelObject:
+    # Check for unsupported web sources
+    unsupported_webs: List[str] = checkUnsupportedWeb(params.web)
+    if unsupported_webs:
+        raise Exception(
+            {
+                "data": [],
+                "message": f"Web sources not supported: {', '.join(unsupported_webs)}.",
+                "status_code": StatusCode.BAD_REQUEST.value,
+            }
+        )
+
+    # An empty ncbi_taxon_id list means every taxon, fixed when the run starts
+    ncbi_taxon_ids: List[str] = list(
+        dict.fromkeys(params.ncbi_taxon_id)
+    ) or await taxon_collection.distinct("ncbi_taxon_id")
+
+    run: dict = {
+        "run_id": uuid.uuid4().hex,
+        "params": params.dict(),
+        "ncbi_taxon_ids": ncbi_taxon_ids,
+        "status": IngestRunStatus.RUNNING.value,
+        "created_at": datetime.utcnow(),
+        **ingest_lease(uuid.uuid4().hex),
+    }
+    await ingest_run_collection.insert_one(run)
+    ingest_runner.start(run)
+
+    return await run_response(run)
+
+
+# Resume an ingest run in the background, retrying only its failed and pending pairs
+@log_function("Resume ingest run")
+async def resume_ingest(params: IngestRunModel) -> IngestRunResponseModelObject:
+    # Only incomplete runs, or running ones whose process stopped renewing the
+    # lease, are taken over, atomically so a run never has two writers
+    run: Optional[dict] = await ingest_run_collection.find_one_and_update(
+        {
+            "run_id": params.run_id,
+            "$or": [
+                {"status": IngestRunStatus.INCOMPLETE.value},
+                {
+                    "status": IngestRunStatus.RUNNING.value,
+                    "lease_expires_at": {"$not": {"$gte": datetime.utcnow()}},
+                },
+            ],
+        },
+        {
+            "$set": {
+                "status": IngestRunStatus.RUNNING.value,
+                "error": None,
+                **ingest_lease(uuid.uuid4().hex),
+            }
+        },
+        return_document=ReturnDocument.AFTER,
+    )
+    if not run:
+        run = await find_run(params.run_id)
+        raise Exception(
+            {
+                "data": {"run_id": params.run_id, "run_status": run["status"]},
+                "message": f"{ResponseMessage.ERR_CONFLICT.value}: {InfoMessage.INGEST_NOT_RESUMABLE.value}",
+                "status_code": StatusCode.CONFLICT.value,
+            }
+        )
+
+    ingest_runner.start(run)
+
+    return await run_response(run)
+
+
+# Summary of an ingest run
+@log_function("Get ingest run")
+async def get_ingest(params: IngestRunModel) -> IngestRunResponseModelObject:
+    return await run_response(await find_run(params.run_id))
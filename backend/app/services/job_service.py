@@ -0,0 +1,457 @@
+import asyncio
+import json
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from pymongo import ReturnDocument, UpdateOne
+
+from models.job_model import (
+    JobCancelModel,
+    JobDetailModel,
+    JobItemResponseModelObject,
+    JobItemsModel,
+    JobResponseModelObject,
+)
+from models.raw_model import RawStoreModel
+from models.term_model import TermStoreModel
+from utils.decorator.app_log_decorator import appLogger, log_function
+from utils.enum.job_enum import JobStatus, JobType
+from utils.enum.message_enum import InfoMessage, ResponseMessage, StatusMessage
+from utils.enum.status_code_enum import StatusCode
+from utils.helper.func_helper import checkUnsupportedWeb
+from database.mongo import job_collection, job_item_collection, taxon_collection
+from config import (
+    JOB_CHUNK_SIZE,
+    JOB_HEARTBEAT_INTERVAL,
+    JOB_LEASE_SECONDS,
+    JOB_POLL_INTERVAL,
+    JOB_WORKERS,
+)
+from .raw_service import store_raw_from_portals
+from .term_service import store_raw_to_terms
+
+# Job states that will not change any more
+FINISHED_STATUSES = (
+    JobStatus.SUCCEEDED.value,
+    JobStatus.FAILED.value,
+    JobStatus.CANCELLED.value,
+)
+
+
+# Run one chunk of taxa of a raws/store job
+async def run_raws_store_chunk(params: dict, ncbi_taxon_ids: List[str]) -> List[dict]:
+    results = await store_raw_from_portals(
+        RawStoreModel(ncbi_taxon_id=ncbi_taxon_ids, web=params.get("web") or [])
+    )
+    return [result.dict() for result in results]
+
+
+# Run one chunk of taxa of a terms/create job
+async def run_terms_create_chunk(params: dict, ncbi_taxon_ids: List[str]) -> List[dict]:
+    results = await store_raw_to_terms(
+        TermStoreModel(ncbi_taxon_id=ncbi_taxon_ids, bulk=params.get("bulk", False))
+    )
+    return [result.dict() for result in results]
+
+
+JOB_HANDLERS: Dict[str, Callable[[dict, List[str]], Awaitable[List[dict]]]] = {
+    JobType.RAWS_STORE.value: run_raws_store_chunk,
+    JobType.TERMS_CREATE.value: run_terms_create_chunk,
+}
+
+
+def isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def job_response(
+    job: dict, status: str = StatusMessage.DATA_SUCCESS.value, info: str = ""
+) -> JobResponseModelObject:
+    return JobResponseModelObject(
+        job_id=job["job_id"],
+        type=job["type"],
+        job_status=job["status"],
+        params=job["params"],
+        progress=job["progress"],
+        error=job.get("error"),
+        created_at=isoformat(job.get("created_at")),
+        started_at=isoformat(job.get("started_at")),
+        finished_at=isoformat(job.get("finished_at")),
+        status=status,
+        info=info or InfoMessage.DATA_RETRIEVED.value,
+    )
+
+
+def job_not_found_error(job_id: str) -> Exception:
+    return Exception(
+        {
+            "data": {"job_id": job_id},
+            "message": f"{ResponseMessage.ERR_NOT_FOUND.value}: {InfoMessage.JOB_NOT_EXIST.value}",
+            "status_code": StatusCode.NOT_FOUND.value,
+        }
+    )
+
+
+# Queue a job and return immediately, a worker picks it up
+@log_function("Submit job")
+async def submit_job(job_type: JobType, params: dict) -> JobResponseModelObject:
+    # Check for unsupported web sources before queueing
+    unsupported_webs: List[str] = checkUnsupportedWeb(params.get("web") or [])
+    if unsupported_webs:
+        raise Exception(
+            {
+                "data": [],
+                "message": f"Web sources not supported: {', '.join(unsupported_webs)}.",
+                "status_code": StatusCode.BAD_REQUEST.value,
+            }
+        )
+
+    # An empty ncbi_taxon_id list means every taxon, fixed at submission time
+    ncbi_taxon_ids: List[str] = list(
+        dict.fromkeys(params.get("ncbi_taxon_id") or [])
+    ) or await taxon_collection.distinct("ncbi_taxon_id")
+
+    job: dict = {
+        "job_id": uuid.uuid4().hex,
+        "type": job_type.value,
+        "status": JobStatus.QUEUED.value,
+        "params": params,
+        "ncbi_taxon_ids": ncbi_taxon_ids,
+        "progress": {"total": len(ncbi_taxon_ids), "done": 0, "failed": 0},
+        "cancel_requested": False,
+        "created_at": datetime.utcnow(),
+    }
+    await job_collection.insert_one(job)
+
+    return job_response(job, info=InfoMessage.JOB_SUBMITTED.value)
+
+
+@log_function("Get job")
+async def get_job(params: JobDetailModel) -> JobResponseModelObject:
+    job: Optional[dict] = await job_collection.find_one(
+        {"job_id": params.job_id}, {"_id": 0, "ncbi_taxon_ids": 0}
+    )
+    if not job:
+        raise job_not_found_error(params.job_id)
+
+    return job_response(job)
+
+
+@log_function("Get job items")
+async def get_job_items(params: JobItemsModel) -> List[JobItemResponseModelObject]:
+    items: List[dict] = (
+        await job_item_collection.find({"job_id": params.job_id}, {"_id": 0})
+        .sort("seq", 1)
+        .skip(params.skip)
+        .limit(params.limit)
+        .to_list(length=None)
+    )
+
+    return [
+        JobItemResponseModelObject(
+            **{**item, "finished_at": isoformat(item.get("finished_at"))}
+        )
+        for item in items
+    ]
+
+
+@log_function("Cancel job")
+async def cancel_job(params: JobCancelModel) -> JobResponseModelObject:
+    # A queued job is cancelled right away
+    job: Optional[dict] = await job_collection.find_one_and_update(
+        {"job_id": params.job_id, "status": JobStatus.QUEUED.value},
+        {
+            "$set": {
+                "status": JobStatus.CANCELLED.value,
+                "cancel_requested": True,
+                "finished_at": datetime.utcnow(),
+            }
+        },
+        projection={"ncbi_taxon_ids": 0},
+        return_document=ReturnDocument.AFTER,
+    )
+
+    # A running job is stopped by its worker at the next heartbeat
+    if not job:
+        job = await job_collection.find_one_and_update(
+            {"job_id": params.job_id, "status": JobStatus.RUNNING.value},
+            {"$set": {"cancel_requested": True}},
+            projection={"ncbi_taxon_ids": 0},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    if job:
+        return job_response(job, info=InfoMessage.JOB_CANCEL_REQUESTED.value)
+
+    job = await job_collection.find_one(
+        {"job_id": params.job_id}, {"_id": 0, "ncbi_taxon_ids": 0}
+    )
+    if not job:
+        raise job_not_found_error(params.job_id)
+
+    return job_response(
+        job, StatusMessage.DATA_FAILED.value, InfoMessage.JOB_ALREADY_FINISHED.value
+    )
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+# Server-Sent Events with the job's progress and new item results until it finishes
+async def stream_job_events(job_id: str) -> AsyncIterator[str]:
+    last_seq: int = -1
+    last_progress: Optional[dict] = None
+
+    while True:
+        job: Optional[dict] = await job_collection.find_one(
+            {"job_id": job_id}, {"_id": 0, "ncbi_taxon_ids": 0, "params": 0}
+        )
+        if not job:
+            yield sse_event(
+                "error", {"job_id": job_id, "info": InfoMessage.JOB_NOT_EXIST.value}
+            )
+            return
+
+        async for item in job_item_collection.find(
+            {"job_id": job_id, "seq": {"$gt": last_seq}}, {"_id": 0}
+        ).sort("seq", 1):
+            last_seq = item["seq"]
+            yield sse_event("item", item)
+
+        progress: dict = {**job["progress"], "job_status": job["status"]}
+        if progress != last_progress:
+            last_progress = progress
+            yield sse_event("progress", {"job_id": job_id, **progress})
+
+        if job["status"] in FINISHED_STATUSES:
+            yield sse_event(
+                "end",
+                {
+                    "job_id": job_id,
+                    "job_status": job["status"],
+                    "error": job.get("error"),
+                },
+            )
+            return
+
+        await asyncio.sleep(JOB_POLL_INTERVAL)
+
+
+# Claims queued (or abandoned) jobs and runs them chunk by chunk under a lease
+class JobWorker:
+    def __init__(self, worker_id: str):
+        self.worker_id = worker_id
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _claim(self) -> Optional[dict]:
+        now: datetime = datetime.utcnow()
+
+        # Queued jobs, or running jobs whose worker stopped renewing its lease
+        return await job_collection.find_one_and_update(
+            {
+                "$or": [
+                    {"status": JobStatus.QUEUED.value},
+                    {
+                        "status": JobStatus.RUNNING.value,
+                        "lease_expires_at": {"$lt": now},
+                    },
+                ]
+            },
+            {
+                "$set": {
+                    "status": JobStatus.RUNNING.value,
+                    "lease_owner": self.worker_id,
+                    "lease_expires_at": now + timedelta(seconds=JOB_LEASE_SECONDS),
+                    "heartbeat_at": now,
+                },
+                "$min": {"started_at": now},
+            },
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _run(self) -> None:
+        while True:
+            job: Optional[dict] = None
+            try:
+                job = await self._claim()
+                if job:
+                    await self._execute(job)
+                    continue
+            # A failed claim or status write must not stop the worker
+            except Exception as e:
+                appLogger.error(f"Job worker {self.worker_id} failed: {e}")
+                if job:
+                    await self._release(job)
+
+            await asyncio.sleep(JOB_POLL_INTERVAL)
+
+    # Expire the lease of a job this worker could not finish, so it is claimed again
+    async def _release(self, job: dict) -> None:
+        try:
+            await job_collection.update_one(
+                {"job_id": job["job_id"], "lease_owner": self.worker_id},
+                {"$set": {"lease_expires_at": datetime.utcnow()}},
+            )
+        except Exception as e:
+            appLogger.error(f"Job worker {self.worker_id} failed to release: {e}")
+
+    async def _execute(self, job: dict) -> None:
+        process = asyncio.create_task(self._process(job))
+        cancelled = asyncio.Event()
+        heartbeat = asyncio.create_task(self._heartbeat(job, process, cancelled))
+
+        status: str = JobStatus.SUCCEEDED.value
+        error: Optional[str] = None
+        try:
+            await process
+        except asyncio.CancelledError:
+            # Worker shutdown: leave the job running so its lease expires and
+            # another worker resumes it
+            if not cancelled.is_set():
+                process.cancel()
+                raise
+            status = JobStatus.CANCELLED.value
+        except Exception as e:
+            status, error = JobStatus.FAILED.value, str(e)
+        finally:
+            heartbeat.cancel()
+
+        # Only the lease owner may finish the job
+        await job_collection.update_one(
+            {"job_id": job["job_id"], "lease_owner": self.worker_id},
+            {
+                "$set": {
+                    "status": status,
+                    "error": error,
+                    "finished_at": datetime.utcnow(),
+                },
+                "$unset": {"lease_owner": "", "lease_expires_at": ""},
+            },
+        )
+
+    # Renew the lease, and stop processing on cancellation or a lost lease
+    async def _heartbeat(
+        self, job: dict, process: asyncio.Task, cancelled: asyncio.Event
+    ) -> None:
+        while True:
+            await asyncio.sleep(JOB_HEARTBEAT_INTERVAL)
+            now: datetime = datetime.utcnow()
+            current: Optional[dict] = await job_collection.find_one_and_update(
+                {"job_id": job["job_id"], "lease_owner": self.worker_id},
+                {
+                    "$set": {
+                        "heartbeat_at": now,
+                        "lease_expires_at": now + timedelta(seconds=JOB_LEASE_SECONDS),
+                    }
+                },
+                projection={"cancel_requested": 1},
+                return_document=ReturnDocument.AFTER,
+            )
+            if not current or current.get("cancel_requested"):
+                cancelled.set()
+                process.cancel()
+                return
+
+    async def _process(self, job: dict) -> None:
+        handler = JOB_HANDLERS[job["type"]]
+
+        # Items finished before a crash or lease takeover are not run again
+        done_keys = set(
+            await job_item_collection.distinct("key", {"job_id": job["job_id"]})
+        )
+        seq: int = len(done_keys)
+
+        pending: List[str] = [
+            ncbi_taxon_id
+            for ncbi_taxon_id in job["ncbi_taxon_ids"]
+            if ncbi_taxon_id not in done_keys
+        ]
+
+        for start in range(0, len(pending), JOB_CHUNK_SIZE):
+            chunk: List[str] = pending[start : start + JOB_CHUNK_SIZE]
+
+            try:
+                results: List[dict] = await handler(job["params"], chunk)
+                items: List[dict] = [
+                    {
+                        "key": result.get("ncbi_taxon_id"),
+                        "result": result,
+                        "status": result.get("status"),
+                    }
+                    for result in results
+                ]
+            except Exception as e:
+                # Record the failure per item and carry on with the next chunk
+                items = [
+                    {
+                        "key": ncbi_taxon_id,
+                        "error": str(e),
+                        "status": StatusMessage.DATA_FAILED.value,
+                    }
+                    for ncbi_taxon_id in chunk
+                ]
+
+            now: datetime = datetime.utcnow()
+            operations: List[UpdateOne] = []
+            for item in items:
+                operations.append(
+                    UpdateOne(
+                        {"job_id": job["job_id"], "key": item["key"]},
+                        {
+                            "$setOnInsert": {
+                                "job_id": job["job_id"],
+                                "seq": seq,
+                                **item,
+                                "finished_at": now,
+                            }
+                        },
+                        upsert=True,
+                    )
+                )
+                seq += 1
+
+            if operations:
+                await job_item_collection.bulk_write(operations, ordered=False)
+
+            failed: int = sum(
+                1 for item in items if item["status"] == StatusMessage.DATA_FAILED.value
+            )
+            await job_collection.update_one(
+                {"job_id": job["job_id"]},
+                {"$inc": {"progress.done": len(items), "progress.failed": failed}},
+            )
+
+
+class JobWorkerPool:
+    def __init__(self, size: int):
+        prefix: str = f"{socket.gethostname()}-{os.getpid()}"
+        self.workers: List[JobWorker] = [
+            JobWorker(f"{prefix}-{index}") for index in range(size)
+        ]
+
+    def start(self) -> None:
+        for worker in self.workers:
+            worker.start()
+
+    async def stop(self) -> None:
+        for worker in self.workers:
+            await worker.stop()
+
+
+job_workers = JobWorkerPool(JOB_WORKERS)
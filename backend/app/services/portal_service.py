@@ -16,12 +16,20 @@ from models.portal_model import (
 from utils.decorator.app_log_decorator import log_function
 from utils.helper.func_helper import (
     checkUnsupportedWeb,
-    run_function_from_module,
     portal_webs,
 )
 from database.mongo import client, portal_collection, taxon_collection, raw_collection
 from utils.enum.status_code_enum import StatusCode
 from utils.enum.message_enum import ResponseMessage, StatusMessage, InfoMessage
+from .retrieval_service import (
+    RETRIEVAL_FAILED,
+    RETRIEVAL_FOUND,
+    RETRIEVAL_NOT_FOUND,
+    RETRIEVAL_NOT_FOUND_CACHED,
+    RetrievalItem,
+    RetrievalResult,
+    retrieve_item,
+)
 
 
 @log_function("Create portal")
@@ -335,32 +343,27 @@ async def retrieve_data(
             }
         )
 
-    async with await client.start_session() as session:
-        async with session.start_transaction():
+    # fetch taxon from database
+    taxon: dict = await taxon_collection.find_one(
+        {"ncbi_taxon_id": ncbi_taxon_id_for_query}, {"_id": 0}
+    )
 
-            # fetch taxon from database
-            taxon: dict = await taxon_collection.find_one(
-                {"ncbi_taxon_id": ncbi_taxon_id_for_query}, {"_id": 0}, session=session
-            )
+    # Return not found message if taxon not found
+    if not taxon:
+        return PortalRetrieveDataResponseModelObject(
+            portal_id=None,
+            taxon_id=None,
+            web=web_for_query,
+            data={},
+            status=StatusMessage.DATA_FAILED.value,
+            info=f"{InfoMessage.DATA_NOT_RETRIEVED.value}: {InfoMessage.TAXON_NOT_EXIST.value}",
+        )
+
+    # fetch portal from database
+    portal: dict = await portal_collection.find_one(
+        {"taxon_id": taxon.get("taxon_id"), "web": web_for_query}, {"_id": 0}
+    )
 
-            # Return not found message if taxon not found
-            if not taxon:
-                return PortalRetrieveDataResponseModelObject(
-                    portal_id=None,
-                    taxon_id=None,
-                    web=web_for_query,
-                    data={},
-                    status=StatusMessage.DATA_FAILED.value,
-                    info=f"{InfoMessage.DATA_NOT_RETRIEVED.value}: {InfoMessage.TAXON_NOT_EXIST.value}",
-                )
-
-            # fetch portal from database
-            portal: dict = await portal_collection.find_one(
-                {"taxon_id": taxon.get("taxon_id"), "web": web_for_query},
-                {"_id": 0},
-                session=session,
-            )
-    
     # Return not found message if portal not found
     if not portal:
         return PortalRetrieveDataResponseModelObject(
@@ -371,21 +374,36 @@ async def retrieve_data(
             status=StatusMessage.DATA_FAILED.value,
             info=f"{InfoMessage.DATA_NOT_RETRIEVED.value}: {InfoMessage.PORTAL_NOT_EXIST.value}",
         )
-    
-    # Return data if found
+
+    # Retrieve through the same batch path as raws/store
+    result: RetrievalResult = await retrieve_item(
+        RetrievalItem(taxon, portal, web_for_query)
+    )
+
+    status, info = {
+        RETRIEVAL_FOUND: (
+            StatusMessage.DATA_SUCCESS.value,
+            InfoMessage.DATA_RETRIEVED.value,
+        ),
+        RETRIEVAL_NOT_FOUND: (
+            StatusMessage.DATA_NOT_FOUND.value,
+            InfoMessage.DATA_NOT_RETRIEVED.value,
+        ),
+        RETRIEVAL_NOT_FOUND_CACHED: (
+            StatusMessage.DATA_NOT_FOUND.value,
+            f"{InfoMessage.DATA_NOT_RETRIEVED.value}: {InfoMessage.WEB_NOT_FOUND_CACHED.value}",
+        ),
+        RETRIEVAL_FAILED: (
+            StatusMessage.DATA_FAILED.value,
+            f"{InfoMessage.DATA_NOT_RETRIEVED.value}: {InfoMessage.WEB_UNAVAILABLE.value}",
+        ),
+    }[result.status]
+
     return PortalRetrieveDataResponseModelObject(
         portal_id=portal.get("portal_id"),
         taxon_id=taxon.get("taxon_id"),
         web=web_for_query,
-        data=await run_function_from_module(web_for_query, "retrieve", taxon),
-        status=(
-            StatusMessage.DATA_SUCCESS.value
-            if taxon
-            else StatusMessage.DATA_FAILED.value
-        ),
-        info=(
-            InfoMessage.DATA_RETRIEVED.value
-            if taxon
-            else InfoMessage.DATA_NOT_RETRIEVED.value
-        ),
+        data=result.data,
+        status=status,
+        info=info,
     )
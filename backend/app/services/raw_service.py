@@ -1,4 +1,5 @@
-from typing import Any, List, Set, Tuple, Dict
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, List, Optional, Set, Tuple, Dict
 
 from pymongo import UpdateOne
 from utils.enum.status_code_enum import StatusCode
@@ -8,26 +9,38 @@ from utils.enum.message_enum import (
     StatusMessage,
     InfoMessage,
 )
-from models.portal_model import (
-    PortalRetrieveDataModel,
-    PortalRetrieveDataResponseModelObject,
-)
 from models.raw_model import (
     RawDeleteModel,
     RawDeleteResponseModelObject,
     RawGetModel,
+    RawGetPageModel,
+    RawGetPageResponseModelObject,
     RawGetResponseModelObject,
+    RawRefreshModel,
+    RawRefreshResponseModelObject,
     RawStoreModel,
     RawStoreResponseModelObject,
 )
+from models.term_model import TermStoreModel
 from utils.decorator.app_log_decorator import log_function
+from utils.enum.raw_enum import RawRefreshStatus
 from utils.helper.func_helper import (
     checkUnsupportedWeb,
-    run_function_from_module,
     portal_webs,
 )
+from utils.helper.cursor_helper import decode_cursor, encode_cursor, query_fingerprint
+from utils.helper.raw_helper import decode_raw_data, raw_fields, raw_max_age
+from config import RAW_DELETE_BATCH_SIZE, RAW_STREAM_BATCH_SIZE
 from database.mongo import client, raw_collection, taxon_collection, portal_collection
-from .portal_service import retrieve_data
+from .retrieval_service import (
+    RETRIEVAL_FAILED,
+    RETRIEVAL_FOUND,
+    RETRIEVAL_NOT_FOUND_CACHED,
+    RetrievalItem,
+    retrieve_items,
+)
+from .term_rebuild_service import mark_terms_dirty
+from .term_service import store_raw_to_terms
 
 
 # Helper to filter webs for processing
@@ -38,6 +51,45 @@ def filter_webs_for_processing(
     return list(set(portal_webs).intersection(set(web_for_query)))
 
 
+# Build the (taxon, portal, web) items to retrieve for already-fetched taxa
+async def build_retrieval_items(
+    taxa: List[dict], web_for_query: List[str]
+) -> List[RetrievalItem]:
+    # Retrieve taxon portals
+    taxon_ids: List[str] = [taxon["taxon_id"] for taxon in taxa]
+    portals: List[dict] = await portal_collection.find(
+        {"taxon_id": {"$in": taxon_ids}},
+        {"_id": 0, "taxon_id": 1, "portal_id": 1, "web": 1},
+    ).to_list(length=None)
+
+    # Create a map of taxon_id to portal
+    portal_map: dict = {portal["taxon_id"]: portal for portal in portals}
+
+    items: List[RetrievalItem] = []
+    for taxon in taxa:
+        # Check if portal exists for taxon
+        portal: dict = portal_map.get(taxon["taxon_id"])
+        if not portal:
+            continue
+
+        items.extend(
+            RetrievalItem(taxon, portal, web)
+            for web in filter_webs_for_processing(portal["web"], web_for_query)
+        )
+
+    return items
+
+
+# Upsert of one raw document, keyed by portal and web so reruns are idempotent.
+# fields come from raw_fields: data, content_hash, source_version and fetched_at.
+def raw_upsert(portal_id: int, web: str, fields: dict) -> UpdateOne:
+    return UpdateOne(
+        {"portal_id": portal_id, "web": web},
+        {"$set": {"portal_id": portal_id, "web": web, **fields}},
+        upsert=True,
+    )
+
+
 # Store raw from portals to raw collection
 @log_function("Store raw from portals")
 async def store_raw_from_portals(
@@ -85,97 +137,79 @@ async def store_raw_from_portals(
         for taxon in taxa
     }
 
-    # Retrieve taxon portals
-    taxon_ids: List[str] = [taxon["taxon_id"] for taxon in taxa]
-    portals: List[dict] = await portal_collection.find(
-        {"taxon_id": {"$in": taxon_ids}},
-        {"_id": 0, "taxon_id": 1, "portal_id": 1, "web": 1},
-    ).to_list(length=None)
-
-    # Create a map of taxon_id to portal
-    portal_map: dict = {portal["taxon_id"]: portal for portal in portals}
-
-    # Process each taxon
-    for taxon in taxa:
-        # Check if portal exists for taxon
-        portal: dict = portal_map.get(taxon["taxon_id"])
-        if portal:
-            # Store portal_id in taxon
-            taxon["portal_id"] = portal["portal_id"]
-
-            # Process each web
-            web_need_to_process: List[str] = filter_webs_for_processing(
-                portal["web"], web_for_query
+    # Add a web outcome to a taxon's result
+    def add_found_web(
+        ncbi_taxon_id: str, web: str, found: str, status: str, info: str
+    ) -> None:
+        found_taxon_web[ncbi_taxon_id]["found_webs"][found].append(
+            {"web": web, "status": status, "info": info}
+        )
+        found_taxon_web[ncbi_taxon_id]["missing_webs"].discard(web)
+
+    # Build the (taxon, portal, web) items from the rows already fetched
+    items: List[RetrievalItem] = await build_retrieval_items(taxa, web_for_query)
+
+    # Retrieve and process concurrently, collecting outcomes as they complete
+    async for result in retrieve_items(items, process=True):
+        ncbi_taxon_id: str = result.item.taxon["ncbi_taxon_id"]
+        web: str = result.item.web
+
+        if result.status == RETRIEVAL_FOUND:
+            add_found_web(
+                ncbi_taxon_id,
+                web,
+                "exist",
+                StatusMessage.DATA_FOUND.value,
+                InfoMessage.DATA_RETRIEVED_AND_STORED.value,
+            )
+            data_to_store.append(
+                {
+                    "portal_id": result.item.portal["portal_id"],
+                    "web": web,
+                    "fields": await raw_fields(web, result.processed),
+                }
+            )
+        elif result.status == RETRIEVAL_NOT_FOUND_CACHED:
+            add_found_web(
+                ncbi_taxon_id,
+                web,
+                "not_exist",
+                StatusMessage.DATA_NOT_FOUND.value,
+                f"{InfoMessage.DATA_NOT_RETRIEVED_AND_STORED.value}: {InfoMessage.WEB_NOT_FOUND_CACHED.value}",
+            )
+        elif result.status == RETRIEVAL_FAILED:
+            # Source failed after retries or its circuit breaker is open
+            add_found_web(
+                ncbi_taxon_id,
+                web,
+                "not_exist",
+                StatusMessage.DATA_FAILED.value,
+                f"{InfoMessage.DATA_NOT_RETRIEVED_AND_STORED.value}: {InfoMessage.WEB_UNAVAILABLE.value}",
+            )
+        else:
+            add_found_web(
+                ncbi_taxon_id,
+                web,
+                "not_exist",
+                StatusMessage.DATA_NOT_FOUND.value,
+                InfoMessage.DATA_NOT_RETRIEVED_AND_STORED.value,
             )
-
-            for web in web_need_to_process:
-
-                # Retrieve data from portal
-                params: PortalRetrieveDataModel = PortalRetrieveDataModel(
-                    ncbi_taxon_id=taxon["ncbi_taxon_id"], web=web
-                )
-                retrieved_data: PortalRetrieveDataResponseModelObject = (
-                    await retrieve_data(params)
-                )
-
-                # Store data if retrieved
-                if retrieved_data:
-                    retrieved_data = retrieved_data.data
-
-                    # Store found data
-                    found_taxon_web[taxon["ncbi_taxon_id"]]["found_webs"][
-                        "exist"
-                    ].append(
-                        {
-                            "web": web,
-                            "status": StatusMessage.DATA_FOUND.value,
-                            "info": InfoMessage.DATA_RETRIEVED_AND_STORED.value,
-                        }
-                    )
-                    data_to_store.append(
-                        {
-                            "portal_id": taxon.get("portal_id"),
-                            "web": web,
-                            "data": await run_function_from_module(
-                                web, "data_processing", retrieved_data
-                            ),
-                        }
-                    )
-                else:
-                    # Store not found data
-                    found_taxon_web[taxon["ncbi_taxon_id"]]["found_webs"][
-                        "not_exist"
-                    ].append(
-                        {
-                            "web": web,
-                            "status": StatusMessage.DATA_NOT_FOUND.value,
-                            "info": InfoMessage.DATA_NOT_RETRIEVED_AND_STORED.value,
-                        }
-                    )
-
-                # Remove web from missing webs
-                found_taxon_web[taxon["ncbi_taxon_id"]]["missing_webs"].discard(web)
 
     async with await client.start_session() as session:
         async with session.start_transaction():
             # Bulk write data to raw collection
-            bulk_operations = []
-            for data in data_to_store:
-                bulk_operations.append(
-                    UpdateOne(
-                        {
-                            "portal_id": data["portal_id"],
-                            "web": data["web"],
-                        },
-                        {"$set": data},
-                        upsert=True,
-                    )
-                )
+            bulk_operations = [
+                raw_upsert(data["portal_id"], data["web"], data["fields"])
+                for data in data_to_store
+            ]
 
             # Execute bulk operations in one go
             if bulk_operations:  # Ensure there are operations to execute
                 await raw_collection.bulk_write(bulk_operations, session=session)
 
+    # Terms of the stored portals are rebuilt in the background
+    await mark_terms_dirty(data["portal_id"] for data in data_to_store)
+
     # Prepare final result
     result: List[RawStoreResponseModelObject] = []
     for ncbi_taxon_id, details in found_taxon_web.items():
@@ -221,21 +255,12 @@ async def store_raw_from_portals(
     return result
 
 
-# Get raw from raw collection
-@log_function("Get raw from raw collection")
-async def get_raw(params: RawGetModel) -> List[RawGetResponseModelObject]:
-
-    # Extract necessary parameters
-    ncbi_taxon_id__for_query: List[str] = params.ncbi_taxon_id
+# Refresh raws older than their source's max age, skipping unchanged content
+@log_function("Refresh stale raws")
+async def refresh_raws(params: RawRefreshModel) -> List[RawRefreshResponseModelObject]:
+    ncbi_taxon_id_for_query: List[str] = params.ncbi_taxon_id
     web_for_query: List[str] = params.web or portal_webs
 
-    # Build query for taxa
-    query_ncbi_taxon_id: dict = (
-        {"ncbi_taxon_id": {"$in": ncbi_taxon_id__for_query}}
-        if ncbi_taxon_id__for_query
-        else {}
-    )
-
     # Check for unsupported web sources
     unsupported_webs: List[str] = checkUnsupportedWeb(web_for_query)
     if unsupported_webs:
@@ -247,109 +272,258 @@ async def get_raw(params: RawGetModel) -> List[RawGetResponseModelObject]:
             }
         )
 
-    # Retrieve taxa
-    taxa: List[dict] = await taxon_collection.find(
-        query_ncbi_taxon_id, {"_id": 0}
-    ).to_list(length=None)
+    query = (
+        {"ncbi_taxon_id": {"$in": ncbi_taxon_id_for_query}}
+        if ncbi_taxon_id_for_query
+        else {}
+    )
 
-    # Extract ncbi_taxon_ids and taxon_ids from taxa
-    ncbi_taxon_ids = [taxon["ncbi_taxon_id"] for taxon in taxa]
-    taxon_ids = [taxon["taxon_id"] for taxon in taxa]
+    # Retrieve taxa and build their (taxon, portal, web) items
+    taxa: List[dict] = await taxon_collection.find(query, {"_id": 0}).to_list(
+        length=None
+    )
+    items: List[RetrievalItem] = await build_retrieval_items(taxa, web_for_query)
+
+    # Stale raws of these portals: older than the max age of their web, or
+    # stored before fetched_at was recorded
+    now: datetime = datetime.utcnow()
+    stale_raws: List[dict] = await raw_collection.find(
+        {
+            "portal_id": {"$in": list({item.portal["portal_id"] for item in items})},
+            "$or": [
+                {
+                    "web": web,
+                    "fetched_at": {
+                        "$not": {"$gte": now - timedelta(seconds=raw_max_age(web))}
+                    },
+                }
+                for web in web_for_query
+            ],
+        },
+        {"_id": 0, "portal_id": 1, "web": 1, "content_hash": 1},
+    ).to_list(length=None)
+    stored_hashes: Dict[Tuple[int, str], str] = {
+        (raw["portal_id"], raw["web"]): raw.get("content_hash") for raw in stale_raws
+    }
 
-    # Find taxa not found in the database
-    not_found_taxa = [
-        ncbi_id for ncbi_id in ncbi_taxon_id__for_query if ncbi_id not in ncbi_taxon_ids
+    stale_items: List[RetrievalItem] = [
+        item
+        for item in items
+        if (item.portal["portal_id"], item.web) in stored_hashes
     ]
 
-    # Retrieve portals
-    portals = await portal_collection.find(
-        {"taxon_id": {"$in": taxon_ids}}, {"_id": 0}
-    ).to_list(length=None)
+    bulk_operations: List[UpdateOne] = []
+    changed_taxa: Set[str] = set()
+    changed_portals: Set[int] = set()
+    result: List[RawRefreshResponseModelObject] = []
+    async for retrieval in retrieve_items(stale_items, process=True):
+        taxon: dict = retrieval.item.taxon
+        portal_id: int = retrieval.item.portal["portal_id"]
+        web: str = retrieval.item.web
+        response = RawRefreshResponseModelObject(
+            taxon_id=taxon["taxon_id"],
+            ncbi_taxon_id=taxon["ncbi_taxon_id"],
+            species=taxon["species"],
+            web=web,
+        )
 
-    # Create maps for easy lookup
-    portal_map = {portal["taxon_id"]: portal["portal_id"] for portal in portals}
-    taxa_with_no_portal = [
-        taxon for taxon in taxa if taxon["taxon_id"] not in portal_map
-    ]
+        if retrieval.status == RETRIEVAL_FOUND:
+            fields: dict = await raw_fields(web, retrieval.processed)
+            response.source_version = fields["source_version"]
 
-    # Update taxa with portal_id
-    for taxon in taxa:
-        taxon["portal_id"] = portal_map.get(taxon["taxon_id"])
+            if fields["content_hash"] == stored_hashes[(portal_id, web)]:
+                # Same content, only record that it was checked
+                bulk_operations.append(
+                    UpdateOne(
+                        {"portal_id": portal_id, "web": web},
+                        {
+                            "$set": {
+                                "fetched_at": fields["fetched_at"],
+                                "source_version": fields["source_version"],
+                            }
+                        },
+                    )
+                )
+                response.refresh_status = RawRefreshStatus.UNCHANGED.value
+                response.status = StatusMessage.DATA_SUCCESS.value
+                response.info = InfoMessage.RAW_UNCHANGED.value
+            else:
+                bulk_operations.append(raw_upsert(portal_id, web, fields))
+                changed_taxa.add(taxon["ncbi_taxon_id"])
+                changed_portals.add(portal_id)
+                response.refresh_status = RawRefreshStatus.UPDATED.value
+                response.status = StatusMessage.DATA_SUCCESS.value
+                response.info = InfoMessage.RAW_CHANGED.value
+        elif retrieval.status == RETRIEVAL_FAILED:
+            # Source failed after retries or its circuit breaker is open, keep the raw
+            response.refresh_status = RawRefreshStatus.FAILED.value
+            response.status = StatusMessage.DATA_FAILED.value
+            response.info = f"{InfoMessage.DATA_NOT_RETRIEVED.value}: {InfoMessage.WEB_UNAVAILABLE.value}"
+        else:
+            # The source has no data now, keep the raw
+            response.refresh_status = RawRefreshStatus.NOT_FOUND.value
+            response.status = StatusMessage.DATA_NOT_FOUND.value
+            response.info = InfoMessage.DATA_NOT_RETRIEVED.value
+
+        result.append(response)
+
+    if bulk_operations:
+        await raw_collection.bulk_write(bulk_operations, ordered=False)
+
+    # Rebuild terms only for taxa whose raw content changed
+    if params.rebuild_terms and changed_taxa:
+        await store_raw_to_terms(TermStoreModel(ncbi_taxon_id=list(changed_taxa)))
+        for response in result:
+            response.terms_rebuilt = response.ncbi_taxon_id in changed_taxa
+    else:
+        await mark_terms_dirty(changed_portals)
 
-    # Prepare to retrieve raw data
-    portal_ids = [taxon["portal_id"] for taxon in taxa if taxon.get("portal_id")]
-    raws = await raw_collection.find(
-        {"portal_id": {"$in": portal_ids}, "web": {"$in": web_for_query}}, {"_id": 0}
-    ).to_list(length=None)
+    return result
 
-    # Create raw data map
-    raw_map = {}
-    for raw in raws:
-        raw_key = (raw["portal_id"], raw["web"])
-        raw_map.setdefault(raw_key, []).append(raw)
 
-    # Prepare results
-    result: List[RawGetResponseModelObject] = []
+# Check raw get parameters and return the webs to query
+def raw_get_webs(params: RawGetModel) -> List[str]:
+    web_for_query: List[str] = params.web or portal_webs
 
-    # Process each taxon
-    for taxon in taxa:
-        portal_id = taxon.get("portal_id")
-        if not portal_id:
-            continue
+    # Check for unsupported web sources
+    unsupported_webs: List[str] = checkUnsupportedWeb(web_for_query)
+    if unsupported_webs:
+        raise Exception(
+            {
+                "data": [],
+                "message": f"Web sources not supported: {', '.join(unsupported_webs)}.",
+                "status_code": StatusCode.BAD_REQUEST.value,
+            }
+        )
 
-        found_webs = set()
-        web_need_to_process = filter_webs_for_processing(portal_webs, web_for_query)
-
-        for web in web_need_to_process:
-            raw_key = (portal_id, web)
-            if raw_key in raw_map:
-                for raw in raw_map[raw_key]:
-                    result.append(
-                        RawGetResponseModelObject(
-                            taxon_id=taxon["taxon_id"],
-                            ncbi_taxon_id=taxon["ncbi_taxon_id"],
-                            species=taxon["species"],
-                            web=web,
-                            data=raw["data"],
-                            status=StatusMessage.DATA_SUCCESS.value,
-                            info=InfoMessage.DATA_RETRIEVED.value,
-                        )
-                    )
-                found_webs.add(web)
+    return web_for_query
 
-        # Handle missing webs
-        missing_webs = set(web_for_query) - found_webs
-        for web in missing_webs:
-            result.append(
-                RawGetResponseModelObject(
-                    taxon_id=taxon["taxon_id"],
-                    ncbi_taxon_id=taxon["ncbi_taxon_id"],
-                    species=taxon["species"],
-                    web=web,
-                    data=None,
-                    status=StatusMessage.DATA_FAILED.value,
-                    info=f"{InfoMessage.DATA_NOT_RETRIEVED.value}: {InfoMessage.RAW_NOT_EXIST.value}",
-                )
-            )
 
-    # Append not found taxa
-    result.extend(
-        [
-            RawGetResponseModelObject(
-                ncbi_taxon_id=ncbi_id,
-                species=SpeciesMessage.SPECIES_NOT_FOUND.value,
-                web=None,
-                data=None,
-                status=StatusMessage.DATA_FAILED.value,
-                info=f"{InfoMessage.DATA_NOT_RETRIEVED.value}: {InfoMessage.TAXON_NOT_EXIST.value}",
-            )
-            for ncbi_id in not_found_taxa
-        ]
+def raw_get_query(params: RawGetModel) -> dict:
+    return (
+        {"ncbi_taxon_id": {"$in": params.ncbi_taxon_id}} if params.ncbi_taxon_id else {}
     )
 
-    # Append taxa with no portal
-    result.extend(
-        [
+
+# Raw fields returned by the raws/get lookup
+RAW_GET_FIELDS: dict = {
+    "_id": 0,
+    "web": 1,
+    "data": 1,
+    "data_blob": 1,
+    "data_encoding": 1,
+    "fetched_at": 1,
+    "content_hash": 1,
+    "source_version": 1,
+}
+
+# Raw fields returned by the raws/delete lookup, the deleted data is reported back
+RAW_DELETE_FIELDS: dict = {
+    "_id": 0,
+    "portal_id": 1,
+    "web": 1,
+    "data": 1,
+    "data_blob": 1,
+    "data_encoding": 1,
+}
+
+
+# Aggregation over taxa that joins their portals and raws in one round trip.
+# Each row is one taxon and one raw of the queried webs (only raw_projection
+# fields, no raw when the taxon has none), with the taxon's portal_ids, whether
+# it has a portal and its missing webs. $lookup with both localField and
+# pipeline needs MongoDB 5.0.
+def raw_lookup_pipeline(
+    query: dict,
+    web_for_query: List[str],
+    raw_projection: dict,
+    stages: Tuple[dict, ...] = (),
+) -> List[dict]:
+    return [
+        {"$match": query},
+        *stages,
+        {
+            "$lookup": {
+                "from": portal_collection.name,
+                "localField": "taxon_id",
+                "foreignField": "taxon_id",
+                "pipeline": [{"$project": {"_id": 0, "portal_id": 1}}],
+                "as": "portals",
+            }
+        },
+        # Only the webs of the raws, to find the missing ones
+        {
+            "$lookup": {
+                "from": raw_collection.name,
+                "localField": "portals.portal_id",
+                "foreignField": "portal_id",
+                "pipeline": [
+                    {"$match": {"web": {"$in": web_for_query}}},
+                    {"$project": {"_id": 0, "web": 1}},
+                ],
+                "as": "raw_webs",
+            }
+        },
+        {
+            "$lookup": {
+                "from": raw_collection.name,
+                "localField": "portals.portal_id",
+                "foreignField": "portal_id",
+                "pipeline": [
+                    {"$match": {"web": {"$in": web_for_query}}},
+                    {"$project": raw_projection},
+                ],
+                "as": "raw",
+            }
+        },
+        # Unwinding right after the $lookup keeps the payloads of a taxon out of
+        # one document, which could pass the 16MB limit
+        {"$unwind": {"path": "$raw", "preserveNullAndEmptyArrays": True}},
+        {
+            "$project": {
+                "taxon_id": 1,
+                "ncbi_taxon_id": 1,
+                "species": 1,
+                "raw": 1,
+                "portal_ids": "$portals.portal_id",
+                "has_portal": {"$gt": [{"$size": "$portals"}, 0]},
+                "missing_webs": {"$setDifference": [web_for_query, "$raw_webs.web"]},
+            }
+        },
+    ]
+
+
+# Taxa from the raw lookup pipeline, each with the list of its raws
+async def lookup_taxa(
+    query: dict,
+    web_for_query: List[str],
+    raw_projection: dict,
+    stages: Tuple[dict, ...] = (),
+    **kwargs,
+) -> AsyncIterator[dict]:
+    taxon: Optional[dict] = None
+    async for row in taxon_collection.aggregate(
+        raw_lookup_pipeline(query, web_for_query, raw_projection, stages), **kwargs
+    ):
+        # The rows of one taxon come one after another
+        if taxon is None or row["_id"] != taxon["_id"]:
+            if taxon is not None:
+                taxon.pop("_id")
+                yield taxon
+            taxon = {**row, "raws": []}
+            taxon.pop("raw", None)
+        if "raw" in row:
+            taxon["raws"].append(row["raw"])
+
+    if taxon is not None:
+        taxon.pop("_id")
+        yield taxon
+
+
+# Raw records of one taxon from the raw lookup pipeline
+def raw_lookup_records(taxon: dict) -> List[RawGetResponseModelObject]:
+    if not taxon["has_portal"]:
+        return [
             RawGetResponseModelObject(
                 taxon_id=taxon["taxon_id"],
                 ncbi_taxon_id=taxon["ncbi_taxon_id"],
@@ -359,13 +533,185 @@ async def get_raw(params: RawGetModel) -> List[RawGetResponseModelObject]:
                 status=StatusMessage.DATA_FAILED.value,
                 info=f"{InfoMessage.DATA_NOT_RETRIEVED.value}: {InfoMessage.PORTAL_NOT_EXIST.value}",
             )
-            for taxon in taxa_with_no_portal
         ]
+
+    result: List[RawGetResponseModelObject] = [
+        RawGetResponseModelObject(
+            taxon_id=taxon["taxon_id"],
+            ncbi_taxon_id=taxon["ncbi_taxon_id"],
+            species=taxon["species"],
+            web=raw["web"],
+            data=decode_raw_data(raw),
+            fetched_at=(
+                raw["fetched_at"].isoformat() if raw.get("fetched_at") else None
+            ),
+            content_hash=raw.get("content_hash"),
+            source_version=raw.get("source_version"),
+            status=StatusMessage.DATA_SUCCESS.value,
+            info=InfoMessage.DATA_RETRIEVED.value,
+        )
+        for raw in taxon["raws"]
+    ]
+
+    # Handle missing webs
+    result.extend(
+        RawGetResponseModelObject(
+            taxon_id=taxon["taxon_id"],
+            ncbi_taxon_id=taxon["ncbi_taxon_id"],
+            species=taxon["species"],
+            web=web,
+            data=None,
+            status=StatusMessage.DATA_FAILED.value,
+            info=f"{InfoMessage.DATA_NOT_RETRIEVED.value}: {InfoMessage.RAW_NOT_EXIST.value}",
+        )
+        for web in taxon["missing_webs"]
     )
 
     return result
 
 
+# Raw records of looked-up taxa, and the records of taxa without a portal
+def raw_records_for_taxa(
+    taxa: List[dict],
+) -> Tuple[List[RawGetResponseModelObject], List[RawGetResponseModelObject]]:
+    result: List[RawGetResponseModelObject] = []
+    no_portal_result: List[RawGetResponseModelObject] = []
+    for taxon in taxa:
+        records = raw_lookup_records(taxon)
+        (result if taxon["has_portal"] else no_portal_result).extend(records)
+
+    return result, no_portal_result
+
+
+# Records of requested ncbi_taxon_ids that are not in the taxa collection
+def taxa_not_found_records(
+    ncbi_taxon_ids: List[str],
+) -> List[RawGetResponseModelObject]:
+    return [
+        RawGetResponseModelObject(
+            ncbi_taxon_id=ncbi_id,
+            species=SpeciesMessage.SPECIES_NOT_FOUND.value,
+            web=None,
+            data=None,
+            status=StatusMessage.DATA_FAILED.value,
+            info=f"{InfoMessage.DATA_NOT_RETRIEVED.value}: {InfoMessage.TAXON_NOT_EXIST.value}",
+        )
+        for ncbi_id in ncbi_taxon_ids
+    ]
+
+
+# Get raw from raw collection
+@log_function("Get raw from raw collection")
+async def get_raw(params: RawGetModel) -> List[RawGetResponseModelObject]:
+    web_for_query: List[str] = raw_get_webs(params)
+
+    # Retrieve taxa with their portals and raws
+    taxa: List[dict] = [
+        taxon
+        async for taxon in lookup_taxa(
+            raw_get_query(params), web_for_query, RAW_GET_FIELDS
+        )
+    ]
+
+    # Find taxa not found in the database
+    ncbi_taxon_ids = {taxon["ncbi_taxon_id"] for taxon in taxa}
+    not_found_taxa = [
+        ncbi_id for ncbi_id in params.ncbi_taxon_id if ncbi_id not in ncbi_taxon_ids
+    ]
+
+    result, no_portal_result = raw_records_for_taxa(taxa)
+
+    return result + taxa_not_found_records(not_found_taxa) + no_portal_result
+
+
+# Stream raw records as NDJSON lines, one taxon at a time
+async def stream_raws(params: RawGetModel) -> AsyncIterator[str]:
+    web_for_query: List[str] = raw_get_webs(params)
+
+    # Only requested ncbi_taxon_ids are tracked, so memory does not grow with the result
+    found_ncbi_taxon_ids: Set[str] = set()
+
+    async for taxon in lookup_taxa(
+        raw_get_query(params),
+        web_for_query,
+        RAW_GET_FIELDS,
+        stages=({"$sort": {"taxon_id": 1}},),
+        batchSize=RAW_STREAM_BATCH_SIZE,
+    ):
+        for record in raw_lookup_records(taxon):
+            yield record.model_dump_json() + "\n"
+        if params.ncbi_taxon_id:
+            found_ncbi_taxon_ids.add(taxon["ncbi_taxon_id"])
+
+    for record in taxa_not_found_records(
+        [
+            ncbi_id
+            for ncbi_id in dict.fromkeys(params.ncbi_taxon_id)
+            if ncbi_id not in found_ncbi_taxon_ids
+        ]
+    ):
+        yield record.model_dump_json() + "\n"
+
+
+# Get one page of raw records, paginated over taxa with an opaque cursor
+@log_function("Get raw page from raw collection")
+async def get_raw_page(params: RawGetPageModel) -> RawGetPageResponseModelObject:
+    web_for_query: List[str] = raw_get_webs(params)
+
+    # The cursor is bound to the query it was issued for
+    fingerprint: str = query_fingerprint(params.ncbi_taxon_id, web_for_query)
+    position: dict = (
+        decode_cursor(params.cursor, fingerprint, {"taxon_id": int})
+        if params.cursor
+        else {}
+    )
+
+    query: dict = raw_get_query(params)
+    if position:
+        query["taxon_id"] = {"$gt": position["taxon_id"]}
+
+    # One taxon more than the page size tells whether a next page exists
+    taxa: List[dict] = [
+        taxon
+        async for taxon in lookup_taxa(
+            query,
+            web_for_query,
+            RAW_GET_FIELDS,
+            stages=({"$sort": {"taxon_id": 1}}, {"$limit": params.page_size + 1}),
+        )
+    ]
+    has_next: bool = len(taxa) > params.page_size
+    taxa = taxa[: params.page_size]
+
+    result, no_portal_result = raw_records_for_taxa(taxa)
+
+    # Requested taxa that do not exist are reported on the first page
+    not_found_result: List[RawGetResponseModelObject] = []
+    if not position and params.ncbi_taxon_id:
+        existing: Set[str] = set(
+            await taxon_collection.distinct(
+                "ncbi_taxon_id", {"ncbi_taxon_id": {"$in": params.ncbi_taxon_id}}
+            )
+        )
+        not_found_result = taxa_not_found_records(
+            [
+                ncbi_id
+                for ncbi_id in dict.fromkeys(params.ncbi_taxon_id)
+                if ncbi_id not in existing
+            ]
+        )
+
+    return RawGetPageResponseModelObject(
+        items=result + not_found_result + no_portal_result,
+        page_size=params.page_size,
+        next_cursor=(
+            encode_cursor({"taxon_id": taxa[-1]["taxon_id"]}, fingerprint)
+            if has_next
+            else None
+        ),
+    )
+
+
 # Delete raw from raw collection
 @log_function("Delete raw from raw collection")
 async def delete_raw_from_db(
@@ -400,85 +746,61 @@ async def delete_raw_from_db(
             }
         )
 
-    # Retrieve taxa
-    taxa: List[dict] = await taxon_collection.find(
-        query_ncbi_taxon_id, {"_id": 0}
-    ).to_list(length=None)
-
-    # Extract ncbi_taxon_ids and taxon_ids from taxa
-    ncbi_taxon_ids = [taxon["ncbi_taxon_id"] for taxon in taxa]
-    taxon_ids = [taxon["taxon_id"] for taxon in taxa]
+    # Retrieve taxa with their portals and the raws to delete
+    taxa: List[dict] = [
+        taxon
+        async for taxon in lookup_taxa(
+            query_ncbi_taxon_id, web_for_query, RAW_DELETE_FIELDS
+        )
+    ]
 
     # Find taxa not found in the database
+    ncbi_taxon_ids = {taxon["ncbi_taxon_id"] for taxon in taxa}
     not_found_taxa = [
         ncbi_id for ncbi_id in ncbi_taxon_id_for_query if ncbi_id not in ncbi_taxon_ids
     ]
 
-    # Retrieve portals
-    portals = await portal_collection.find(
-        {"taxon_id": {"$in": taxon_ids}}, {"_id": 0}
-    ).to_list(length=None)
-
-    # Create maps for easy lookup
-    portal_map = {portal["taxon_id"]: portal["portal_id"] for portal in portals}
-    taxa_with_no_portal = [
-        taxon for taxon in taxa if taxon["taxon_id"] not in portal_map
-    ]
-
-    # Update taxa with portal_id
-    for taxon in taxa:
-        taxon["portal_id"] = portal_map.get(taxon["taxon_id"])
-
-    # Prepare to retrieve raw data
-    portal_ids = [taxon["portal_id"] for taxon in taxa if taxon.get("portal_id")]
-    raws = await raw_collection.find(
-        {"portal_id": {"$in": portal_ids}, "web": {"$in": web_for_query}}, {"_id": 0}
-    ).to_list(length=None)
+    # Delete the raws set-wise, one delete_many per batch of portals
+    portal_ids = [portal_id for taxon in taxa for portal_id in taxon["portal_ids"]]
+    for start in range(0, len(portal_ids), RAW_DELETE_BATCH_SIZE):
+        await raw_collection.delete_many(
+            {
+                "portal_id": {"$in": portal_ids[start : start + RAW_DELETE_BATCH_SIZE]},
+                "web": {"$in": web_for_query},
+            }
+        )
 
-    # Create raw data map
-    raw_map = {}
-    for raw in raws:
-        raw_key = (raw["portal_id"], raw["web"])
-        raw_map.setdefault(raw_key, []).append(raw)
+    # Terms of portals that lose raws are rebuilt in the background
+    await mark_terms_dirty(
+        portal_id
+        for taxon in taxa
+        if taxon["raws"]
+        for portal_id in taxon["portal_ids"]
+    )
 
     # Prepare results
     result: List[RawDeleteResponseModelObject] = []
 
     # Process each taxon
     for taxon in taxa:
-        portal_id = taxon.get("portal_id")
-        if not portal_id:
+        if not taxon["has_portal"]:
             continue
 
-        found_webs = set()
-        web_need_to_process = filter_webs_for_processing(portal_webs, web_for_query)
-
-        for web in web_need_to_process:
-            raw_key = (portal_id, web)
-            if raw_key in raw_map:
-                for raw in raw_map[raw_key]:
-                    async with await client.start_session() as session:
-                        async with session.start_transaction():
-                            await raw_collection.delete_one(
-                                {"portal_id": raw["portal_id"], "web": raw["web"]}
-                            )
-
-                    result.append(
-                        RawDeleteResponseModelObject(
-                            taxon_id=taxon["taxon_id"],
-                            ncbi_taxon_id=taxon["ncbi_taxon_id"],
-                            species=taxon["species"],
-                            web=web,
-                            data=raw["data"],
-                            status=StatusMessage.DATA_SUCCESS.value,
-                            info=InfoMessage.DATA_RETRIEVED.value,
-                        )
-                    )
-                found_webs.add(web)
+        for raw in taxon["raws"]:
+            result.append(
+                RawDeleteResponseModelObject(
+                    taxon_id=taxon["taxon_id"],
+                    ncbi_taxon_id=taxon["ncbi_taxon_id"],
+                    species=taxon["species"],
+                    web=raw["web"],
+                    data=decode_raw_data(raw),
+                    status=StatusMessage.DATA_SUCCESS.value,
+                    info=InfoMessage.DATA_RETRIEVED.value,
+                )
+            )
 
         # Handle missing webs
-        missing_webs = set(web_for_query) - found_webs
-        for web in missing_webs:
+        for web in taxon["missing_webs"]:
             result.append(
                 RawDeleteResponseModelObject(
                     taxon_id=taxon["taxon_id"],
@@ -518,7 +840,8 @@ async def delete_raw_from_db(
                 status=StatusMessage.DATA_FAILED.value,
                 info=f"{InfoMessage.DATA_NOT_RETRIEVED.value}: {InfoMessage.PORTAL_NOT_EXIST.value}",
             )
-            for taxon in taxa_with_no_portal
+            for taxon in taxa
+            if not taxon["has_portal"]
         ]
     )
 
@@ -0,0 +1,216 @@
+import time
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import httpx
+
+from utils.decorator.app_log_decorator import appLogger
+from utils.helper.cache_helper import track_cache_keys, upstream_cache
+from utils.helper.func_helper import call_function, run_function_from_module
+from utils.helper.negative_cache_helper import (
+    get_cached_misses,
+    negative_cache_hits_total,
+    record_misses,
+)
+from utils.helper.plugin_helper import plugin_registry
+from utils.helper.scheduler_helper import Job, store_scheduler
+
+# Retrieval outcomes
+RETRIEVAL_FOUND: str = "found"
+RETRIEVAL_NOT_FOUND: str = "not_found"
+RETRIEVAL_NOT_FOUND_CACHED: str = "not_found_cached"
+RETRIEVAL_FAILED: str = "failed"
+
+# Marks an item whose data could not be processed
+PROCESSING_FAILED: object = object()
+
+
+# A taxon and its portal, already read from the database, to fetch from one web
+class RetrievalItem(NamedTuple):
+    taxon: dict
+    portal: dict
+    web: str
+
+
+class RetrievalResult(NamedTuple):
+    item: RetrievalItem
+    status: str
+    data: dict = {}
+    processed: Any = None
+    # Seconds spent on the item, its share of the batch it was fetched in
+    elapsed: float = 0.0
+
+
+# Split a list into chunks of at most size items
+def chunked(items: List[Any], size: int) -> List[List[Any]]:
+    return [items[start : start + size] for start in range(0, len(items), size)]
+
+
+# Retrieve data of many taxa from one web, with retrieve_many when the plugin has it.
+# Returns the data per ncbi_taxon_id, the ncbi_taxon_ids whose source failed and
+# the upstream cache keys each ncbi_taxon_id was looked up with.
+async def retrieve_for_web(
+    web: str, taxa: List[dict]
+) -> Tuple[Dict[str, dict], Set[str], Dict[str, Set[str]]]:
+    retrieved: Dict[str, dict] = {}
+    failed: Set[str] = set()
+    cache_keys: Dict[str, Set[str]] = {}
+    single_taxa: List[dict] = taxa
+
+    retrieve_many = plugin_registry.hook(web, "retrieve_many")
+    if retrieve_many:
+        single_taxa = []
+        for chunk in chunked(taxa, plugin_registry.batch_size(web)):
+            try:
+                with track_cache_keys() as keys:
+                    retrieved.update(await call_function(retrieve_many, chunk))
+                for taxon in chunk:
+                    cache_keys[taxon["ncbi_taxon_id"]] = keys
+            except Exception:
+                # Retry the chunk item by item, so one bad taxon does not fail the rest
+                single_taxa.extend(chunk)
+
+    # A failure of one taxon, HTTP or not, only fails that taxon
+    for taxon in single_taxa:
+        try:
+            with track_cache_keys() as keys:
+                retrieved[taxon["ncbi_taxon_id"]] = await run_function_from_module(
+                    web, "retrieve", taxon
+                )
+            cache_keys[taxon["ncbi_taxon_id"]] = keys
+        except httpx.HTTPError:
+            failed.add(taxon["ncbi_taxon_id"])
+        except Exception as e:
+            appLogger.error(
+                f"Retrieving {taxon['ncbi_taxon_id']} from {web} failed: {e}"
+            )
+            failed.add(taxon["ncbi_taxon_id"])
+
+    return retrieved, failed, cache_keys
+
+
+# Process retrieved data of one web, with data_processing_many when the plugin has it
+async def process_for_web(web: str, items: List[dict]) -> List[Any]:
+    data_processing_many = plugin_registry.hook(web, "data_processing_many")
+    if not data_processing_many:
+        return [
+            await run_function_from_module(web, "data_processing", item)
+            for item in items
+        ]
+
+    processed: List[Any] = []
+    for chunk in chunked(items, plugin_registry.batch_size(web)):
+        processed.extend(await call_function(data_processing_many, chunk))
+    return processed
+
+
+# Process retrieved data of one web item by item, PROCESSING_FAILED for items that raise
+async def process_each_for_web(web: str, items: List[dict]) -> List[Any]:
+    processed: List[Any] = []
+    for item in items:
+        try:
+            processed.append(
+                await run_function_from_module(web, "data_processing", item)
+            )
+        except Exception as e:
+            appLogger.error(f"Processing data from {web} failed: {e}")
+            processed.append(PROCESSING_FAILED)
+    return processed
+
+
+# Retrieve (and optionally process) one batch of items of one web, run by the scheduler
+async def retrieve_web_items(
+    web: str, items: List[RetrievalItem], process: bool
+) -> List[RetrievalResult]:
+    started: float = time.perf_counter()
+    retrieved, failed, cache_keys = await retrieve_for_web(
+        web, [item.taxon for item in items]
+    )
+
+    results: List[RetrievalResult] = []
+    found_items: List[RetrievalItem] = []
+    missed: List[str] = []
+    for item in items:
+        ncbi_taxon_id: str = item.taxon["ncbi_taxon_id"]
+        if ncbi_taxon_id in failed:
+            results.append(RetrievalResult(item, RETRIEVAL_FAILED))
+        elif not retrieved.get(ncbi_taxon_id):
+            results.append(RetrievalResult(item, RETRIEVAL_NOT_FOUND))
+            missed.append(ncbi_taxon_id)
+        else:
+            found_items.append(item)
+
+    # An empty result is a miss, remember it so the next run skips the lookup.
+    # The cached responses behind it are dropped, so the lookup after the miss
+    # expires asks the upstream again instead of replaying the empty answer.
+    await record_misses(web, missed)
+    await upstream_cache.delete(
+        {key for ncbi_taxon_id in missed for key in cache_keys.get(ncbi_taxon_id, ())}
+    )
+
+    found_data: List[dict] = [
+        retrieved[item.taxon["ncbi_taxon_id"]] for item in found_items
+    ]
+    processed: List[Any] = [None] * len(found_data)
+    if process:
+        try:
+            processed = await process_for_web(web, found_data)
+        except Exception:
+            # Process item by item, so one bad payload only fails its own item
+            processed = await process_each_for_web(web, found_data)
+    results.extend(
+        (
+            RetrievalResult(item, RETRIEVAL_FAILED)
+            if processed_data is PROCESSING_FAILED
+            else RetrievalResult(item, RETRIEVAL_FOUND, data, processed_data)
+        )
+        for item, data, processed_data in zip(found_items, found_data, processed)
+    )
+
+    elapsed: float = (time.perf_counter() - started) / len(items)
+    return [result._replace(elapsed=elapsed) for result in results]
+
+
+# Retrieve data for already-resolved (taxon, portal, web) items without touching
+# the taxa and portals collections. Results are yielded as their jobs complete.
+async def retrieve_items(
+    items: List[RetrievalItem], process: bool = False
+) -> AsyncIterator[RetrievalResult]:
+    # Recent not-found results for all items, in one query
+    cached_misses: Set[Tuple[str, str]] = await get_cached_misses(
+        list({item.web for item in items}),
+        list({item.taxon["ncbi_taxon_id"] for item in items}),
+    )
+
+    items_by_web: Dict[str, List[RetrievalItem]] = {}
+    for item in items:
+        if (item.web, item.taxon["ncbi_taxon_id"]) in cached_misses:
+            negative_cache_hits_total.labels(item.web).inc()
+            yield RetrievalResult(item, RETRIEVAL_NOT_FOUND_CACHED)
+            continue
+        items_by_web.setdefault(item.web, []).append(item)
+
+    # One job per batch of items when the plugin has retrieve_many, else per item
+    jobs: List[Job] = [
+        (web, retrieve_web_items, (web, chunk, process))
+        for web, web_items in items_by_web.items()
+        for chunk in chunked(
+            web_items,
+            (
+                plugin_registry.batch_size(web)
+                if plugin_registry.hook(web, "retrieve_many")
+                else 1
+            ),
+        )
+    ]
+
+    async for results in store_scheduler.as_completed(jobs):
+        for result in results:
+            yield result
+
+
+# Retrieve data for one already-resolved item
+async def retrieve_item(item: RetrievalItem) -> RetrievalResult:
+    result: Optional[RetrievalResult] = None
+    async for result in retrieve_items([item]):
+        pass
+    return result
@@ -0,0 +1,120 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+from prometheus_client import Counter
+from pymongo import DeleteOne, UpdateOne
+
+from models.term_model import TermStoreModel
+from utils.decorator.app_log_decorator import appLogger
+from database.mongo import portal_collection, taxon_collection, term_dirty_collection
+from config import (
+    TERM_REBUILD_BATCH_SIZE,
+    TERM_REBUILD_DEBOUNCE,
+    TERM_REBUILD_ENABLED,
+    TERM_REBUILD_MAX_DELAY,
+    TERM_REBUILD_POLL_INTERVAL,
+)
+from .term_service import store_raw_to_terms
+
+term_rebuild_portals_total = Counter(
+    "term_rebuild_portals_total",
+    "Portals whose terms were rebuilt after their raws changed",
+)
+
+
+# Mark portals whose raws changed, so their terms are rebuilt in the background.
+# Marking again pushes the rebuild back until the portal has been quiet for the debounce.
+async def mark_terms_dirty(portal_ids: Iterable[int]) -> None:
+    now: datetime = datetime.utcnow()
+    operations: List[UpdateOne] = [
+        UpdateOne(
+            {"portal_id": portal_id},
+            {"$set": {"marked_at": now}, "$setOnInsert": {"first_marked_at": now}},
+            upsert=True,
+        )
+        for portal_id in dict.fromkeys(portal_ids)
+    ]
+    if operations:
+        await term_dirty_collection.bulk_write(operations, ordered=False)
+
+
+# Rebuild the terms of one batch of dirty portals, returns the number of portals taken
+async def rebuild_dirty_terms() -> int:
+    now: datetime = datetime.utcnow()
+
+    # Portals quiet for the debounce, or waiting longer than the max delay
+    dirty: List[dict] = (
+        await term_dirty_collection.find(
+            {
+                "$or": [
+                    {"marked_at": {"$lte": now - timedelta(seconds=TERM_REBUILD_DEBOUNCE)}},
+                    {
+                        "first_marked_at": {
+                            "$lte": now - timedelta(seconds=TERM_REBUILD_MAX_DELAY)
+                        }
+                    },
+                ]
+            },
+            {"_id": 0},
+        )
+        .sort("marked_at", 1)
+        .limit(TERM_REBUILD_BATCH_SIZE)
+        .to_list(length=None)
+    )
+    if not dirty:
+        return 0
+
+    taxon_ids: List[int] = await portal_collection.distinct(
+        "taxon_id", {"portal_id": {"$in": [entry["portal_id"] for entry in dirty]}}
+    )
+    ncbi_taxon_ids: List[str] = await taxon_collection.distinct(
+        "ncbi_taxon_id", {"taxon_id": {"$in": taxon_ids}}
+    )
+    if ncbi_taxon_ids:
+        await store_raw_to_terms(TermStoreModel(ncbi_taxon_id=ncbi_taxon_ids))
+
+    # Portals marked again during the rebuild stay dirty
+    await term_dirty_collection.bulk_write(
+        [
+            DeleteOne({"portal_id": entry["portal_id"], "marked_at": entry["marked_at"]})
+            for entry in dirty
+        ],
+        ordered=False,
+    )
+    term_rebuild_portals_total.inc(len(dirty))
+
+    return len(dirty)
+
+
+# Rebuilds the terms of dirty portals in batches, polling when there is nothing to do
+class TermRebuildWorker:
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if TERM_REBUILD_ENABLED:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                rebuilt: int = await rebuild_dirty_terms()
+            except Exception as e:
+                appLogger.error(f"Term rebuild worker failed: {e}")
+                rebuilt = 0
+
+            # A full batch means more may be waiting
+            if rebuilt < TERM_REBUILD_BATCH_SIZE:
+                await asyncio.sleep(TERM_REBUILD_POLL_INTERVAL)
+
+
+term_rebuild_worker = TermRebuildWorker()
@@ -1,5 +1,12 @@
-from typing import List, Set
-from utils.helper.map_terms_helper import mapping
+from typing import Dict, List, Optional, Set
+
+from pymongo import UpdateOne
+from pymongo.errors import OperationFailure
+from utils.helper.map_terms_helper import (
+    mapping,
+    mapping_expression,
+    sections_merge_expression,
+)
 from utils.enum.status_code_enum import StatusCode
 from utils.enum.message_enum import (
     ResponseMessage,
@@ -24,8 +31,18 @@ from database.mongo import (
     term_collection,
     raw_collection,
     portal_collection,
+    upstream_cache_collection,
+    negative_cache_collection,
+    crosswalk_collection,
+    job_collection,
+    job_item_collection,
+    ingest_run_collection,
+    ingest_checkpoint_collection,
+    term_dirty_collection,
 )
 
+from utils.helper.crosswalk_helper import CROSSWALK_FIELDS
+from utils.helper.raw_helper import decode_raw_data
 from utils.helper.func_helper import find_matching_parts, portal_webs, searchFilter
 
 
@@ -66,9 +83,11 @@ async def store_raw_to_terms(params: TermStoreModel) -> TermStoreResponseModelOb
         {"taxon_id": {"$in": list(existing_taxon_ids)}}, {"_id": 0}
     ).to_list(length=None)
 
+    portal_taxon_ids: Set[int] = {portal["taxon_id"] for portal in portals}
+
     # Check if taxon exist but the portal that related to taxon is not exist
     for taxon in existing_taxons:
-        if taxon["taxon_id"] not in [portal["taxon_id"] for portal in portals]:
+        if taxon["taxon_id"] not in portal_taxon_ids:
             result.append(
                 TermStoreResponseModelObject(
                     taxon_id=taxon["taxon_id"],
@@ -80,26 +99,41 @@ async def store_raw_to_terms(params: TermStoreModel) -> TermStoreResponseModelOb
                 )
             )
 
+    if params.bulk:
+        # Build the terms on the server, the mapped data is not returned
+        await merge_terms(
+            [portal["portal_id"] for portal in portals]
+            if ncbi_taxon_id_for_query
+            else None
+        )
+
+        result.extend(
+            TermStoreResponseModelObject(
+                taxon_id=taxon["taxon_id"],
+                ncbi_taxon_id=taxon["ncbi_taxon_id"],
+                species=taxon["species"],
+                data=None,
+                status=StatusMessage.DATA_SUCCESS.value,
+                info=f"{InfoMessage.DATA_RETRIEVED_AND_STORED.value}.",
+            )
+            for taxon in existing_taxons
+            if taxon["taxon_id"] in portal_taxon_ids
+        )
+
     async with await client.start_session() as session:
         async with session.start_transaction():
-            # Process existing taxons
-            if existing_taxon_ids:
-                # Map portals to taxon_id
+            # Process existing taxons, unless built in bulk
+            if existing_taxon_ids and not params.bulk:
+                # Map portals and taxa to taxon_id
                 portal_map: dict = {portal["taxon_id"]: portal for portal in portals}
+                taxon_map: dict = {taxon["taxon_id"]: taxon for taxon in existing_taxons}
 
                 for taxon_id in existing_taxon_ids:
                     # Retrieve portal
                     portal: dict = portal_map.get(taxon_id)
 
                     # Retrieve taxon
-                    taxon = next(
-                        (
-                            taxon
-                            for taxon in existing_taxons
-                            if taxon["taxon_id"] == taxon_id
-                        ),
-                        None,
-                    )
+                    taxon = taxon_map.get(taxon_id)
 
                     # Check if portal exist
                     if portal:
@@ -108,6 +142,10 @@ async def store_raw_to_terms(params: TermStoreModel) -> TermStoreResponseModelOb
                             {"portal_id": portal["portal_id"]}, {"_id": 0}
                         ).to_list(length=None)
 
+                        # Decompress raws stored compressed
+                        for raw in raws:
+                            raw["data"] = decode_raw_data(raw)
+
                         # mapping raws
                         mapped: dict = mapping(raws)
 
@@ -146,238 +184,318 @@ async def store_raw_to_terms(params: TermStoreModel) -> TermStoreResponseModelOb
     return result
 
 
+# Server error code of an index that exists with the same keys under another name
+INDEX_OPTIONS_CONFLICT: int = 85
+
+# Whether the unique taxon_id index that $merge needs exists, checked once per process
+term_merge_index_ready: bool = False
+
+
+# Create the unique taxon_id index of terms, as create_indexes does, if missing
+async def ensure_term_merge_index() -> None:
+    global term_merge_index_ready
+    if term_merge_index_ready:
+        return
+
+    try:
+        await term_collection.create_index(
+            "taxon_id",
+            name="taxon_id_index",
+            unique=True,
+        )
+    except OperationFailure as e:
+        # The same index under another name is fine
+        if e.code != INDEX_OPTIONS_CONFLICT:
+            raise
+    term_merge_index_ready = True
+
+
+# Build terms from raws in one aggregation that writes into terms with $merge.
+# portal_ids limits the portals built, None builds every portal.
+async def merge_terms(portal_ids: Optional[List[int]]) -> None:
+    # $merge on taxon_id fails without a unique index on it, e.g. on a fresh database
+    await ensure_term_merge_index()
+
+    portal_query: dict = {"portal_id": {"$in": portal_ids}} if portal_ids is not None else {}
+
+    # Compressed raws cannot be read by the server, their portals are mapped in Python
+    compressed_portal_ids: List[int] = await raw_collection.distinct(
+        "portal_id", {**portal_query, "data_encoding": {"$ne": None}}
+    )
+
+    await portal_collection.aggregate(
+        [
+            {
+                "$match": {
+                    "portal_id": {
+                        **portal_query.get("portal_id", {}),
+                        "$nin": compressed_portal_ids,
+                    }
+                }
+            },
+            {
+                "$lookup": {
+                    "from": raw_collection.name,
+                    "localField": "portal_id",
+                    "foreignField": "portal_id",
+                    "pipeline": [{"$project": {"_id": 0, "terms": mapping_expression()}}],
+                    "as": "raws",
+                }
+            },
+            {
+                "$project": {
+                    "_id": 0,
+                    "taxon_id": 1,
+                    "data": {
+                        "$reduce": {
+                            "input": "$raws.terms",
+                            "initialValue": {},
+                            "in": sections_merge_expression(),
+                        }
+                    },
+                }
+            },
+            {
+                "$merge": {
+                    "into": term_collection.name,
+                    "on": "taxon_id",
+                    "whenMatched": "merge",
+                    "whenNotMatched": "insert",
+                }
+            },
+        ]
+    ).to_list(length=None)
+
+    if not compressed_portal_ids:
+        return
+
+    operations: List[UpdateOne] = []
+    async for portal in portal_collection.find(
+        {"portal_id": {"$in": compressed_portal_ids}}, {"_id": 0}
+    ):
+        raws: List[dict] = await raw_collection.find(
+            {"portal_id": portal["portal_id"]}, {"_id": 0}
+        ).to_list(length=None)
+        for raw in raws:
+            raw["data"] = decode_raw_data(raw)
+
+        operations.append(
+            UpdateOne(
+                {"taxon_id": portal["taxon_id"]},
+                {"$set": {"taxon_id": portal["taxon_id"], "data": mapping(raws)}},
+                upsert=True,
+            )
+        )
+
+    await term_collection.bulk_write(operations, ordered=False)
+
+
 # Get terms data from database
 @log_function("Get terms data")
 async def get_terms(params: TermGetModel) -> TermGetResponseModelObject:
-    async with await client.start_session() as session:
-        async with session.start_transaction():
-            # prepare taxon_id for query
-            ncbi_taxon_id_for_query = params.ncbi_taxon_id
-
-            query = {"ncbi_taxon_id": {"$in": ncbi_taxon_id_for_query}}
+    # prepare taxon_id for query
+    ncbi_taxon_id_for_query = params.ncbi_taxon_id
 
-            if not ncbi_taxon_id_for_query:
-                query = {}
+    query = {"ncbi_taxon_id": {"$in": ncbi_taxon_id_for_query}}
 
-            # Retrieve existing taxons from the collection
-            existing_taxons: List[dict] = await taxon_collection.find(
-                query, {"_id": 0}
-            ).to_list(length=None)
+    if not ncbi_taxon_id_for_query:
+        query = {}
 
-            # Gather existing taxon
-            existing_taxon_ids: List[int] = [
-                taxon["taxon_id"] for taxon in existing_taxons
-            ]
+    # Retrieve existing taxons from the collection
+    existing_taxons: List[dict] = await taxon_collection.find(
+        query, {"_id": 0}
+    ).to_list(length=None)
 
-            # Gather existing ncbi_taxon_ids
-            existing_ncbi_taxon_ids: List[str] = [
-                taxon["ncbi_taxon_id"] for taxon in existing_taxons
-            ]
+    # Gather existing taxon
+    existing_taxon_ids: List[int] = [taxon["taxon_id"] for taxon in existing_taxons]
 
-            # Determine which ncbi_taxon_ids are missing
-            missing_ncbi_taxon_ids: Set[str] = set(ncbi_taxon_id_for_query) - set(
-                existing_ncbi_taxon_ids
-            )
+    # Gather existing ncbi_taxon_ids
+    existing_ncbi_taxon_ids: List[str] = [
+        taxon["ncbi_taxon_id"] for taxon in existing_taxons
+    ]
 
-            # Prepare result object
-            result: TermStoreResponseModelObject = []
-
-            portals: List[dict] = await portal_collection.find(
-                {"taxon_id": {"$in": list(existing_taxon_ids)}}, {"_id": 0}
-            ).to_list(length=None)
-
-            # Check if taxon exist but the portal that related to taxon is not exist
-            for taxon in existing_taxons:
-                if taxon["taxon_id"] not in [portal["taxon_id"] for portal in portals]:
-                    result.append(
-                        TermStoreResponseModelObject(
-                            taxon_id=taxon["taxon_id"],
-                            ncbi_taxon_id=taxon["ncbi_taxon_id"],
-                            species=taxon["species"],
-                            data=None,
-                            status=StatusMessage.DATA_FAILED.value,
-                            info=f"{InfoMessage.DATA_NOT_RETRIEVED.value}: {InfoMessage.PORTAL_NOT_EXIST.value}.",
-                        )
-                    )
+    # Determine which ncbi_taxon_ids are missing
+    missing_ncbi_taxon_ids: Set[str] = set(ncbi_taxon_id_for_query) - set(
+        existing_ncbi_taxon_ids
+    )
 
-            # Process existing taxons
-            if existing_taxon_ids:
-                # Create portal map and taxon map
-                portal_map: dict = {portal["taxon_id"]: portal for portal in portals}
-                taxon_map: dict = {
-                    taxon["ncbi_taxon_id"]: taxon for taxon in existing_taxons
-                }
+    # Prepare result object
+    result: TermStoreResponseModelObject = []
 
-                # Process existing taxons
-                for ncbi_taxon_id in existing_ncbi_taxon_ids:
+    portals: List[dict] = await portal_collection.find(
+        {"taxon_id": {"$in": list(existing_taxon_ids)}}, {"_id": 0}
+    ).to_list(length=None)
+    portal_taxon_ids: Set[int] = {portal["taxon_id"] for portal in portals}
 
-                    # Retrieve taxon and portal
-                    taxon: dict = taxon_map.get(ncbi_taxon_id)
-                    portal: dict = portal_map.get(taxon["taxon_id"]) if taxon else None
+    # Check if taxon exist but the portal that related to taxon is not exist
+    for taxon in existing_taxons:
+        if taxon["taxon_id"] not in portal_taxon_ids:
+            result.append(
+                TermStoreResponseModelObject(
+                    taxon_id=taxon["taxon_id"],
+                    ncbi_taxon_id=taxon["ncbi_taxon_id"],
+                    species=taxon["species"],
+                    data=None,
+                    status=StatusMessage.DATA_FAILED.value,
+                    info=f"{InfoMessage.DATA_NOT_RETRIEVED.value}: {InfoMessage.PORTAL_NOT_EXIST.value}.",
+                )
+            )
 
-                    if portal:
-                        # Retrieve term
-                        term: dict = await term_collection.find_one(
-                            {"taxon_id": portal["taxon_id"]}, {"_id": 0}
-                        )
+    # Retrieve the terms of every taxon with a portal in one query
+    terms: Dict[int, dict] = {
+        term["taxon_id"]: term
+        async for term in term_collection.find(
+            {"taxon_id": {"$in": list(portal_taxon_ids)}}, {"_id": 0}
+        )
+    }
 
-                        if term:
-                            result.append(
-                                TermGetResponseModelObject(
-                                    taxon_id=term["taxon_id"],
-                                    ncbi_taxon_id=ncbi_taxon_id,
-                                    species=taxon["species"],
-                                    data=term["data"],
-                                    status=StatusMessage.DATA_FOUND.value,
-                                    info=f"{InfoMessage.DATA_RETRIEVED.value}.",
-                                )
-                            )
-                        else:
-                            result.append(
-                                TermGetResponseModelObject(
-                                    taxon_id=portal["taxon_id"],
-                                    ncbi_taxon_id=ncbi_taxon_id,
-                                    species=SpeciesMessage.SPECIES_NOT_FOUND.value,
-                                    status=StatusMessage.DATA_FAILED.value,
-                                    info=f"{InfoMessage.DATA_NOT_RETRIEVED.value}: {InfoMessage.RAW_NOT_EXIST.value}.",
-                                )
-                            )
+    # Process existing taxons
+    for taxon in existing_taxons:
+        if taxon["taxon_id"] not in portal_taxon_ids:
+            continue
 
-            # Handle missing taxons
-            for missing_ncbi_taxon_id in missing_ncbi_taxon_ids:
-                result.append(
-                    TermGetResponseModelObject(
-                        taxon_id=None,
-                        ncbi_taxon_id=missing_ncbi_taxon_id,
-                        species=SpeciesMessage.SPECIES_NOT_FOUND.value,
-                        status=StatusMessage.DATA_FAILED.value,
-                        info=f"{InfoMessage.DATA_NOT_RETRIEVED.value}: {InfoMessage.TAXON_NOT_EXIST.value}.",
-                    )
+        term: Optional[dict] = terms.get(taxon["taxon_id"])
+        if term:
+            result.append(
+                TermGetResponseModelObject(
+                    taxon_id=term["taxon_id"],
+                    ncbi_taxon_id=taxon["ncbi_taxon_id"],
+                    species=taxon["species"],
+                    data=term["data"],
+                    status=StatusMessage.DATA_FOUND.value,
+                    info=f"{InfoMessage.DATA_RETRIEVED.value}.",
+                )
+            )
+        else:
+            result.append(
+                TermGetResponseModelObject(
+                    taxon_id=taxon["taxon_id"],
+                    ncbi_taxon_id=taxon["ncbi_taxon_id"],
+                    species=SpeciesMessage.SPECIES_NOT_FOUND.value,
+                    status=StatusMessage.DATA_FAILED.value,
+                    info=f"{InfoMessage.DATA_NOT_RETRIEVED.value}: {InfoMessage.RAW_NOT_EXIST.value}.",
                 )
+            )
 
-            return result
+    # Handle missing taxons
+    for missing_ncbi_taxon_id in missing_ncbi_taxon_ids:
+        result.append(
+            TermGetResponseModelObject(
+                taxon_id=None,
+                ncbi_taxon_id=missing_ncbi_taxon_id,
+                species=SpeciesMessage.SPECIES_NOT_FOUND.value,
+                status=StatusMessage.DATA_FAILED.value,
+                info=f"{InfoMessage.DATA_NOT_RETRIEVED.value}: {InfoMessage.TAXON_NOT_EXIST.value}.",
+            )
+        )
+
+    return result
 
 
 # Delete terms document
 @log_function("Delete term document")
 async def delete_term(params: TermDeleteModel) -> TermDeleteResponseModelObject:
-    async with await client.start_session() as session:
-        async with session.start_transaction():
-            # prepare taxon_id for query
-            ncbi_taxon_id_for_query = params.ncbi_taxon_id
-
-            # Validate input parameters
-            if not ncbi_taxon_id_for_query:
-                raise Exception(
-                    {
-                        "data": [],
-                        "message": ResponseMessage.INVALID_PAYLOAD.value,
-                        "status_code": StatusCode.BAD_REQUEST.value,
-                    }
-                )
-
-            # Retrieve existing taxons from the collection
-            existing_taxons: List[dict] = await taxon_collection.find(
-                {"ncbi_taxon_id": {"$in": ncbi_taxon_id_for_query}}, {"_id": 0}
-            ).to_list(length=None)
+    # prepare taxon_id for query
+    ncbi_taxon_id_for_query = params.ncbi_taxon_id
 
-            # Gather existing taxon
-            existing_taxon_ids: List[int] = [
-                taxon["taxon_id"] for taxon in existing_taxons
-            ]
+    # Validate input parameters
+    if not ncbi_taxon_id_for_query:
+        raise Exception(
+            {
+                "data": [],
+                "message": ResponseMessage.INVALID_PAYLOAD.value,
+                "status_code": StatusCode.BAD_REQUEST.value,
+            }
+        )
 
-            # Gather existing ncbi_taxon_ids
-            existing_ncbi_taxon_ids: List[str] = [
-                taxon["ncbi_taxon_id"] for taxon in existing_taxons
-            ]
+    # Retrieve existing taxons from the collection
+    existing_taxons: List[dict] = await taxon_collection.find(
+        {"ncbi_taxon_id": {"$in": ncbi_taxon_id_for_query}}, {"_id": 0}
+    ).to_list(length=None)
 
-            # Determine which ncbi_taxon_ids are missing
-            missing_ncbi_taxon_ids: Set[str] = set(ncbi_taxon_id_for_query) - set(
-                existing_ncbi_taxon_ids
-            )
+    # Gather existing taxon
+    existing_taxon_ids: List[int] = [taxon["taxon_id"] for taxon in existing_taxons]
 
-            # Prepare result object
-            result: TermStoreResponseModelObject = []
-
-            portals: List[dict] = await portal_collection.find(
-                {"taxon_id": {"$in": list(existing_taxon_ids)}}, {"_id": 0}
-            ).to_list(length=None)
-
-            # Check if taxon exist but the portal that related to taxon is not exist
-            for taxon in existing_taxons:
-                if taxon["taxon_id"] not in [portal["taxon_id"] for portal in portals]:
-                    result.append(
-                        TermStoreResponseModelObject(
-                            taxon_id=taxon["taxon_id"],
-                            ncbi_taxon_id=taxon["ncbi_taxon_id"],
-                            species=taxon["species"],
-                            data=None,
-                            status=StatusMessage.DATA_FAILED.value,
-                            info=f"{InfoMessage.DATA_NOT_RETRIEVED.value}: {InfoMessage.PORTAL_NOT_EXIST.value}.",
-                        )
-                    )
+    # Gather existing ncbi_taxon_ids
+    existing_ncbi_taxon_ids: List[str] = [
+        taxon["ncbi_taxon_id"] for taxon in existing_taxons
+    ]
 
-            # Process existing taxons
-            if existing_taxon_ids:
-                # Create portal map and taxon map
-                portal_map: dict = {portal["taxon_id"]: portal for portal in portals}
-                taxon_map: dict = {
-                    taxon["ncbi_taxon_id"]: taxon for taxon in existing_taxons
-                }
+    # Determine which ncbi_taxon_ids are missing
+    missing_ncbi_taxon_ids: Set[str] = set(ncbi_taxon_id_for_query) - set(
+        existing_ncbi_taxon_ids
+    )
 
-                for ncbi_taxon_id in existing_ncbi_taxon_ids:
-                    # Retrieve taxon and portal
-                    taxon: dict = taxon_map.get(ncbi_taxon_id)
-                    portal: dict = portal_map.get(taxon["taxon_id"]) if taxon else None
+    # Prepare result object
+    result: TermStoreResponseModelObject = []
 
-                    if portal:
+    portals: List[dict] = await portal_collection.find(
+        {"taxon_id": {"$in": list(existing_taxon_ids)}}, {"_id": 0}
+    ).to_list(length=None)
+    portal_taxon_ids: Set[int] = {portal["taxon_id"] for portal in portals}
 
-                        # Retrieve term
-                        term: dict = await term_collection.find_one(
-                            {"taxon_id": portal["taxon_id"]}, {"_id": 0}
-                        )
+    # Check if taxon exist but the portal that related to taxon is not exist
+    for taxon in existing_taxons:
+        if taxon["taxon_id"] not in portal_taxon_ids:
+            result.append(
+                TermStoreResponseModelObject(
+                    taxon_id=taxon["taxon_id"],
+                    ncbi_taxon_id=taxon["ncbi_taxon_id"],
+                    species=taxon["species"],
+                    data=None,
+                    status=StatusMessage.DATA_FAILED.value,
+                    info=f"{InfoMessage.DATA_NOT_RETRIEVED.value}: {InfoMessage.PORTAL_NOT_EXIST.value}.",
+                )
+            )
 
-                        # Delete term
-                        await term_collection.delete_one(
-                            {"taxon_id": portal["taxon_id"]}
-                        )
+    # Find and delete the terms of every taxon with a portal, one query each
+    term_taxon_ids: Set[int] = set(
+        await term_collection.distinct(
+            "taxon_id", {"taxon_id": {"$in": list(portal_taxon_ids)}}
+        )
+    )
+    if term_taxon_ids:
+        await term_collection.delete_many({"taxon_id": {"$in": list(term_taxon_ids)}})
 
-                        # If term exists, append to result
-                        if term:
-                            result.append(
-                                TermDeleteResponseModelObject(
-                                    taxon_id=term["taxon_id"],
-                                    ncbi_taxon_id=ncbi_taxon_id,
-                                    species=taxon["species"],
-                                    data=term["data"],
-                                    status=StatusMessage.DATA_SUCCESS.value,
-                                    info=f"{InfoMessage.DATA_DELETED.value}.",
-                                )
-                            )
-                        else:
-                            result.append(
-                                TermDeleteResponseModelObject(
-                                    taxon_id=portal["taxon_id"],
-                                    ncbi_taxon_id=ncbi_taxon_id,
-                                    species=SpeciesMessage.SPECIES_NOT_FOUND.value,
-                                    status=StatusMessage.DATA_FAILED.value,
-                                    info=f"{InfoMessage.DATA_NOT_DELETED.value}: {InfoMessage.TERMS_NOT_EXIST.value}.",
-                                )
-                            )
+    # Process existing taxons
+    for taxon in existing_taxons:
+        if taxon["taxon_id"] not in portal_taxon_ids:
+            continue
 
-            # Handle missing taxons
-            for missing_ncbi_taxon_id in missing_ncbi_taxon_ids:
-                result.append(
-                    TermGetResponseModelObject(
-                        taxon_id=None,
-                        ncbi_taxon_id=missing_ncbi_taxon_id,
-                        species=SpeciesMessage.SPECIES_NOT_FOUND.value,
-                        status=StatusMessage.DATA_FAILED.value,
-                        info=f"{InfoMessage.DATA_NOT_RETRIEVED.value}: {InfoMessage.TAXON_NOT_EXIST.value}.",
-                    )
+        if taxon["taxon_id"] in term_taxon_ids:
+            result.append(
+                TermDeleteResponseModelObject(
+                    taxon_id=taxon["taxon_id"],
+                    ncbi_taxon_id=taxon["ncbi_taxon_id"],
+                    species=taxon["species"],
+                    status=StatusMessage.DATA_SUCCESS.value,
+                    info=f"{InfoMessage.DATA_DELETED.value}.",
                 )
+            )
+        else:
+            result.append(
+                TermDeleteResponseModelObject(
+                    taxon_id=taxon["taxon_id"],
+                    ncbi_taxon_id=taxon["ncbi_taxon_id"],
+                    species=SpeciesMessage.SPECIES_NOT_FOUND.value,
+                    status=StatusMessage.DATA_FAILED.value,
+                    info=f"{InfoMessage.DATA_NOT_DELETED.value}: {InfoMessage.TERMS_NOT_EXIST.value}.",
+                )
+            )
 
-            return result
+    # Handle missing taxons
+    for missing_ncbi_taxon_id in missing_ncbi_taxon_ids:
+        result.append(
+            TermGetResponseModelObject(
+                taxon_id=None,
+                ncbi_taxon_id=missing_ncbi_taxon_id,
+                species=SpeciesMessage.SPECIES_NOT_FOUND.value,
+                status=StatusMessage.DATA_FAILED.value,
+                info=f"{InfoMessage.DATA_NOT_RETRIEVED.value}: {InfoMessage.TAXON_NOT_EXIST.value}.",
+            )
+        )
+
+    return result
 
 
 # Search terms data from database
@@ -448,4 +566,117 @@ async def create_indexes() -> str:
         default_language="en",
     )
 
+    # Create key index in upstream cache collection
+    await upstream_cache_collection.create_index(
+        "key",
+        name="key_index_upstream_cache",
+        unique=True,
+    )
+
+    # Create fetched_at index in upstream cache collection, used for eviction
+    await upstream_cache_collection.create_index(
+        "fetched_at",
+        name="fetched_at_index_upstream_cache",
+    )
+
+    # Create web and ncbi_taxon_id index in negative cache collection
+    await negative_cache_collection.create_index(
+        [("web", 1), ("ncbi_taxon_id", 1)],
+        name="web_ncbi_taxon_id_index_negative_cache",
+        unique=True,
+    )
+
+    # Create TTL index in negative cache collection
+    await negative_cache_collection.create_index(
+        "expires_at",
+        name="expires_at_index_negative_cache",
+        expireAfterSeconds=0,
+    )
+
+    # Create ncbi_taxon_id index in crosswalk collection
+    await crosswalk_collection.create_index(
+        "ncbi_taxon_id",
+        name="ncbi_taxon_id_index_crosswalk",
+        unique=True,
+    )
+
+    # Create source identifier indexes in crosswalk collection, for reverse lookups
+    for field in CROSSWALK_FIELDS.values():
+        await crosswalk_collection.create_index(
+            field,
+            name=f"{field}_index_crosswalk",
+            sparse=True,
+        )
+
+    # Create job_id index in jobs collection
+    await job_collection.create_index(
+        "job_id",
+        name="job_id_index_jobs",
+        unique=True,
+    )
+
+    # Create status and lease index in jobs collection, for workers claiming jobs
+    await job_collection.create_index(
+        [("status", 1), ("lease_expires_at", 1), ("created_at", 1)],
+        name="status_lease_expires_at_index_jobs",
+    )
+
+    # Create job_id and key index in job_items collection, one result per taxon
+    await job_item_collection.create_index(
+        [("job_id", 1), ("key", 1)],
+        name="job_id_key_index_job_items",
+        unique=True,
+    )
+
+    # Create job_id and seq index in job_items collection, for ordered reads
+    await job_item_collection.create_index(
+        [("job_id", 1), ("seq", 1)],
+        name="job_id_seq_index_job_items",
+    )
+
+    # Create web and fetched_at index in raw collection, for stale raw refreshes
+    await raw_collection.create_index(
+        [("web", 1), ("fetched_at", 1)],
+        name="web_fetched_at_index_raw",
+    )
+
+    # Create header name index in raw collection, searchable without decompressing
+    await raw_collection.create_index(
+        [("web", 1), ("data_header.name", 1)],
+        name="web_data_header_name_index_raw",
+    )
+
+    # Create run_id index in ingest_runs collection
+    await ingest_run_collection.create_index(
+        "run_id",
+        name="run_id_index_ingest_runs",
+        unique=True,
+    )
+
+    # Create run, taxon and web index in ingest_checkpoints collection, one checkpoint per pair
+    await ingest_checkpoint_collection.create_index(
+        [("run_id", 1), ("ncbi_taxon_id", 1), ("web", 1)],
+        name="run_id_ncbi_taxon_id_web_index_ingest_checkpoints",
+        unique=True,
+    )
+
+    # Create run and status index in ingest_checkpoints collection, for resume and summaries
+    await ingest_checkpoint_collection.create_index(
+        [("run_id", 1), ("status", 1)],
+        name="run_id_status_index_ingest_checkpoints",
+    )
+
+    # Create portal_id index in term_dirty collection, one entry per portal
+    await term_dirty_collection.create_index(
+        "portal_id",
+        name="portal_id_index_term_dirty",
+        unique=True,
+    )
+
+    # Create marked_at index in term_dirty collection, for the debounced rebuild
+    await term_dirty_collection.create_index(
+        "marked_at",
+        name="marked_at_index_term_dirty",
+    )
+
     return "Indexes created successfully."
@@ -0,0 +1,14 @@
+from enum import Enum
+
+
+class IngestRunStatus(Enum):
+    RUNNING = "running"
+    COMPLETED = "completed"
+    INCOMPLETE = "incomplete"
+
+
+# Outcome of one (taxon, web) pair in an ingest run
+class CheckpointStatus(Enum):
+    FOUND = "found"
+    NOT_FOUND = "not_found"
+    FAILED = "failed"
@@ -0,0 +1,14 @@
+from enum import Enum
+
+
+class JobType(Enum):
+    RAWS_STORE = "raws_store"
+    TERMS_CREATE = "terms_create"
+
+
+class JobStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
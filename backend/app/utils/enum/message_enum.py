@@ -31,6 +31,7 @@ class ResponseMessage(Enum):
     ERR_NOT_FOUND = "Not found"
     ERR_METHOD_NOT_ALLOWED = "Method not allowed"
     ERR_REQUEST_TIMEOUT = "Request timeout"
+    ERR_CONFLICT = "Conflict"
     ERR_TOO_MANY_REQUESTS = "Too many requests"
 
     INVALID_QUERY_PARAMS = "Invalid query parameters"
@@ -82,10 +83,31 @@ class InfoMessage(Enum):
     RAW_NOT_EXIST = "Raw data does not exist"
     TERMS_NOT_EXIST = "Terms does not exist"
 
+    # Jobs
+    JOB_SUBMITTED = "Job submitted"
+    JOB_NOT_EXIST = "Job does not exist"
+    JOB_CANCEL_REQUESTED = "Job cancellation requested"
+    JOB_ALREADY_FINISHED = "Job already finished"
+
+    # Ingest runs
+    INGEST_RUN_NOT_EXIST = "Ingest run does not exist"
+    INGEST_RUNNING = "Ingest run in progress"
+    INGEST_NOT_RESUMABLE = "Ingest run is running or completed, only incomplete runs can be resumed"
+    INGEST_COMPLETED = "Ingest run completed"
+    INGEST_INCOMPLETE = "Ingest run incomplete, resume it to retry failed and pending items"
+
     # Used
     TAXON_USED = "Taxon is used in other collections"
     PORTAL_USED = "Portal is used in other collections"
 
+    # Upstream
+    WEB_UNAVAILABLE = "Web source is unavailable"
+    WEB_NOT_FOUND_CACHED = "Web source has no data (cached)"
+
+    # Refresh
+    RAW_CHANGED = "Raw data changed and updated"
+    RAW_UNCHANGED = "Raw data unchanged, write skipped"
+
 
 class StatusMessage(Enum):
     DATA_FOUND = "Found"
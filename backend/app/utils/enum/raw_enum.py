@@ -0,0 +1,9 @@
+from enum import Enum
+
+
+# Outcome of refreshing one stale raw
+class RawRefreshStatus(Enum):
+    UPDATED = "updated"
+    UNCHANGED = "unchanged"
+    NOT_FOUND = "not_found"
+    FAILED = "failed"
@@ -11,6 +11,7 @@ class StatusCode(Enum):
     NOT_FOUND = 404
     METHOD_NOT_ALLOWED = 405
     REQUEST_TIMEOUT = 408
+    CONFLICT = 409
     TOO_MANY_REQUESTS = 429
     INTERNAL_SERVER_ERROR = 500
     NOT_IMPLEMENTED = 501
@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+# How a term section is combined when several sources fill it
+class MergeStrategy(Enum):
+    REPLACE = "replace"
+    FIRST = "first"
+    MERGE = "merge"
@@ -0,0 +1,139 @@
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from config import BACDIVE_EMAIL, BACDIVE_PASSWORD
+from utils.helper.retry_helper import send_request
+
+# BacDive API and its Keycloak token endpoint
+BACDIVE_API_URL: str = "https://api.bacdive.dsmz.de"
+BACDIVE_TOKEN_URL: str = (
+    "https://sso.dsmz.de/auth/realms/dsmz/protocol/openid-connect/token"
+)
+BACDIVE_CLIENT_ID: str = "api.bacdive.public"
+
+# Number of BacDive IDs sent in one fetch call
+FETCH_BATCH_SIZE: int = 100
+
+# Refresh the access token this many seconds before it expires
+TOKEN_EXPIRY_MARGIN: float = 30
+
+
+# Long-lived, authenticated BacDive API session on the shared HTTP client
+class BacDiveSession:
+    def __init__(self, user: str, password: str):
+        self._user = user
+        self._password = password
+        self._access_token: Optional[str] = None
+        self._refresh_token: Optional[str] = None
+        self._expires_at: float = 0
+        self._refresh_expires_at: float = 0
+        self._lock = asyncio.Lock()
+
+    async def _request_token(self, data: dict) -> None:
+        response = await send_request(
+            "bacdive",
+            "POST",
+            BACDIVE_TOKEN_URL,
+            data={"client_id": BACDIVE_CLIENT_ID, **data},
+        )
+
+        token: dict = response.json()
+        now: float = time.monotonic()
+        self._access_token = token["access_token"]
+        self._refresh_token = token.get("refresh_token")
+        self._expires_at = now + token.get("expires_in", 300)
+        self._refresh_expires_at = now + token.get("refresh_expires_in", 0)
+
+    async def _authenticate(self, force: bool = False) -> str:
+        async with self._lock:
+            now: float = time.monotonic()
+            if (
+                not force
+                and self._access_token
+                and now < self._expires_at - TOKEN_EXPIRY_MARGIN
+            ):
+                return self._access_token
+
+            # Prefer the refresh token, log in again if it is gone or rejected
+            if self._refresh_token and now < self._refresh_expires_at:
+                try:
+                    await self._request_token(
+                        {
+                            "grant_type": "refresh_token",
+                            "refresh_token": self._refresh_token,
+                        }
+                    )
+                    return self._access_token
+                except httpx.HTTPStatusError:
+                    pass
+
+            await self._request_token(
+                {
+                    "grant_type": "password",
+                    "username": self._user,
+                    "password": self._password,
+                }
+            )
+            return self._access_token
+
+    async def get(self, path: str) -> dict:
+        access_token: str = await self._authenticate()
+
+        for attempt in range(2):
+            response = await send_request(
+                "bacdive",
+                "GET",
+                f"{BACDIVE_API_URL}/{path}",
+                allow_status={401, 404},
+                headers={
+                    "Accept": "application/json",
+                    "Authorization": f"Bearer {access_token}",
+                },
+            )
+
+            # Token expired early or was revoked, authenticate again once
+            if response.status_code == 401 and attempt == 0:
+                access_token = await self._authenticate(force=True)
+                continue
+
+            # BacDive answers 404 when a search has no results
+            if response.status_code == 404:
+                return {}
+
+            response.raise_for_status()
+            return response.json()
+
+        return {}
+
+    # Fetch many BacDive entries with semicolon-separated IDs
+    async def fetch(self, bacdive_ids: List[str]) -> Dict[str, dict]:
+        entries: Dict[str, dict] = {}
+        unique_ids: List[str] = list(dict.fromkeys(str(i) for i in bacdive_ids))
+
+        for start in range(0, len(unique_ids), FETCH_BATCH_SIZE):
+            chunk: List[str] = unique_ids[start : start + FETCH_BATCH_SIZE]
+            data: dict = await self.get("fetch/" + ";".join(chunk))
+            results = data.get("results") or {}
+
+            # The API returns either a dict keyed by ID or a list of entries
+            if isinstance(results, dict):
+                entries.update({str(k): v for k, v in results.items()})
+            else:
+                entries.update({str(entry.get("id")): entry for entry in results})
+
+        return entries
+
+    # Search BacDive IDs by species name (genus and species epithet)
+    async def search_taxonomy(self, species: str) -> List[str]:
+        names: List[str] = [name for name in species.split(" ") if name != "subsp."]
+        if not names or len(names) > 3:
+            return []
+
+        result: dict = await self.get("taxon/" + "/".join(names))
+        return [str(i) for i in result.get("results") or []]
+
+
+bacdive_session = BacDiveSession(BACDIVE_EMAIL, BACDIVE_PASSWORD)
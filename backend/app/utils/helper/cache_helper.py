@@ -0,0 +1,186 @@
+import hashlib
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, List, Optional, Set
+
+import httpx
+from bson import Binary
+from prometheus_client import Counter
+from pymongo.errors import PyMongoError
+
+from database.mongo import upstream_cache_collection
+from config import (
+    UPSTREAM_CACHE_ENABLED,
+    UPSTREAM_CACHE_MAX_BYTES,
+    UPSTREAM_CACHE_TTL,
+)
+
+# Response headers kept with a cached body
+CACHED_HEADERS = ("content-type", "etag", "last-modified")
+
+# Bodies above this size are not cached (Mongo documents are capped at 16 MB)
+MAX_ENTRY_BYTES: int = 8 * 1024 * 1024
+
+# Check the total cache size after this many writes
+EVICTION_CHECK_INTERVAL: int = 100
+
+cache_requests_total = Counter(
+    "upstream_cache_requests_total",
+    "Upstream cache lookups per source and result (hit, revalidated, miss)",
+    ["source", "result"],
+)
+cache_evictions_total = Counter(
+    "upstream_cache_evictions_total",
+    "Upstream cache entries evicted to stay under the size limit",
+)
+
+
+# Cache keys used by upstream requests, collected while track_cache_keys is active
+cache_keys_used: ContextVar[Optional[Set[str]]] = ContextVar(
+    "cache_keys_used", default=None
+)
+
+
+@contextmanager
+def track_cache_keys() -> Iterator[Set[str]]:
+    keys: Set[str] = set()
+    token = cache_keys_used.set(keys)
+    try:
+        yield keys
+    finally:
+        cache_keys_used.reset(token)
+
+
+def note_cache_key(key: str) -> None:
+    keys: Optional[Set[str]] = cache_keys_used.get()
+    if keys is not None:
+        keys.add(key)
+
+
+# Persistent cache of upstream GET responses, stored in Mongo
+class UpstreamCache:
+    def __init__(self):
+        self._writes: int = 0
+
+    def ttl(self, source: str) -> float:
+        return UPSTREAM_CACHE_TTL.get(source, 0) if UPSTREAM_CACHE_ENABLED else 0
+
+    @staticmethod
+    def key(source: str, method: str, url: str) -> str:
+        return hashlib.sha256(f"{source} {method} {url}".encode()).hexdigest()
+
+    async def get(self, key: str) -> Optional[dict]:
+        try:
+            return await upstream_cache_collection.find_one({"key": key}, {"_id": 0})
+        except PyMongoError:
+            # A cache outage must not break fetching, treat it as a miss
+            return None
+
+    async def set(self, source: str, key: str, url: str, response: httpx.Response):
+        body: bytes = response.content
+        if len(body) > MAX_ENTRY_BYTES:
+            return
+
+        compressed: bytes = zlib.compress(body)
+        now: datetime = datetime.utcnow()
+        entry: dict = {
+            "key": key,
+            "source": source,
+            "url": url,
+            "status_code": response.status_code,
+            "headers": {
+                name: response.headers[name]
+                for name in CACHED_HEADERS
+                if name in response.headers
+            },
+            "body": Binary(compressed),
+            "size": len(compressed),
+            "fetched_at": now,
+            "expires_at": now + timedelta(seconds=self.ttl(source)),
+        }
+
+        try:
+            await upstream_cache_collection.update_one(
+                {"key": key}, {"$set": entry}, upsert=True
+            )
+            self._writes += 1
+            if self._writes % EVICTION_CHECK_INTERVAL == 0:
+                await self.evict()
+        except PyMongoError:
+            pass
+
+    async def touch(self, source: str, key: str) -> None:
+        # Revalidated by the upstream (304), keep the body for another TTL
+        now: datetime = datetime.utcnow()
+        try:
+            await upstream_cache_collection.update_one(
+                {"key": key},
+                {
+                    "$set": {
+                        "fetched_at": now,
+                        "expires_at": now + timedelta(seconds=self.ttl(source)),
+                    }
+                },
+            )
+        except PyMongoError:
+            pass
+
+    async def delete(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        if not keys:
+            return
+        try:
+            await upstream_cache_collection.delete_many({"key": {"$in": keys}})
+        except PyMongoError:
+            pass
+
+    # Drop the oldest entries until the cache fits in UPSTREAM_CACHE_MAX_BYTES
+    async def evict(self) -> int:
+        totals: List[dict] = await upstream_cache_collection.aggregate(
+            [{"$group": {"_id": None, "size": {"$sum": "$size"}}}]
+        ).to_list(length=None)
+        excess: int = (totals[0]["size"] if totals else 0) - UPSTREAM_CACHE_MAX_BYTES
+        if excess <= 0:
+            return 0
+
+        keys: List[str] = []
+        async for entry in upstream_cache_collection.find(
+            {}, {"_id": 0, "key": 1, "size": 1}
+        ).sort("fetched_at", 1):
+            keys.append(entry["key"])
+            excess -= entry["size"]
+            if excess <= 0:
+                break
+
+        await upstream_cache_collection.delete_many({"key": {"$in": keys}})
+        cache_evictions_total.inc(len(keys))
+        return len(keys)
+
+
+def is_fresh(entry: dict) -> bool:
+    return entry["expires_at"] > datetime.utcnow()
+
+
+# Conditional request headers for revalidating a stale entry
+def revalidation_headers(entry: dict) -> dict:
+    headers: dict = {}
+    if "etag" in entry["headers"]:
+        headers["If-None-Match"] = entry["headers"]["etag"]
+    if "last-modified" in entry["headers"]:
+        headers["If-Modified-Since"] = entry["headers"]["last-modified"]
+    return headers
+
+
+# Rebuild an httpx response from a cache entry
+def cached_response(entry: dict, request: httpx.Request) -> httpx.Response:
+    return httpx.Response(
+        entry["status_code"],
+        headers=entry["headers"],
+        content=zlib.decompress(entry["body"]),
+        request=request,
+    )
+
+
+upstream_cache = UpstreamCache()
@@ -0,0 +1,97 @@
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from prometheus_client import Counter
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from database.mongo import crosswalk_collection
+
+# Crosswalk field holding the resolved identifier of each web source
+CROSSWALK_FIELDS: Dict[str, str] = {
+    "ncbi": "ncbi_resolved_taxon_id",
+    "gbif": "gbif_usage_key",
+    "wikidata": "wikidata_id",
+    "bacdive": "bacdive_id",
+}
+
+crosswalk_lookups_total = Counter(
+    "crosswalk_lookups_total",
+    "Source identifier lookups per web and result (hit, resolved, unresolved)",
+    ["web", "result"],
+)
+
+
+# Return the known source identifiers for these NCBI taxon IDs, in one query
+async def get_source_ids(web: str, ncbi_taxon_ids: List[str]) -> Dict[str, str]:
+    field: Optional[str] = CROSSWALK_FIELDS.get(web)
+    if not field or not ncbi_taxon_ids:
+        return {}
+
+    try:
+        entries: List[dict] = await crosswalk_collection.find(
+            {"ncbi_taxon_id": {"$in": ncbi_taxon_ids}, field: {"$exists": True}},
+            {"_id": 0, "ncbi_taxon_id": 1, field: 1},
+        ).to_list(length=None)
+    except PyMongoError:
+        # A crosswalk outage only costs the resolution hop
+        return {}
+
+    return {entry["ncbi_taxon_id"]: entry[field] for entry in entries}
+
+
+async def get_source_id(web: str, ncbi_taxon_id: str) -> Optional[str]:
+    return (await get_source_ids(web, [ncbi_taxon_id])).get(ncbi_taxon_id)
+
+
+# Store resolved source identifiers, keyed by NCBI taxon ID
+async def set_source_ids(web: str, source_ids: Dict[str, str]) -> None:
+    field: Optional[str] = CROSSWALK_FIELDS.get(web)
+    if not field or not source_ids:
+        return
+
+    now: datetime = datetime.utcnow()
+    operations: List[UpdateOne] = [
+        UpdateOne(
+            {"ncbi_taxon_id": ncbi_taxon_id},
+            {
+                "$set": {
+                    "ncbi_taxon_id": ncbi_taxon_id,
+                    field: str(source_id),
+                    "updated_at": now,
+                }
+            },
+            upsert=True,
+        )
+        for ncbi_taxon_id, source_id in source_ids.items()
+    ]
+
+    try:
+        await crosswalk_collection.bulk_write(operations, ordered=False)
+    except PyMongoError:
+        pass
+
+
+async def set_source_id(web: str, ncbi_taxon_id: str, source_id: str) -> None:
+    await set_source_ids(web, {ncbi_taxon_id: source_id})
+
+
+# Read a taxon's source identifier from the crosswalk, resolving and storing it on a miss
+async def resolve_source_id(
+    web: str,
+    taxon: dict,
+    resolve: Callable[[dict], Awaitable[Optional[str]]],
+) -> Optional[str]:
+    source_id: Optional[str] = await get_source_id(web, taxon["ncbi_taxon_id"])
+    if source_id:
+        crosswalk_lookups_total.labels(web, "hit").inc()
+        return source_id
+
+    source_id = await resolve(taxon)
+    if not source_id:
+        crosswalk_lookups_total.labels(web, "unresolved").inc()
+        return None
+
+    crosswalk_lookups_total.labels(web, "resolved").inc()
+    await set_source_id(web, taxon["ncbi_taxon_id"], source_id)
+    return str(source_id)
@@ -0,0 +1,56 @@
+import base64
+import binascii
+import hashlib
+import json
+from typing import Any, Dict
+
+from utils.enum.message_enum import ResponseMessage
+from utils.enum.status_code_enum import StatusCode
+
+
+def invalid_cursor_error(reason: str) -> Exception:
+    return Exception(
+        {
+            "data": [],
+            "message": f"{ResponseMessage.INVALID_QUERY_PARAMS.value}: {reason}",
+            "status_code": StatusCode.BAD_REQUEST.value,
+        }
+    )
+
+
+# Short hash of the query a cursor belongs to, independent of list order
+def query_fingerprint(*parts: Any) -> str:
+    canonical: str = json.dumps(
+        [sorted(part) if isinstance(part, list) else part for part in parts],
+        sort_keys=True,
+    )
+    return hashlib.sha1(canonical.encode()).hexdigest()[:16]
+
+
+# Opaque pagination token holding the last position of a page
+def encode_cursor(position: dict, fingerprint: str) -> str:
+    token: bytes = json.dumps({"p": position, "f": fingerprint}).encode()
+    return base64.urlsafe_b64encode(token).decode().rstrip("=")
+
+
+# Decode a cursor, checking its position has every field with the expected type
+def decode_cursor(cursor: str, fingerprint: str, fields: Dict[str, type]) -> dict:
+    try:
+        token: dict = json.loads(
+            base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        )
+        position, token_fingerprint = token["p"], token["f"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise invalid_cursor_error("cursor is not valid")
+
+    # bool is an int in Python, but never a valid position
+    if not isinstance(position, dict) or any(
+        not isinstance(position.get(name), kind) or isinstance(position[name], bool)
+        for name, kind in fields.items()
+    ):
+        raise invalid_cursor_error("cursor is not valid")
+
+    if token_fingerprint != fingerprint:
+        raise invalid_cursor_error("cursor belongs to a different query")
+
+    return position
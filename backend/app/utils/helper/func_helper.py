@@ -1,10 +1,12 @@
 import asyncio
-import importlib.util
 import os
 from typing import Dict, List
 
+import httpx
+
 from utils.enum.message_enum import ResponseMessage
 from utils.enum.status_code_enum import StatusCode
+from utils.helper.plugin_helper import plugin_registry
 from utils.helper.response_helper import error_response
 from config import OPERATIONS_FOLDERS
 
@@ -24,17 +26,16 @@ def convert_to_string(obj: any) -> any:
 async def run_function_from_module(
     module_name: str, function_name: str, *args: any
 ) -> any:
-    # Dynamically import the module
-    spec = importlib.util.spec_from_file_location(
-        module_name, OPERATIONS_FOLDERS + "/" + module_name + ".py"
-    )
-
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
+    # Get the module from the plugin registry, loaded once and cached
+    module = plugin_registry.get(module_name)
 
     # Get the function from the module
     function = getattr(module, function_name)
 
+    return await call_function(function, *args)
+
+
+async def call_function(function, *args: any) -> any:
     if asyncio.iscoroutinefunction(function):
         # If the function is async, await it
         return await function(*args)
@@ -119,6 +120,14 @@ portal_webs: List[str] = [
 
 
 def handleError(e: Exception):
+    # Upstream source failed after retries, or its circuit breaker is open
+    if isinstance(e, httpx.HTTPError):
+        return error_response(
+            data=None,
+            message=ResponseMessage.ERR_BAD_GATEWAY.value,
+            status_code=StatusCode.BAD_GATEWAY.value,
+        )
+
     # Check if there are any arguments in e.args
     if len(e.args) > 0:
         error = e.args[0]
@@ -0,0 +1,218 @@
+import asyncio
+import importlib.util
+import socket
+import time
+from typing import Dict, Optional, Tuple
+
+import httpcore
+import httpx
+from prometheus_client import REGISTRY, Counter
+from prometheus_client.core import GaugeMetricFamily
+
+from utils.helper.rate_limit_helper import RateLimitedTransport
+from config import (
+    HTTP_CLIENT_DNS_CACHE_TTL,
+    HTTP_CLIENT_HTTP2,
+    HTTP_CLIENT_KEEPALIVE_EXPIRY,
+    HTTP_CLIENT_MAX_CONNECTIONS,
+    HTTP_CLIENT_TIMEOUT,
+    UPSTREAM_BASE_URL,
+)
+
+# Fallback connection limit for sources without an explicit setting
+DEFAULT_MAX_CONNECTIONS: int = 10
+
+# HTTP/2 needs the optional "h2" package
+HTTP2_AVAILABLE: bool = importlib.util.find_spec("h2") is not None
+
+upstream_requests_total = Counter(
+    "upstream_http_requests_total",
+    "Requests sent to upstream sources",
+    ["source", "status_code"],
+)
+
+
+# Network backend that reuses resolved addresses instead of resolving on every connect
+class CachingNetworkBackend(httpcore.AsyncNetworkBackend):
+    def __init__(self, backend: httpcore.AsyncNetworkBackend, ttl: float):
+        self._backend = backend
+        self._ttl = ttl
+        self._addresses: Dict[Tuple[str, int], Tuple[float, str]] = {}
+
+    async def _resolve(self, host: str, port: int) -> Optional[str]:
+        now: float = time.monotonic()
+        cached = self._addresses.get((host, port))
+        if cached and cached[0] > now:
+            return cached[1]
+
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(
+                host, port, type=socket.SOCK_STREAM
+            )
+        except OSError:
+            # Let the wrapped backend raise its own mapped connect error
+            return None
+
+        address: str = infos[0][4][0]
+        self._addresses[(host, port)] = (now + self._ttl, address)
+        return address
+
+    async def connect_tcp(
+        self, host, port, timeout=None, local_address=None, socket_options=None
+    ):
+        # TLS still uses the original hostname for SNI, only the TCP connect uses the IP
+        address: Optional[str] = await self._resolve(host, port) if self._ttl else None
+        return await self._backend.connect_tcp(
+            address or host,
+            port,
+            timeout=timeout,
+            local_address=local_address,
+            socket_options=socket_options,
+        )
+
+    async def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        return await self._backend.connect_unix_socket(
+            path, timeout=timeout, socket_options=socket_options
+        )
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+# The httpcore connection pool behind an httpx transport, None if httpx changes it
+def connection_pool(
+    transport: httpx.AsyncHTTPTransport,
+) -> Optional[httpcore.AsyncConnectionPool]:
+    pool = getattr(transport, "_pool", None)
+    return pool if isinstance(pool, httpcore.AsyncConnectionPool) else None
+
+
+# Wrap the network backend of a transport's pool with the DNS cache. httpx does not
+# expose the backend, so this relies on the httpcore version pinned in
+# requirements.txt; on any other layout the pool keeps resolving on every connect.
+def enable_dns_cache(transport: httpx.AsyncHTTPTransport, ttl: float) -> bool:
+    pool: Optional[httpcore.AsyncConnectionPool] = connection_pool(transport)
+    backend = getattr(pool, "_network_backend", None)
+    if not isinstance(backend, httpcore.AsyncNetworkBackend):
+        return False
+
+    pool._network_backend = CachingNetworkBackend(backend, ttl)
+    return True
+
+
+# Transport that sends every request to one base URL, keeping the original host as
+# the first path segment (https://api.gbif.org/v1/... -> {base_url}/api.gbif.org/v1/...)
+class BaseUrlOverrideTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport, base_url: str):
+        self._transport = transport
+        self._base_url = httpx.URL(base_url.rstrip("/"))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        prefix: str = f"{self._base_url.path.rstrip('/')}/{request.url.host}"
+        request.url = self._base_url.copy_with(
+            raw_path=prefix.encode("ascii") + request.url.raw_path
+        )
+        request.headers["Host"] = request.url.netloc.decode("ascii")
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+# One long-lived, pooled client per upstream source
+class HttpClientRegistry:
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._transports: Dict[str, httpx.AsyncHTTPTransport] = {}
+
+    def max_connections(self, source: str) -> int:
+        return HTTP_CLIENT_MAX_CONNECTIONS.get(source, DEFAULT_MAX_CONNECTIONS)
+
+    def _create(self, source: str) -> httpx.AsyncClient:
+        max_connections: int = self.max_connections(source)
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=HTTP_CLIENT_KEEPALIVE_EXPIRY,
+        )
+
+        transport = httpx.AsyncHTTPTransport(
+            http2=HTTP_CLIENT_HTTP2 and HTTP2_AVAILABLE, limits=limits
+        )
+        if HTTP_CLIENT_DNS_CACHE_TTL:
+            enable_dns_cache(transport, HTTP_CLIENT_DNS_CACHE_TTL)
+
+        async def count_response(response: httpx.Response) -> None:
+            upstream_requests_total.labels(source, str(response.status_code)).inc()
+
+        self._transports[source] = transport
+        return httpx.AsyncClient(
+            transport=RateLimitedTransport(
+                (
+                    BaseUrlOverrideTransport(transport, UPSTREAM_BASE_URL)
+                    if UPSTREAM_BASE_URL
+                    else transport
+                ),
+                source,
+            ),
+            timeout=HTTP_CLIENT_TIMEOUT,
+            event_hooks={"response": [count_response]},
+        )
+
+    def get(self, source: str) -> httpx.AsyncClient:
+        client: Optional[httpx.AsyncClient] = self._clients.get(source)
+        if client is None or client.is_closed:
+            client = self._create(source)
+            self._clients[source] = client
+        return client
+
+    def pool_stats(self) -> Dict[str, dict]:
+        stats: Dict[str, dict] = {}
+        for source, transport in self._transports.items():
+            connections = getattr(connection_pool(transport), "connections", [])
+            idle: int = sum(1 for connection in connections if connection.is_idle())
+            stats[source] = {
+                "active": len(connections) - idle,
+                "idle": idle,
+                "max": self.max_connections(source),
+            }
+        return stats
+
+    async def aclose(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+        self._transports.clear()
+
+
+http_clients = HttpClientRegistry()
+
+
+def get_http_client(source: str) -> httpx.AsyncClient:
+    return http_clients.get(source)
+
+
+# Export pool utilisation on the /metrics endpoint
+class HttpPoolCollector:
+    def collect(self):
+        connections = GaugeMetricFamily(
+            "upstream_http_pool_connections",
+            "Pooled upstream connections by state",
+            labels=["source", "state"],
+        )
+        limits = GaugeMetricFamily(
+            "upstream_http_pool_max_connections",
+            "Configured upstream connection limit",
+            labels=["source"],
+        )
+
+        for source, stats in http_clients.pool_stats().items():
+            connections.add_metric([source, "active"], stats["active"])
+            connections.add_metric([source, "idle"], stats["idle"])
+            limits.add_metric([source], stats["max"])
+
+        yield connections
+        yield limits
+
+
+REGISTRY.register(HttpPoolCollector())
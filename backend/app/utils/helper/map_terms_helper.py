@@ -1,57 +1,273 @@
+from typing import Any, Callable, Dict, List, Tuple
+
+from utils.enum.term_enum import MergeStrategy
+
+Accessor = Callable[[Any], Any]
+
+# Term sections
+NCBI_SECTION: str = "Name and taxonomic classification"
+GBIF_SECTION: str = "Occurence (geoference records)"
+WIKIDATA_SECTION: str = "Wikidata"
+BACDIVE_SECTIONS: List[str] = [
+    "Morphology",
+    "Culture and growth conditions",
+    "Physiology and metabolism",
+    "Isolation, sampling and environmental information",
+    "Safety information",
+    "Sequence information",
+    "Genome-based predictions",
+]
+
+# Declarative term mapping. Each rule fills a term section from the raw data of
+# one web source, either with the value at "path" (dotted, "" for the whole data)
+# or with an object of "fields", each read from its own path. "require": "all"
+# only fills the section when every field has a value. Empty values never fill
+# a section.
+TERM_MAPPING: List[dict] = [
+    {
+        "web": "ncbi",
+        "section": NCBI_SECTION,
+        "fields": {"Lineage": "Lineage", "LineageEx": "LineageEx"},
+        "require": "all",
+    },
+    *(
+        {"web": "bacdive", "section": section, "path": section}
+        for section in BACDIVE_SECTIONS
+    ),
+    {"web": "gbif", "section": GBIF_SECTION, "path": ""},
+    {
+        "web": "wikidata",
+        "section": WIKIDATA_SECTION,
+        "fields": {
+            "Wikidata ID": "id",
+            "Label": "labels.en.value",
+            "Description": "descriptions.en.value",
+        },
+        "require": "any",
+    },
+]
+
+# How each section is combined when several rules fill it, REPLACE when not listed
+TERM_SECTION_MERGE: Dict[str, MergeStrategy] = {}
+
+
+def compile_path(path: str) -> Accessor:
+    keys: List[str] = path.split(".") if path else []
+
+    if not keys:
+        return lambda data: data
+
+    if len(keys) == 1:
+        key: str = keys[0]
+        return lambda data: data.get(key) if isinstance(data, dict) else None
+
+    def get(data: Any) -> Any:
+        for key in keys:
+            if not isinstance(data, dict):
+                return None
+            data = data.get(key)
+        return data
+
+    return get
+
+
+def compile_rule(rule: dict) -> Accessor:
+    if "fields" not in rule:
+        return compile_path(rule["path"])
+
+    fields: List[Tuple[str, Accessor]] = [
+        (name, compile_path(path)) for name, path in rule["fields"].items()
+    ]
+    require_all: bool = rule.get("require") == "all"
+
+    def get(data: Any) -> Any:
+        values: dict = {}
+        for name, get_field in fields:
+            value = get_field(data)
+            if value:
+                values[name] = value
+            elif require_all:
+                return None
+        return values
+
+    return get
+
+
+# Compile the mapping once into accessors grouped by web source
+def compile_mapping(
+    rules: List[dict],
+) -> Dict[str, List[Tuple[str, Accessor, MergeStrategy]]]:
+    compiled: Dict[str, List[Tuple[str, Accessor, MergeStrategy]]] = {}
+    for rule in rules:
+        compiled.setdefault(rule["web"], []).append(
+            (
+                rule["section"],
+                compile_rule(rule),
+                TERM_SECTION_MERGE.get(rule["section"], MergeStrategy.REPLACE),
+            )
+        )
+    return compiled
+
+
+def merge_values(strategy: MergeStrategy, current: Any, value: Any) -> Any:
+    if strategy is MergeStrategy.FIRST:
+        return current
+
+    if strategy is MergeStrategy.MERGE:
+        if isinstance(current, dict) and isinstance(value, dict):
+            return {**current, **value}
+        if isinstance(current, list) and isinstance(value, list):
+            return current + value
+
+    return value
+
+
+COMPILED_MAPPING: Dict[str, List[Tuple[str, Accessor, MergeStrategy]]] = (
+    compile_mapping(TERM_MAPPING)
+)
+
+
 def mapping(params: list) -> dict:
     combined_data: dict = {}
 
     for item in params:
-        match item["web"]:
-            case "ncbi":
-                if item["data"].get("Lineage") and item["data"].get("LineageEx"):
-                    combined_data["Name and taxonomic classification"] = {
-                        "Lineage": item["data"]["Lineage"],
-                        "LineageEx": item["data"]["LineageEx"],
-                    }
-
-            case "bacdive":
-                if item["data"].get("Morphology"):
-                    combined_data["Morphology"] = item["data"]["Morphology"]
-
-                if item["data"].get("Culture and growth conditions"):
-                    combined_data["Culture and growth conditions"] = item["data"][
-                        "Culture and growth conditions"
-                    ]
+        for section, get, strategy in COMPILED_MAPPING.get(item["web"], ()):
+            value = get(item.get("data"))
+            if not value:
+                continue
 
-                if item["data"].get("Physiology and metabolism"):
-                    combined_data["Physiology and metabolism"] = item["data"][
-                        "Physiology and metabolism"
-                    ]
+            if section in combined_data:
+                combined_data[section] = merge_values(
+                    strategy, combined_data[section], value
+                )
+            else:
+                combined_data[section] = value
 
-                if item["data"].get(
-                    "Isolation, sampling and environmental information"
-                ):
-                    combined_data[
-                        "Isolation, sampling and environmental information"
-                    ] = item["data"][
-                        "Isolation, sampling and environmental information"
-                    ]
+    return combined_data
 
-                if item["data"].get("Safety information"):
-                    combined_data["Safety information"] = item["data"][
-                        "Safety information"
-                    ]
 
-                if item["data"].get("Sequence information"):
-                    combined_data["Sequence information"] = item["data"][
-                        "Sequence information"
-                    ]
+# Aggregation expression true where Python would be truthy
+def truthy_expression(expression: Any) -> dict:
+    return {
+        "$not": [
+            {"$in": [{"$ifNull": [expression, None]}, [None, False, 0, "", [], {}]]}
+        ]
+    }
+
 
-                if item["data"].get("Genome-based predictions"):
-                    combined_data["Genome-based predictions"] = item["data"][
-                        "Genome-based predictions"
+# Aggregation expression of the value at a dotted path, null where a step is not
+# an object, as compile_path ($getField fails on other inputs)
+def path_expression(path: str, root: Any = "$data") -> Any:
+    expression: Any = root
+    for depth, key in enumerate(path.split(".") if path else []):
+        name: str = f"input{depth}"
+        expression = {
+            "$let": {
+                "vars": {name: expression},
+                "in": {
+                    "$cond": [
+                        {"$eq": [{"$type": f"$${name}"}, "object"]},
+                        {"$getField": {"field": key, "input": f"$${name}"}},
+                        None,
                     ]
+                },
+            }
+        }
+    return expression
 
-            case "gbif":
-                if item.get("data"):
-                    combined_data["Occurence (geoference records)"] = item["data"]
-            case _:
-                pass
 
-    return combined_data
+def rule_expression(rule: dict) -> Any:
+    if "fields" not in rule:
+        return path_expression(rule["path"])
+
+    fields: Dict[str, Any] = {
+        name: path_expression(path) for name, path in rule["fields"].items()
+    }
+    if rule.get("require") == "all":
+        return {
+            "$cond": [
+                {"$and": [truthy_expression(field) for field in fields.values()]},
+                fields,
+                None,
+            ]
+        }
+
+    return {
+        "$arrayToObject": {
+            "$filter": {
+                "input": [{"k": name, "v": field} for name, field in fields.items()],
+                "cond": truthy_expression("$$this.v"),
+            }
+        }
+    }
+
+
+# Aggregation expression of the term sections of one raw document, the
+# server-side equivalent of mapping for a single raw
+def mapping_expression() -> dict:
+    rules_by_web: Dict[str, List[dict]] = {}
+    for rule in TERM_MAPPING:
+        rules_by_web.setdefault(rule["web"], []).append(rule)
+
+    return {
+        "$switch": {
+            "branches": [
+                {
+                    "case": {"$eq": ["$web", web]},
+                    "then": {
+                        "$arrayToObject": {
+                            "$filter": {
+                                "input": [
+                                    {"k": rule["section"], "v": rule_expression(rule)}
+                                    for rule in rules
+                                ],
+                                "cond": truthy_expression("$$this.v"),
+                            }
+                        }
+                    },
+                }
+                for web, rules in rules_by_web.items()
+            ],
+            "default": {},
+        }
+    }
+
+
+# Aggregation expression combining the sections of the next raw ($$this) into
+# the sections so far ($$value), following TERM_SECTION_MERGE
+def sections_merge_expression() -> dict:
+    merged: Dict[str, Any] = {}
+    for section, strategy in TERM_SECTION_MERGE.items():
+        current: dict = path_expression(section, "$$value")
+        value: dict = path_expression(section, "$$this")
+
+        if strategy is MergeStrategy.FIRST:
+            merged[section] = {"$ifNull": [current, value, "$$REMOVE"]}
+        elif strategy is MergeStrategy.MERGE:
+            merged[section] = {
+                "$switch": {
+                    "branches": [
+                        {
+                            "case": {
+                                "$and": [
+                                    {"$eq": [{"$type": current}, "object"]},
+                                    {"$eq": [{"$type": value}, "object"]},
+                                ]
+                            },
+                            "then": {"$mergeObjects": [current, value]},
+                        },
+                        {
+                            "case": {
+                                "$and": [
+                                    {"$isArray": [current]},
+                                    {"$isArray": [value]},
+                                ]
+                            },
+                            "then": {"$concatArrays": [current, value]},
+                        },
+                    ],
+                    "default": {"$ifNull": [value, current, "$$REMOVE"]},
+                }
+            }
+
+    return {"$mergeObjects": ["$$value", "$$this", merged]}
@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+from typing import List, Set, Tuple
+
+from prometheus_client import Counter
+from pymongo import UpdateOne
+from pymongo.errors import PyMongoError
+
+from database.mongo import negative_cache_collection
+from config import NEGATIVE_CACHE_ENABLED, NEGATIVE_CACHE_TTL
+
+negative_cache_hits_total = Counter(
+    "negative_cache_hits_total",
+    "Source/taxon lookups skipped because of a cached not-found result",
+    ["web"],
+)
+
+
+def negative_cache_ttl(web: str) -> float:
+    return NEGATIVE_CACHE_TTL.get(web, 0) if NEGATIVE_CACHE_ENABLED else 0
+
+
+# Return the (web, ncbi_taxon_id) pairs with a live not-found entry, in one query
+async def get_cached_misses(
+    webs: List[str], ncbi_taxon_ids: List[str]
+) -> Set[Tuple[str, str]]:
+    webs = [web for web in webs if negative_cache_ttl(web)]
+    if not webs or not ncbi_taxon_ids:
+        return set()
+
+    try:
+        entries: List[dict] = await negative_cache_collection.find(
+            {
+                "web": {"$in": webs},
+                "ncbi_taxon_id": {"$in": ncbi_taxon_ids},
+                # The TTL monitor only runs once a minute, filter explicitly
+                "expires_at": {"$gt": datetime.utcnow()},
+            },
+            {"_id": 0, "web": 1, "ncbi_taxon_id": 1},
+        ).to_list(length=None)
+    except PyMongoError:
+        return set()
+
+    return {(entry["web"], entry["ncbi_taxon_id"]) for entry in entries}
+
+
+# Remember that a web source has nothing for these taxa
+async def record_misses(web: str, ncbi_taxon_ids: List[str]) -> None:
+    ttl: float = negative_cache_ttl(web)
+    if not ttl or not ncbi_taxon_ids:
+        return
+
+    now: datetime = datetime.utcnow()
+    operations: List[UpdateOne] = [
+        UpdateOne(
+            {"web": web, "ncbi_taxon_id": ncbi_taxon_id},
+            {
+                "$set": {
+                    "web": web,
+                    "ncbi_taxon_id": ncbi_taxon_id,
+                    "checked_at": now,
+                    "expires_at": now + timedelta(seconds=ttl),
+                }
+            },
+            upsert=True,
+        )
+        for ncbi_taxon_id in ncbi_taxon_ids
+    ]
+
+    try:
+        await negative_cache_collection.bulk_write(operations, ordered=False)
+    except PyMongoError:
+        pass
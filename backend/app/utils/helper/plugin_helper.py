@@ -0,0 +1,112 @@
+import importlib.util
+import os
+import time
+from types import ModuleType
+from typing import Callable, Dict, List, Optional, Tuple
+
+from prometheus_client import Counter, Gauge
+
+from utils.enum.status_code_enum import StatusCode
+from config import OPERATIONS_FOLDERS, PLUGIN_HOT_RELOAD
+
+# Hooks every operation plugin must define
+REQUIRED_HOOKS: Tuple[str, ...] = ("retrieve", "data_processing")
+
+# Optional batch hooks: retrieve_many(taxa) -> {ncbi_taxon_id: data},
+# data_processing_many(items) -> [processed item], in the order given, and
+# resolve_ids(taxa) -> {ncbi_taxon_id: source identifier} for resolved taxa
+BATCH_HOOKS: Tuple[str, ...] = (
+    "retrieve_many",
+    "data_processing_many",
+    "resolve_ids",
+)
+
+# Optional hooks: the batch hooks, source_version(processed data) -> the
+# source-side version (e.g. an update date or revision) or None, and
+# raw_header(processed data) -> searchable fields stored uncompressed
+OPTIONAL_HOOKS: Tuple[str, ...] = BATCH_HOOKS + ("source_version", "raw_header")
+
+# Batch size for plugins that do not declare BATCH_SIZE
+DEFAULT_BATCH_SIZE: int = 50
+
+plugin_loads_total = Counter(
+    "operation_plugin_loads_total",
+    "Times an operation plugin module was loaded",
+    ["plugin"],
+)
+plugin_load_seconds = Gauge(
+    "operation_plugin_load_seconds",
+    "Duration of the last load of an operation plugin module",
+    ["plugin"],
+)
+
+
+# Operation plugins (operations/<web>.py), loaded once and kept in memory
+class PluginRegistry:
+    def __init__(self, folder: str, hot_reload: bool = False):
+        self.folder = folder
+        self.hot_reload = hot_reload
+        self._modules: Dict[str, Tuple[float, ModuleType]] = {}
+        self.load_times: Dict[str, float] = {}
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.folder, name + ".py")
+
+    def _load(self, name: str, mtime: float) -> ModuleType:
+        started: float = time.perf_counter()
+
+        spec = importlib.util.spec_from_file_location(name, self.path(name))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+        # Reject plugins without the required hooks before they are used
+        missing_hooks: List[str] = [
+            hook for hook in REQUIRED_HOOKS if not callable(getattr(module, hook, None))
+        ] + [
+            hook
+            for hook in OPTIONAL_HOOKS
+            if hasattr(module, hook) and not callable(getattr(module, hook))
+        ]
+        if missing_hooks:
+            raise Exception(
+                {
+                    "data": [],
+                    "message": f"Operation plugin {name} is missing hooks: {', '.join(missing_hooks)}.",
+                    "status_code": StatusCode.INTERNAL_SERVER_ERROR.value,
+                }
+            )
+
+        elapsed: float = time.perf_counter() - started
+        self.load_times[name] = elapsed
+        plugin_load_seconds.labels(name).set(elapsed)
+        plugin_loads_total.labels(name).inc()
+
+        self._modules[name] = (mtime, module)
+        return module
+
+    def get(self, name: str) -> ModuleType:
+        cached = self._modules.get(name)
+        if cached and not self.hot_reload:
+            return cached[1]
+
+        # Hot reload compares the file's mtime with the loaded version
+        mtime: float = os.path.getmtime(self.path(name))
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        return self._load(name, mtime)
+
+    # Return an optional hook of a plugin, or None when it does not define it
+    def hook(self, name: str, hook: str) -> Optional[Callable]:
+        return getattr(self.get(name), hook, None)
+
+    # Preferred number of items per batch hook call
+    def batch_size(self, name: str) -> int:
+        return max(int(getattr(self.get(name), "BATCH_SIZE", DEFAULT_BATCH_SIZE)), 1)
+
+    def load_all(self, names: List[str]) -> None:
+        for name in names:
+            self.get(name)
+
+
+plugin_registry = PluginRegistry(OPERATIONS_FOLDERS, PLUGIN_HOT_RELOAD)
@@ -0,0 +1,167 @@
+import asyncio
+import time
+from typing import Dict
+
+import httpx
+from prometheus_client import Counter, Gauge
+
+from config import (
+    ADAPTIVE_CONCURRENCY_MAX,
+    ADAPTIVE_CONCURRENCY_MIN,
+    RATE_LIMIT_BURST,
+    RATE_LIMIT_PER_SECOND,
+)
+
+# Fallbacks for sources without an explicit setting
+DEFAULT_RATE_PER_SECOND: float = 5
+DEFAULT_CONCURRENCY_MAX: int = 10
+
+# Responses that mean the upstream wants us to slow down
+OVERLOAD_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Multiplicative decrease applied on overload, at most once per window
+DECREASE_FACTOR: float = 0.5
+DECREASE_WINDOW: float = 1.0
+
+concurrency_limit_gauge = Gauge(
+    "upstream_concurrency_limit",
+    "Current adaptive concurrency limit per upstream source",
+    ["source"],
+)
+in_flight_gauge = Gauge(
+    "upstream_in_flight_requests",
+    "Requests currently in flight per upstream source",
+    ["source"],
+)
+overload_total = Counter(
+    "upstream_overload_responses_total",
+    "Throttling (429), 5xx or transport failures seen per upstream source",
+    ["source"],
+)
+
+
+# Token bucket capping the sustained request rate
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens: float = self.burst
+        self._updated: float = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        # A rate of zero or less disables the bucket
+        if self.rate <= 0:
+            return
+
+        # Waiters queue on the lock, so tokens are handed out in order
+        async with self._lock:
+            while True:
+                now: float = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# AIMD concurrency limit: grow by one per window of successes, halve on overload
+class AdaptiveConcurrencyLimiter:
+    def __init__(self, source: str, max_limit: int, min_limit: int):
+        self.source = source
+        self.max_limit = max(max_limit, 1)
+        self.min_limit = max(min(min_limit, self.max_limit), 1)
+        self.limit: float = max(self.min_limit, self.max_limit / 2)
+        self.in_flight: int = 0
+        self._last_decrease: float = 0
+        self._condition = asyncio.Condition()
+        concurrency_limit_gauge.labels(source).set(self.limit)
+
+    async def acquire(self) -> None:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+            in_flight_gauge.labels(self.source).set(self.in_flight)
+
+    async def release(self, overloaded: bool) -> None:
+        async with self._condition:
+            self.in_flight -= 1
+            now: float = time.monotonic()
+
+            if overloaded:
+                overload_total.labels(self.source).inc()
+                # One burst of failures only counts as one decrease
+                if now - self._last_decrease >= DECREASE_WINDOW:
+                    self.limit = max(self.min_limit, self.limit * DECREASE_FACTOR)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+            concurrency_limit_gauge.labels(self.source).set(self.limit)
+            in_flight_gauge.labels(self.source).set(self.in_flight)
+            self._condition.notify_all()
+
+
+# Rate and concurrency limits for one upstream source
+class SourceRateLimiter:
+    def __init__(self, source: str):
+        self.source = source
+        rate: float = RATE_LIMIT_PER_SECOND.get(source, DEFAULT_RATE_PER_SECOND)
+        self.bucket = TokenBucket(rate, RATE_LIMIT_BURST.get(source, rate))
+        self.concurrency = AdaptiveConcurrencyLimiter(
+            source,
+            ADAPTIVE_CONCURRENCY_MAX.get(source, DEFAULT_CONCURRENCY_MAX),
+            ADAPTIVE_CONCURRENCY_MIN,
+        )
+
+    async def acquire(self) -> None:
+        await self.concurrency.acquire()
+        try:
+            await self.bucket.acquire()
+        except BaseException:
+            await self.concurrency.release(overloaded=False)
+            raise
+
+    async def release(self, overloaded: bool) -> None:
+        await self.concurrency.release(overloaded)
+
+
+rate_limiters: Dict[str, SourceRateLimiter] = {}
+
+
+def get_rate_limiter(source: str) -> SourceRateLimiter:
+    if source not in rate_limiters:
+        rate_limiters[source] = SourceRateLimiter(source)
+    return rate_limiters[source]
+
+
+# Transport wrapper that routes every request of a source through its limiter
+class RateLimitedTransport(httpx.AsyncBaseTransport):
+    def __init__(self, transport: httpx.AsyncBaseTransport, source: str):
+        self._transport = transport
+        self._limiter: SourceRateLimiter = get_rate_limiter(source)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        await self._limiter.acquire()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.TransportError:
+            # Timeouts and connection failures count as overload
+            await self._limiter.release(overloaded=True)
+            raise
+        except BaseException:
+            await self._limiter.release(overloaded=False)
+            raise
+
+        await self._limiter.release(
+            overloaded=response.status_code in OVERLOAD_STATUS_CODES
+        )
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
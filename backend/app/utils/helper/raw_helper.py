@@ -0,0 +1,150 @@
+import hashlib
+import importlib.util
+import json
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Optional
+
+from bson import Binary
+from prometheus_client import Counter, Histogram
+
+from utils.enum.status_code_enum import StatusCode
+from utils.helper.func_helper import call_function
+from utils.helper.plugin_helper import plugin_registry
+from config import (
+    RAW_COMPRESSION,
+    RAW_COMPRESSION_LEVEL,
+    RAW_COMPRESSION_MIN_BYTES,
+    RAW_MAX_AGE,
+)
+
+# zstd compression needs the optional "zstandard" package, zlib is used without it
+ZSTD_AVAILABLE: bool = importlib.util.find_spec("zstandard") is not None
+if ZSTD_AVAILABLE:
+    import zstandard
+
+# Top-level keys kept in the header of a raw
+MAX_HEADER_KEYS: int = 50
+
+raw_stored_bytes_total = Counter(
+    "raw_stored_bytes_total",
+    "Bytes of raw data written, before (original) and after (stored) compression",
+    ["web", "kind"],
+)
+raw_compression_ratio = Histogram(
+    "raw_compression_ratio",
+    "Original size divided by compressed size of stored raws",
+    ["web"],
+    buckets=(1, 2, 3, 5, 8, 13, 21, 34),
+)
+raw_decode_seconds = Histogram(
+    "raw_decode_seconds",
+    "Time to decompress and parse a stored raw",
+    ["web", "encoding"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1),
+)
+
+
+# Canonical JSON of raw data, independent of key order
+def canonical_json(data: Any) -> bytes:
+    return json.dumps(
+        data, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    ).encode()
+
+
+# Source-side version of raw data, when the plugin defines source_version
+async def source_version(web: str, data: Any) -> Optional[str]:
+    hook = plugin_registry.hook(web, "source_version")
+    if not hook or not data:
+        return None
+
+    version = await call_function(hook, data)
+    return str(version) if version else None
+
+
+# Small searchable summary of raw data, stored uncompressed next to it
+async def raw_header(web: str, data: Any, size: int) -> dict:
+    header: dict = {
+        "bytes": size,
+        "keys": list(data)[:MAX_HEADER_KEYS] if isinstance(data, dict) else [],
+    }
+
+    hook = plugin_registry.hook(web, "raw_header")
+    if hook and data:
+        header.update(await call_function(hook, data) or {})
+    return header
+
+
+def compression_encoding() -> Optional[str]:
+    if RAW_COMPRESSION == "zstd":
+        return "zstd" if ZSTD_AVAILABLE else "zlib"
+    if RAW_COMPRESSION == "zlib":
+        return "zlib"
+    return None
+
+
+def compress(encoding: str, payload: bytes) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=RAW_COMPRESSION_LEVEL).compress(payload)
+    return zlib.compress(payload, RAW_COMPRESSION_LEVEL)
+
+
+def decompress(encoding: str, blob: bytes) -> bytes:
+    if encoding == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise Exception(
+                {
+                    "data": [],
+                    "message": "Raw data is zstd-compressed but zstandard is not installed.",
+                    "status_code": StatusCode.INTERNAL_SERVER_ERROR.value,
+                }
+            )
+        return zstandard.ZstdDecompressor().decompress(blob)
+    return zlib.decompress(blob)
+
+
+# Fields stored with every raw document: the data, plain or compressed with its
+# header, and when and what was fetched
+async def raw_fields(web: str, data: Any) -> dict:
+    payload: bytes = canonical_json(data)
+    fields: dict = {
+        "data": data,
+        "data_blob": None,
+        "data_encoding": None,
+        "data_header": await raw_header(web, data, len(payload)),
+        "content_hash": hashlib.sha256(payload).hexdigest(),
+        "source_version": await source_version(web, data),
+        "fetched_at": datetime.utcnow(),
+    }
+
+    # Small payloads are not worth compressing
+    encoding: Optional[str] = compression_encoding()
+    if encoding and len(payload) >= RAW_COMPRESSION_MIN_BYTES:
+        blob: bytes = compress(encoding, payload)
+        fields.update(data=None, data_blob=Binary(blob), data_encoding=encoding)
+        raw_compression_ratio.labels(web).observe(len(payload) / max(len(blob), 1))
+        raw_stored_bytes_total.labels(web, "stored").inc(len(blob))
+    else:
+        raw_stored_bytes_total.labels(web, "stored").inc(len(payload))
+    raw_stored_bytes_total.labels(web, "original").inc(len(payload))
+
+    return fields
+
+
+# Data of a stored raw, decompressed only when it is read
+def decode_raw_data(raw: dict) -> Any:
+    encoding: Optional[str] = raw.get("data_encoding")
+    if not encoding:
+        return raw.get("data")
+
+    started: float = time.perf_counter()
+    data: Any = json.loads(decompress(encoding, raw["data_blob"]))
+    raw_decode_seconds.labels(raw.get("web", ""), encoding).observe(
+        time.perf_counter() - started
+    )
+    return data
+
+
+def raw_max_age(web: str) -> float:
+    return RAW_MAX_AGE.get(web, 0)
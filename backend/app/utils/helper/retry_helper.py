@@ -0,0 +1,256 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Collection, Dict, Optional
+
+import httpx
+from prometheus_client import Counter, Gauge
+
+from utils.helper.cache_helper import (
+    cache_requests_total,
+    cached_response,
+    is_fresh,
+    note_cache_key,
+    revalidation_headers,
+    upstream_cache,
+)
+from utils.helper.http_client_helper import get_http_client
+from config import (
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    CIRCUIT_BREAKER_RESET_TIMEOUT,
+    RETRY_AFTER_MAX,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_ATTEMPTS,
+    RETRY_MAX_DELAY,
+)
+
+# Statuses worth another attempt, every other 4xx fails fast
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+# Circuit breaker states, exported as gauge values
+CIRCUIT_CLOSED: int = 0
+CIRCUIT_HALF_OPEN: int = 1
+CIRCUIT_OPEN: int = 2
+
+retries_total = Counter(
+    "upstream_retries_total",
+    "Retried upstream requests per source and reason",
+    ["source", "reason"],
+)
+circuit_state_gauge = Gauge(
+    "upstream_circuit_state",
+    "Circuit breaker state per upstream source (0 closed, 1 half-open, 2 open)",
+    ["source"],
+)
+circuit_opened_total = Counter(
+    "upstream_circuit_opened_total",
+    "Times the circuit breaker of an upstream source opened",
+    ["source"],
+)
+
+
+# Raised without touching the network while a source's breaker is open
+class CircuitOpenError(httpx.HTTPError):
+    def __init__(self, source: str):
+        super().__init__(f"Circuit breaker open for {source}")
+        self.source = source
+
+
+# Consecutive-failure circuit breaker for one upstream source, counting failed requests
+class CircuitBreaker:
+    def __init__(self, source: str, failure_threshold: int, reset_timeout: float):
+        self.source = source
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state: int = CIRCUIT_CLOSED
+        self.failures: int = 0
+        self._opened_at: float = 0
+        self._trial_in_flight: bool = False
+        circuit_state_gauge.labels(source).set(self.state)
+
+    def _set_state(self, state: int) -> None:
+        self.state = state
+        circuit_state_gauge.labels(self.source).set(state)
+
+    def is_open(self) -> bool:
+        return (
+            self.state == CIRCUIT_OPEN
+            and time.monotonic() < self._opened_at + self.reset_timeout
+        )
+
+    def allow_request(self) -> bool:
+        if self.state == CIRCUIT_OPEN:
+            if self.is_open():
+                return False
+            self._set_state(CIRCUIT_HALF_OPEN)
+            self._trial_in_flight = False
+
+        # Half-open lets a single trial request through
+        if self.state == CIRCUIT_HALF_OPEN:
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+
+        return True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._trial_in_flight = False
+        if self.state != CIRCUIT_CLOSED:
+            self._set_state(CIRCUIT_CLOSED)
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == CIRCUIT_HALF_OPEN or (
+            self.state == CIRCUIT_CLOSED and self.failures >= self.failure_threshold
+        ):
+            self._opened_at = time.monotonic()
+            self._set_state(CIRCUIT_OPEN)
+            circuit_opened_total.labels(self.source).inc()
+
+    # A request that ended without a verdict (e.g. cancelled) gives up its trial
+    def release_trial(self) -> None:
+        self._trial_in_flight = False
+
+
+circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(source: str) -> CircuitBreaker:
+    if source not in circuit_breakers:
+        circuit_breakers[source] = CircuitBreaker(
+            source, CIRCUIT_BREAKER_FAILURE_THRESHOLD, CIRCUIT_BREAKER_RESET_TIMEOUT
+        )
+    return circuit_breakers[source]
+
+
+# Parse Retry-After given either in seconds or as an HTTP date
+def parse_retry_after(response: httpx.Response) -> Optional[float]:
+    value: Optional[str] = response.headers.get("Retry-After")
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+# Capped exponential backoff with full jitter
+def backoff_delay(attempt: int) -> float:
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2**attempt))
+
+
+# Send a request to an upstream source, served from the cache when possible
+async def send_request(
+    source: str,
+    method: str,
+    url: str,
+    allow_status: Collection[int] = (),
+    **kwargs,
+) -> httpx.Response:
+    # Only GET responses are cached
+    if method != "GET" or not upstream_cache.ttl(source):
+        return await send_uncached_request(
+            source, method, url, allow_status=allow_status, **kwargs
+        )
+
+    request: httpx.Request = get_http_client(source).build_request(
+        method, url, params=kwargs.get("params")
+    )
+    key: str = upstream_cache.key(source, method, str(request.url))
+    note_cache_key(key)
+    entry: Optional[dict] = await upstream_cache.get(key)
+
+    if entry and is_fresh(entry):
+        cache_requests_total.labels(source, "hit").inc()
+        return cached_response(entry, request)
+
+    # Revalidate a stale entry with ETag / Last-Modified when it has them
+    conditional_headers: dict = revalidation_headers(entry) if entry else {}
+    if conditional_headers:
+        kwargs["headers"] = {**(kwargs.get("headers") or {}), **conditional_headers}
+        allow_status = {*allow_status, 304}
+
+    response = await send_uncached_request(
+        source, method, url, allow_status=allow_status, **kwargs
+    )
+
+    if response.status_code == 304 and entry:
+        cache_requests_total.labels(source, "revalidated").inc()
+        await upstream_cache.touch(source, key)
+        return cached_response(entry, request)
+
+    cache_requests_total.labels(source, "miss").inc()
+    if response.is_success:
+        await upstream_cache.set(source, key, str(request.url), response)
+
+    return response
+
+
+# Send a request to an upstream source with retries and its circuit breaker
+async def send_uncached_request(
+    source: str,
+    method: str,
+    url: str,
+    allow_status: Collection[int] = (),
+    **kwargs,
+) -> httpx.Response:
+    breaker: CircuitBreaker = get_circuit_breaker(source)
+    client: httpx.AsyncClient = get_http_client(source)
+
+    if not breaker.allow_request():
+        raise CircuitOpenError(source)
+
+    # One failure is recorded per request, once its retries are exhausted
+    try:
+        attempt: int = 0
+        while True:
+            delay: Optional[float] = None
+            try:
+                response = await client.request(method, url, **kwargs)
+
+                # Success, or a status the caller handles itself
+                if response.is_success or response.status_code in allow_status:
+                    breaker.record_success()
+                    return response
+
+                # Non-retryable 4xx: the upstream is healthy, fail fast
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    breaker.record_success()
+                    response.raise_for_status()
+
+                reason: str = str(response.status_code)
+                error: httpx.HTTPError = httpx.HTTPStatusError(
+                    f"{response.status_code} from {source}",
+                    request=response.request,
+                    response=response,
+                )
+                retry_after: Optional[float] = parse_retry_after(response)
+                if retry_after is not None:
+                    delay = min(retry_after, RETRY_AFTER_MAX)
+
+            except httpx.TransportError as e:
+                reason = type(e).__name__
+                error = e
+
+            attempt += 1
+            if attempt >= RETRY_MAX_ATTEMPTS:
+                breaker.record_failure()
+                raise error
+
+            retries_total.labels(source, reason).inc()
+            await asyncio.sleep(delay if delay is not None else backoff_delay(attempt))
+
+            # Other requests may have opened the breaker while this one waited
+            if breaker.is_open():
+                raise CircuitOpenError(source)
+    finally:
+        breaker.release_trial()
@@ -0,0 +1,61 @@
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Tuple
+
+from prometheus_client import Gauge
+
+from config import STORE_CONCURRENCY, STORE_SOURCE_CONCURRENCY
+
+# Per-source limit for sources without an explicit setting
+DEFAULT_SOURCE_CONCURRENCY: int = 4
+
+scheduler_in_flight = Gauge(
+    "store_scheduler_in_flight_jobs",
+    "Store jobs currently running per source",
+    ["source"],
+)
+
+# A job: (source, function, arguments)
+Job = Tuple[str, Callable[..., Awaitable[Any]], tuple]
+
+
+# Runs jobs concurrently under one global limit and a limit per source
+class BoundedScheduler:
+    def __init__(self, global_limit: int, source_limits: Dict[str, int]):
+        self._global = asyncio.Semaphore(max(global_limit, 1))
+        self._source_limits = source_limits
+        self._sources: Dict[str, asyncio.Semaphore] = {}
+
+    def _source_semaphore(self, source: str) -> asyncio.Semaphore:
+        if source not in self._sources:
+            limit: int = self._source_limits.get(source, DEFAULT_SOURCE_CONCURRENCY)
+            self._sources[source] = asyncio.Semaphore(max(limit, 1))
+        return self._sources[source]
+
+    async def run(self, source: str, function, *args) -> Any:
+        # Take the source slot first, so a job waiting on a busy source does not
+        # hold a global slot that another source could use
+        async with self._source_semaphore(source):
+            async with self._global:
+                scheduler_in_flight.labels(source).inc()
+                try:
+                    return await function(*args)
+                finally:
+                    scheduler_in_flight.labels(source).dec()
+
+    # Run the jobs and yield their results as they complete
+    async def as_completed(self, jobs: List[Job]) -> AsyncIterator[Any]:
+        tasks: List[asyncio.Task] = [
+            asyncio.ensure_future(self.run(source, function, *args))
+            for source, function, args in jobs
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # Stop the remaining jobs when the caller fails or stops early
+            for task in tasks:
+                task.cancel()
+
+
+# Shared by all store runs, so concurrent requests respect the same global limit
+store_scheduler = BoundedScheduler(STORE_CONCURRENCY, STORE_SOURCE_CONCURRENCY)
@@ -0,0 +1,2 @@
+from fake_upstream.faults import FaultPlan, Faults, Latency
+from fake_upstream.server import FakeUpstreamServer, create_app
@@ -0,0 +1,74 @@
+import argparse
+import json
+
+from fake_upstream.faults import FaultPlan, Faults
+from fake_upstream.server import FakeUpstreamServer
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m fake_upstream",
+        description="Serve recorded or synthetic NCBI, GBIF, Wikidata and BacDive "
+        "responses. Point the app at it with UPSTREAM_BASE_URL.",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--fixtures", help="Directory of recorded responses")
+    parser.add_argument(
+        "--record",
+        action="store_true",
+        help="Forward requests without a fixture to the real upstream and save them",
+    )
+    parser.add_argument(
+        "--config", help="JSON fault plan with 'default' and per-host 'hosts' entries"
+    )
+    parser.add_argument(
+        "--latency",
+        default="fixed:0",
+        help="fixed:S, uniform:LOW,HIGH or lognormal:MEDIAN,SIGMA",
+    )
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument(
+        "--burst-every", type=float, default=0, help="Seconds between 429 bursts"
+    )
+    parser.add_argument(
+        "--burst-duration", type=float, default=0, help="Length of a 429 burst"
+    )
+    parser.add_argument("--retry-after", type=float, default=1)
+    parser.add_argument(
+        "--miss-rate", type=float, default=0, help="Share of taxa without upstream data"
+    )
+    parser.add_argument("--seed", type=int)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+
+    if args.config:
+        with open(args.config) as file:
+            faults = FaultPlan.from_dict(json.load(file), seed=args.seed)
+    else:
+        faults = FaultPlan(
+            default=Faults(
+                latency=args.latency,
+                error_rate=args.error_rate,
+                error_status=args.error_status,
+                burst_every=args.burst_every,
+                burst_duration=args.burst_duration,
+                retry_after=args.retry_after,
+                miss_rate=args.miss_rate,
+            ),
+            seed=args.seed,
+        )
+
+    server = FakeUpstreamServer(
+        args.host, args.port, args.fixtures, faults, record=args.record
+    )
+    print(f"Fake upstream listening on {server.url}")
+    server.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import math
+import random
+import time
+from typing import Dict, List, Optional
+
+# Number of parameters of each latency distribution
+LATENCY_KINDS: Dict[str, int] = {"fixed": 1, "uniform": 2, "lognormal": 2}
+
+
+# Latency distribution given as "fixed:S", "uniform:LOW,HIGH" or "lognormal:MEDIAN,SIGMA"
+class Latency:
+    def __init__(self, spec: str = "fixed:0"):
+        kind, _, args = spec.partition(":")
+        values: List[float] = [float(v) for v in args.split(",") if v]
+        if LATENCY_KINDS.get(kind) != len(values):
+            raise ValueError(f"Invalid latency: {spec}")
+
+        self.spec = spec
+        self.kind = kind
+        self.values = values
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.values[0]
+        if self.kind == "uniform":
+            return rng.uniform(*self.values)
+
+        # lognormal, parameterised by its median so the spec reads in seconds
+        median, sigma = self.values
+        return rng.lognormvariate(math.log(median), sigma) if median > 0 else 0
+
+
+# Faults injected into the responses of one upstream host
+class Faults:
+    def __init__(
+        self,
+        latency: str = "fixed:0",
+        error_rate: float = 0,
+        error_status: int = 503,
+        burst_every: float = 0,
+        burst_duration: float = 0,
+        retry_after: Optional[float] = 1,
+        miss_rate: float = 0,
+    ):
+        self.latency = Latency(latency)
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.burst_every = burst_every
+        self.burst_duration = burst_duration
+        self.retry_after = retry_after
+        self.miss_rate = miss_rate
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Faults":
+        return cls(**data)
+
+    def to_dict(self) -> dict:
+        return {
+            "latency": self.latency.spec,
+            "error_rate": self.error_rate,
+            "error_status": self.error_status,
+            "burst_every": self.burst_every,
+            "burst_duration": self.burst_duration,
+            "retry_after": self.retry_after,
+            "miss_rate": self.miss_rate,
+        }
+
+    # A 429 burst covers the first burst_duration seconds of every burst_every seconds
+    def in_burst(self, elapsed: float) -> bool:
+        return (
+            bool(self.burst_every) and elapsed % self.burst_every < self.burst_duration
+        )
+
+
+# Fault settings per host, with a default for hosts without their own
+class FaultPlan:
+    def __init__(
+        self,
+        default: Optional[Faults] = None,
+        hosts: Optional[Dict[str, Faults]] = None,
+        seed: Optional[int] = None,
+    ):
+        self.default = default or Faults()
+        self.hosts = hosts or {}
+        self.rng = random.Random(seed)
+        self.started_at = time.monotonic()
+
+    def for_host(self, host: str) -> Faults:
+        return self.hosts.get(host, self.default)
+
+    @classmethod
+    def from_dict(cls, data: dict, seed: Optional[int] = None) -> "FaultPlan":
+        return cls(
+            default=Faults.from_dict(data.get("default") or {}),
+            hosts={
+                host: Faults.from_dict(faults)
+                for host, faults in (data.get("hosts") or {}).items()
+            },
+            seed=seed,
+        )
+
+    def to_dict(self) -> dict:
+        return {
+            "default": self.default.to_dict(),
+            "hosts": {host: faults.to_dict() for host, faults in self.hosts.items()},
+        }
@@ -0,0 +1,250 @@
+import hashlib
+import json
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+# Synthetic response: (status_code, content_type, body)
+Synthetic = Tuple[int, str, str]
+
+JSON: str = "application/json"
+XML: str = "text/xml"
+HTML: str = "text/html; charset=utf-8"
+SPARQL_JSON: str = "application/sparql-results+json"
+
+
+# Stable number derived from a value, so repeated runs serve identical data
+def stable_number(value: str, digits: int = 7) -> int:
+    return int(hashlib.sha1(value.encode()).hexdigest(), 16) % 10**digits + 1
+
+
+# Deterministically mark a share of the values as having no upstream data
+def is_miss(value: str, miss_rate: float) -> bool:
+    return miss_rate > 0 and stable_number("miss:" + value, 6) / 10**6 <= miss_rate
+
+
+def first(query: Dict[str, List[str]], name: str) -> str:
+    return (query.get(name) or [""])[0]
+
+
+# NCBI E-utilities
+def ncbi_efetch(path: str, query: Dict[str, List[str]], miss_rate: float) -> Synthetic:
+    taxa: List[str] = []
+    for taxon_id in first(query, "id").split(","):
+        if not taxon_id or is_miss(taxon_id, miss_rate):
+            continue
+        taxa.append(
+            "<Taxon>"
+            f"<TaxId>{taxon_id}</TaxId>"
+            f"<ScientificName>Species {taxon_id}</ScientificName>"
+            f"<ParentTaxId>{stable_number(taxon_id, 5)}</ParentTaxId>"
+            "<Rank>species</Rank>"
+            "<Division>Bacteria</Division>"
+            "<GeneticCode><GCId>11</GCId><GCName>Bacterial</GCName></GeneticCode>"
+            "<Lineage>cellular organisms; Bacteria; Pseudomonadota</Lineage>"
+            "<CreateDate>2003/01/01 00:00:00</CreateDate>"
+            "<UpdateDate>2020/06/01 00:00:00</UpdateDate>"
+            "</Taxon>"
+        )
+
+    body: str = '<?xml version="1.0" ?>\n<TaxaSet>' + "".join(taxa) + "</TaxaSet>"
+    return 200, XML, body
+
+
+def ncbi_esearch(path: str, query: Dict[str, List[str]], miss_rate: float) -> Synthetic:
+    term: str = first(query, "term")
+    ids: str = "" if is_miss(term, miss_rate) else f"<Id>{stable_number(term)}</Id>"
+    body: str = (
+        '<?xml version="1.0" ?>\n<eSearchResult>'
+        f"<Count>{1 if ids else 0}</Count><IdList>{ids}</IdList>"
+        "</eSearchResult>"
+    )
+    return 200, XML, body
+
+
+# GBIF
+def gbif_species_match(
+    path: str, query: Dict[str, List[str]], miss_rate: float
+) -> Synthetic:
+    name: str = first(query, "name")
+    if is_miss(name, miss_rate):
+        return 200, JSON, json.dumps({"matchType": "NONE", "confidence": 100})
+
+    data: dict = {
+        "usageKey": stable_number(name),
+        "scientificName": name,
+        "canonicalName": name,
+        "rank": "SPECIES",
+        "status": "ACCEPTED",
+        "confidence": 99,
+        "matchType": "EXACT",
+        "kingdom": "Bacteria",
+    }
+    return 200, JSON, json.dumps(data)
+
+
+def gbif_occurrence_search(
+    path: str, query: Dict[str, List[str]], miss_rate: float
+) -> Synthetic:
+    taxon_key: str = first(query, "taxonKey")
+    results: List[dict] = [
+        {
+            "key": stable_number("occurrence:" + taxon_key, 10),
+            "taxonKey": int(taxon_key or 0),
+            "basisOfRecord": "MATERIAL_SAMPLE",
+            "country": "Indonesia",
+            "countryCode": "ID",
+            "decimalLatitude": -6.2,
+            "decimalLongitude": 106.8,
+            "year": 2020,
+            "lastInterpreted": "2024-01-01T00:00:00.000+00:00",
+        }
+    ]
+    data: dict = {"offset": 0, "limit": 20, "count": len(results), "results": results}
+    return 200, JSON, json.dumps(data)
+
+
+# Wikidata
+def wikidata_sparql(
+    path: str, query: Dict[str, List[str]], miss_rate: float
+) -> Synthetic:
+    sparql: str = first(query, "query")
+
+    # Bind every quoted literal in the query, both single lookups and VALUES blocks
+    bindings: List[dict] = []
+    for value in re.findall(r'"((?:[^"\\]|\\.)*)"', sparql):
+        value = value.replace('\\"', '"').replace("\\\\", "\\")
+        if is_miss(value, miss_rate):
+            continue
+        bindings.append(
+            {
+                "item": {
+                    "type": "uri",
+                    "value": f"http://www.wikidata.org/entity/Q{stable_number(value)}",
+                },
+                "value": {"type": "literal", "value": value},
+            }
+        )
+
+    data: dict = {
+        "head": {"vars": ["item", "value"]},
+        "results": {"bindings": bindings},
+    }
+    return 200, SPARQL_JSON, json.dumps(data)
+
+
+def wikidata_api(path: str, query: Dict[str, List[str]], miss_rate: float) -> Synthetic:
+    entities: Dict[str, dict] = {}
+    for entity_id in first(query, "ids").split("|"):
+        if not entity_id:
+            continue
+        entities[entity_id] = {
+            "type": "item",
+            "id": entity_id,
+            "lastrevid": stable_number("revision:" + entity_id, 10),
+            "modified": "2024-01-01T00:00:00Z",
+            "labels": {"en": {"language": "en", "value": f"Taxon {entity_id}"}},
+            "descriptions": {"en": {"language": "en", "value": "species of bacterium"}},
+            "claims": {
+                "P31": [
+                    {
+                        "mainsnak": {
+                            "snaktype": "value",
+                            "property": "P31",
+                            "datavalue": {
+                                "value": {"entity-type": "item", "id": "Q16521"},
+                                "type": "wikibase-entityid",
+                            },
+                        }
+                    }
+                ]
+            },
+        }
+
+    return 200, JSON, json.dumps({"entities": entities, "success": 1})
+
+
+# BacDive
+def bacdive_advsearch(
+    path: str, query: Dict[str, List[str]], miss_rate: float
+) -> Synthetic:
+    ncbi_taxon_id: str = first(query, "fg[0][fl][1][fv]")
+    links: str = (
+        ""
+        if not ncbi_taxon_id or is_miss(ncbi_taxon_id, miss_rate)
+        else f'<a href="/strain/{stable_number(ncbi_taxon_id, 6)}">Strain</a>'
+    )
+    body: str = f"<html><body><a href='/'>BacDive</a>{links}</body></html>"
+    return 200, HTML, body
+
+
+def bacdive_token(
+    path: str, query: Dict[str, List[str]], miss_rate: float
+) -> Synthetic:
+    data: dict = {
+        "access_token": "fake-access-token",
+        "refresh_token": "fake-refresh-token",
+        "expires_in": 300,
+        "refresh_expires_in": 1800,
+        "token_type": "Bearer",
+    }
+    return 200, JSON, json.dumps(data)
+
+
+def bacdive_fetch(
+    path: str, query: Dict[str, List[str]], miss_rate: float
+) -> Synthetic:
+    results: Dict[str, dict] = {}
+    for bacdive_id in path.rsplit("/", 1)[-1].split(";"):
+        if not bacdive_id:
+            continue
+        results[bacdive_id] = {
+            "General": {"@ref": 1, "BacDive-ID": int(bacdive_id), "DSM-Number": 1},
+            "Name and taxonomic classification": {
+                "LPSN": {"species": f"Species {bacdive_id}"},
+                "Lineage": "Bacteria; Pseudomonadota",
+            },
+            "Morphology": {"cell morphology": {"cell shape": "rod-shaped"}},
+        }
+
+    if not results:
+        return 404, JSON, json.dumps({"count": 0, "results": {}})
+
+    data: dict = {"count": len(results), "next": None, "results": results}
+    return 200, JSON, json.dumps(data)
+
+
+def bacdive_taxon(
+    path: str, query: Dict[str, List[str]], miss_rate: float
+) -> Synthetic:
+    species: str = " ".join(path.split("/")[2:])
+    if is_miss(species, miss_rate):
+        return 404, JSON, json.dumps({"count": 0, "results": []})
+
+    data: dict = {"count": 1, "next": None, "results": [stable_number(species, 6)]}
+    return 200, JSON, json.dumps(data)
+
+
+# Synthetic handlers per (host, path prefix), checked in order
+SYNTHETIC_ROUTES: List[Tuple[str, str, Callable[..., Synthetic]]] = [
+    ("eutils.ncbi.nlm.nih.gov", "/entrez/eutils/efetch.fcgi", ncbi_efetch),
+    ("eutils.ncbi.nlm.nih.gov", "/entrez/eutils/esearch.fcgi", ncbi_esearch),
+    ("api.gbif.org", "/v1/species/match", gbif_species_match),
+    ("api.gbif.org", "/v1/occurrence/search", gbif_occurrence_search),
+    ("query.wikidata.org", "/sparql", wikidata_sparql),
+    ("www.wikidata.org", "/w/api.php", wikidata_api),
+    ("bacdive.dsmz.de", "/advsearch", bacdive_advsearch),
+    ("sso.dsmz.de", "/auth/realms/dsmz/protocol/openid-connect/token", bacdive_token),
+    ("api.bacdive.dsmz.de", "/fetch/", bacdive_fetch),
+    ("api.bacdive.dsmz.de", "/taxon/", bacdive_taxon),
+]
+
+
+def synthetic_response(
+    host: str, path: str, query_string: str, miss_rate: float = 0
+) -> Optional[Synthetic]:
+    query: Dict[str, List[str]] = parse_qs(query_string, keep_blank_values=True)
+    for route_host, prefix, handler in SYNTHETIC_ROUTES:
+        if host == route_host and path.startswith(prefix):
+            return handler(path, query, miss_rate)
+    return None
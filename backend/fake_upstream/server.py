@@ -0,0 +1,196 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+from fake_upstream.faults import FaultPlan
+from fake_upstream.responses import synthetic_response
+
+# Request headers forwarded to the real upstream in record mode
+FORWARDED_HEADERS = ("accept", "authorization", "content-type")
+
+
+# Recorded responses, one JSON file per request under <directory>/<host>/
+class FixtureStore:
+    def __init__(self, directory: Optional[str]):
+        self.directory = directory
+
+    @staticmethod
+    def key(method: str, path: str, query_string: str) -> str:
+        # Query parameters are sorted so the key does not depend on their order
+        query: str = urlencode(sorted(parse_qsl(query_string, keep_blank_values=True)))
+        return hashlib.sha1(f"{method} {path}?{query}".encode()).hexdigest()
+
+    def _path(self, host: str, key: str) -> str:
+        return os.path.join(self.directory, host, f"{key}.json")
+
+    def load(self, host: str, key: str) -> Optional[dict]:
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(host, key)) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return None
+
+    def save(self, host: str, key: str, fixture: dict) -> None:
+        path: str = self._path(host, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(fixture, file, indent=2)
+
+
+# Build the fake upstream app; requests arrive as /<upstream host>/<upstream path>
+def create_app(
+    fixtures_dir: Optional[str] = None,
+    faults: Optional[FaultPlan] = None,
+    record: bool = False,
+) -> FastAPI:
+    app = FastAPI(title="Fake upstream")
+    store = FixtureStore(fixtures_dir)
+    app.state.faults = faults or FaultPlan()
+    app.state.stats = Counter()
+
+    # Current fault plan
+    @app.get("/_fake/faults")
+    async def get_faults():
+        return app.state.faults.to_dict()
+
+    # Replace the fault plan at runtime, e.g. between benchmark phases
+    @app.put("/_fake/faults")
+    async def put_faults(request: Request):
+        app.state.faults = FaultPlan.from_dict(await request.json())
+        return app.state.faults.to_dict()
+
+    # Served responses per host and outcome
+    @app.get("/_fake/stats")
+    async def get_stats():
+        return {" ".join(key): count for key, count in app.state.stats.items()}
+
+    @app.api_route("/{host}/{path:path}", methods=["GET", "POST"])
+    async def upstream(host: str, path: str, request: Request):
+        path = "/" + path
+        plan: FaultPlan = app.state.faults
+        host_faults = plan.for_host(host)
+
+        await asyncio.sleep(host_faults.latency.sample(plan.rng))
+
+        # 429 bursts first, then random errors
+        if host_faults.in_burst(time.monotonic() - plan.started_at):
+            app.state.stats[(host, "429")] += 1
+            headers: dict = {}
+            if host_faults.retry_after is not None:
+                headers["Retry-After"] = str(host_faults.retry_after)
+            return Response(status_code=429, headers=headers)
+
+        if host_faults.error_rate and plan.rng.random() < host_faults.error_rate:
+            app.state.stats[(host, "error")] += 1
+            return Response(status_code=host_faults.error_status)
+
+        query_string: str = request.url.query
+        key: str = store.key(request.method, path, query_string)
+
+        fixture: Optional[dict] = store.load(host, key)
+        if fixture is None and record:
+            fixture = await record_fixture(request, host, path, query_string)
+            store.save(host, key, fixture)
+
+        if fixture is not None:
+            app.state.stats[(host, "fixture")] += 1
+            return Response(
+                content=fixture["body"],
+                status_code=fixture["status_code"],
+                media_type=fixture.get("content_type"),
+            )
+
+        synthetic = synthetic_response(
+            host, path, query_string, miss_rate=host_faults.miss_rate
+        )
+        if synthetic is None:
+            app.state.stats[(host, "unknown")] += 1
+            return Response(status_code=404)
+
+        app.state.stats[(host, "synthetic")] += 1
+        status_code, content_type, body = synthetic
+        return Response(content=body, status_code=status_code, media_type=content_type)
+
+    return app
+
+
+# Forward a request to the real upstream and capture its response as a fixture
+async def record_fixture(
+    request: Request, host: str, path: str, query_string: str
+) -> dict:
+    url: str = f"https://{host}{path}" + (f"?{query_string}" if query_string else "")
+    async with httpx.AsyncClient(timeout=60) as client:
+        response = await client.request(
+            request.method,
+            url,
+            content=await request.body(),
+            headers={
+                name: value
+                for name, value in request.headers.items()
+                if name in FORWARDED_HEADERS
+            },
+        )
+
+    return {
+        "method": request.method,
+        "url": url,
+        "status_code": response.status_code,
+        "content_type": response.headers.get("content-type"),
+        "body": response.text,
+    }
+
+
+# Fake upstream running on a background thread, for in-process benchmarks
+class FakeUpstreamServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 9100,
+        fixtures_dir: Optional[str] = None,
+        faults: Optional[FaultPlan] = None,
+        record: bool = False,
+    ):
+        self.app = create_app(fixtures_dir, faults, record)
+        self._server = uvicorn.Server(
+            uvicorn.Config(self.app, host=host, port=port, log_level="warning")
+        )
+        self._thread: Optional[threading.Thread] = None
+        self.url = f"http://{host}:{port}"
+
+    # Serve on the calling thread until interrupted
+    def run(self) -> None:
+        self._server.run()
+
+    def start(self, timeout: float = 10) -> "FakeUpstreamServer":
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+
+        deadline: float = time.monotonic() + timeout
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("Fake upstream server did not start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeUpstreamServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()